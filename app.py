@@ -1,11 +1,49 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import router
+from fastapi.responses import StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from api.routes import reject_oversized_uploads, router
 from pydantic import BaseModel
-import subprocess
+from typing import Literal, Optional
+from translation_worker import TranslationWorkerPool
+from jobs import COMPLETED, JobManager
+from transcription_cache import TranscriptionCache
+from upload_store import UploadStore
+from live_transcription import SAMPLE_RATE, LiveSession, transcribe_window
+from sign_lexicon import SignLexicon
+import asyncio
+import config
+import json
 import logging
+import os
 
-app = FastAPI(title="Sign Language Video Accessibility API")
+# ✅ Long-lived workers that keep the STT/TTS models loaded between requests
+worker_pool = TranslationWorkerPool()
+job_manager = JobManager(worker_pool)
+# ✅ Separate workers for live translation, preloaded with the small live model
+live_pool = TranslationWorkerPool(workers=config.LIVE_WORKERS, model_size=config.LIVE_MODEL_SIZE,
+                                  preload_sizes=[config.LIVE_MODEL_SIZE])
+# ✅ One cache handle for the API process (it keeps a SQLite connection per thread)
+transcription_cache = TranscriptionCache()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    worker_pool.start()
+    live_pool.start()
+    job_manager.start()
+    await asyncio.gather(worker_pool.warm_up(), live_pool.warm_up())
+    yield
+    job_manager.shutdown()
+    live_pool.shutdown()
+    worker_pool.shutdown()
+
+app = FastAPI(title="Sign Language Video Accessibility API", lifespan=lifespan)
+app.state.worker_pool = worker_pool
+app.state.upload_store = UploadStore()
+
+# ✅ Reject oversized uploads before their body is received (registered first so CORS wraps it)
+app.middleware("http")(reject_oversized_uploads)
 
 # ✅ Enable CORS (Important for frontend integration)
 app.add_middleware(
@@ -23,8 +61,50 @@ logger = logging.getLogger(__name__)
 # ✅ Include routes from routes.py
 app.include_router(router)
 
+# ✅ Serve rendered sign language videos
+os.makedirs(config.RENDER_OUTPUT_DIR, exist_ok=True)
+app.mount("/videos", StaticFiles(directory=config.RENDER_OUTPUT_DIR), name="videos")
+
+class ImmutableStaticFiles(StaticFiles):
+    """Static files whose URLs are versioned (?v=...), so clients and CDNs may cache them forever."""
+
+    async def get_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+# ✅ Serve sign files referenced by sign tracks
+app.mount("/signs", ImmutableStaticFiles(directory=config.SIGN_GIF_FOLDER, check_dir=False), name="signs")
+
 class VideoRequest(BaseModel):
     video_url: str
+    # Optional per-request Whisper model (see config.WHISPER_REQUEST_MODEL_SIZES)
+    model_size: Optional[Literal["tiny", "base", "small"]] = None
+    # Also encode the signs into a video (served under /videos/)
+    render_video: bool = False
+    # Return only the transcript and the sign track, for overlay on the original video
+    track_only: bool = False
+
+    def options(self) -> dict:
+        """Pipeline options forwarded to `generate_translation`."""
+        options = {"render_video": self.render_video}
+        if self.model_size:
+            options["model_size"] = self.model_size
+        return options
+
+def video_link(result: dict) -> dict:
+    """Replaces the server-side path of a rendered video with its URL."""
+    if result.get("video"):
+        result = {**result, "video": f"/videos/{os.path.basename(result['video'])}"}
+    return result
+
+def job_view(job) -> dict:
+    """Job snapshot as returned to clients."""
+    view = job.to_dict()
+    if view["result"]:
+        view["result"] = video_link(view["result"])
+    return view
 
 @app.post("/translate/")
 async def translate_video(request: VideoRequest):
@@ -33,26 +113,124 @@ async def translate_video(request: VideoRequest):
     try:
         logger.info(f"📌 Processing video: {video_url}")
 
-        # ✅ Run translation script safely with error handling
-        result = subprocess.run(
-            ["python", "generate_translation.py", video_url],
-            capture_output=True,
-            text=True
-        )
-
-        logger.info(f"📌 STDOUT: {result.stdout}")
-        logger.error(f"⚠️ STDERR: {result.stderr}")  # Print script errors if any
-
-        if result.returncode != 0:
-            raise HTTPException(status_code=500, detail=f"Translation script error: {result.stderr}")
+        # ✅ Identical requests in flight share one job; its progress streams at /jobs/{job_id}/events
+        job = await job_manager.wait(job_manager.submit(video_url, request.options()))
+        if job.status != COMPLETED:
+            raise HTTPException(status_code=500, detail=f"Translation error: {job.error or job.status}")
+        result = video_link(job.result)
 
-        translation_output = result.stdout.strip()
-        return {"message": "Translation successful", "translation": translation_output}
+        if request.track_only:
+            return {"message": "Translation successful", "job_id": job.id, "translation": result["text"],
+                    "track": result["track"]}
+        return {"message": "Translation successful", "job_id": job.id, "translation": result["text"],
+                "signs": result["signs"], "track": result["track"], "video": result.get("video")}
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("🚨 Unexpected error occurred")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+# ✅ Asynchronous job API: submit, poll, and stream progress
+@app.post("/jobs", status_code=202)
+async def create_job(request: VideoRequest):
+    job = job_manager.submit(request.video_url, request.options())
+    logger.info(f"📌 Queued job {job.id} for: {request.video_url}")
+    return {"job_id": job.id, "status": job.status, "coalesced": job.refs > 1}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Withdraws one request for the job; it is cancelled once no request is left."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job_manager.release(job)
+    return {"job_id": job.id, "status": job.status, "requests": job.refs}
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        async for event in job_manager.events(job_id):
+            yield f"data: {json.dumps(event)}\n\n"
+        # Final snapshot carries the result (or error) of the job
+        yield f"event: done\ndata: {json.dumps(job_view(job))}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+# ✅ Live translation: audio chunks in, sign cues out
+live_lexicon = SignLexicon(config.SIGN_GIF_FOLDER)
+
+@app.websocket("/live")
+async def live_translation(websocket: WebSocket):
+    """
+    Protocol: the client sends `{"type": "start", "stream_time": <video seconds>}`
+    (again after every seek), then binary frames of 16 kHz mono 16-bit PCM.
+    The server answers with `{"type": "cues", "cues": [[start, end, sign_id], ...],
+    "assets": {...}, "text": "..."}` as words are committed.
+    """
+    await websocket.accept()
+    await asyncio.to_thread(live_lexicon.refresh)
+    session = LiveSession(live_lexicon)
+    audio_ready = asyncio.Event()
+
+    async def transcribe_loop():
+        while True:
+            await audio_ready.wait()
+            audio_ready.clear()
+            if not session.ready():
+                continue
+            generation = session.generation
+            samples, offset, prompt = session.window()
+            audio_end = offset + len(samples) / SAMPLE_RATE
+            try:
+                words = await live_pool.run(transcribe_window, samples, offset, session.model_size,
+                                            session.language, prompt)
+            except Exception as e:
+                logger.exception("🚨 Live transcription failed")
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            if generation != session.generation:
+                continue  # The client seeked while this window was transcribed
+            # Held-back phrase starts are released by later passes even when nothing new is committed
+            update = session.cues_for(session.commit(words, audio_end), audio_end)
+            if update["text"]:
+                await websocket.send_json({"type": "cues", **update})
+            audio_ready.set()  # Audio may have arrived in the meantime
+
+    transcriber = asyncio.create_task(transcribe_loop())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                session.feed(message["bytes"])
+                audio_ready.set()
+            elif message.get("text"):
+                control = json.loads(message["text"])
+                if control.get("type") == "start":
+                    session.reset(float(control.get("stream_time", 0.0)))
+                    logger.info(f"🎙 Live session (re)started at {session.audio_end:.1f}s")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        transcriber.cancel()
+
+@app.get("/cache/stats")
+def cache_stats():
+    return transcription_cache.stats()
+
 @app.get("/")
 def home():
     return {"message": "✅ Sign Language API is running!"}
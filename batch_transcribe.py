@@ -0,0 +1,162 @@
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, List, Optional, Set
+
+import config
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = {".mp4", ".mkv", ".webm", ".mov", ".avi", ".m4v", ".mp3", ".wav", ".m4a"}
+
+# Per-process SpeechToText, created once by `_init_worker`
+_stt = None
+
+
+def collect_videos(source: str) -> List[str]:
+    """
+    Expands a batch source into a sorted list of video paths.
+
+    Args:
+        source: A directory (searched recursively), a glob pattern, or a text
+            file listing one video path per line
+
+    Returns:
+        List of video paths
+    """
+    if os.path.isdir(source):
+        videos = [
+            os.path.join(root, name)
+            for root, _, files in os.walk(source)
+            for name in files
+            if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS
+        ]
+    elif os.path.isfile(source):
+        with open(source, encoding="utf-8") as f:
+            videos = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        videos = glob.glob(source, recursive=True)
+    return sorted(videos)
+
+
+def completed_videos(manifest_path: str) -> Set[str]:
+    """Videos that already have a successful record in the JSONL manifest."""
+    done = set()
+    if not os.path.exists(manifest_path):
+        return done
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partially written last line of an interrupted run
+            if record.get("status") == "ok":
+                done.add(record["video"])
+    return done
+
+
+def _end_last_line(manifest_path: str):
+    """Terminates a partially written last line, so the next record starts on a line of its own."""
+    try:
+        with open(manifest_path, "rb+") as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    except FileNotFoundError:
+        pass
+
+
+def _init_worker(model_size: str, ffmpeg_path: str, language: Optional[str], chunk_workers: int):
+    """Loads one SpeechToText (and its Whisper model) per worker process."""
+    global _stt
+    from stt import SpeechToText
+
+    _stt = SpeechToText(model_size=model_size, ffmpeg_path=ffmpeg_path, language=language,
+                        chunk_workers=chunk_workers)
+
+
+def transcribe_one(video_path: str) -> dict:
+    """Transcribes one video in a worker and returns its manifest record."""
+    stage_started = {}
+    timings = {}
+    info = {}
+
+    def progress(stage: str, status: str = None, **details):
+        if status == "started":
+            stage_started[stage] = time.perf_counter()
+        elif status == "done" and stage in stage_started:
+            timings[stage] = round(time.perf_counter() - stage_started[stage], 3)
+            info.update(details)
+
+    started = time.perf_counter()
+    record = {"video": video_path, "model": _stt.model_size, "language": _stt.language}
+    try:
+        result = _stt.transcribe_words(video_path, progress=progress)
+        if result is None:
+            record.update(status="error", error="transcription failed")
+        else:
+            text, words = result
+            record.update(status="ok", text=text.strip(), words=words, duration=info.get("duration"))
+    except Exception as e:
+        record.update(status="error", error=str(e))
+    timings["total"] = round(time.perf_counter() - started, 3)
+    record["timings"] = timings
+    return record
+
+
+def run_batch(
+    videos: Iterable[str],
+    manifest_path: str,
+    workers: int = 1,
+    model_size: str = config.WHISPER_MODEL_SIZE,
+    ffmpeg_path: str = config.FFMPEG_PATH,
+    language: Optional[str] = config.WHISPER_LANGUAGE,
+    chunk_workers: int = 0,
+) -> dict:
+    """
+    Transcribes many videos on a pool of workers, appending one JSONL record
+    per video to `manifest_path`. Videos already recorded as successful are
+    skipped, so an interrupted run can simply be restarted.
+
+    Returns:
+        Counts of processed, failed and skipped videos
+    """
+    videos = list(videos)
+    done = completed_videos(manifest_path)
+    pending = [video for video in videos if video not in done]
+    logger.info(f"{len(pending)} video(s) to transcribe, {len(videos) - len(pending)} already done")
+
+    summary = {"processed": 0, "failed": 0, "skipped": len(videos) - len(pending)}
+    if not pending:
+        return summary
+
+    os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+    _end_last_line(manifest_path)
+    with ProcessPoolExecutor(
+        max_workers=max(1, workers),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(model_size, ffmpeg_path, language, chunk_workers),
+    ) as executor, open(manifest_path, "a", encoding="utf-8") as manifest:
+        futures = {executor.submit(transcribe_one, video): video for video in pending}
+        for index, future in enumerate(as_completed(futures), start=1):
+            try:
+                record = future.result()
+            except Exception as e:  # The worker died (e.g. BrokenProcessPool), not just the transcription
+                record = {"video": futures[future], "model": model_size, "language": language,
+                          "status": "error", "error": f"{type(e).__name__}: {e}", "timings": {"total": 0.0}}
+            manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+            manifest.flush()
+            if record["status"] == "ok":
+                summary["processed"] += 1
+                logger.info(f"[{index}/{len(pending)}] ✅ {record['video']} ({record['timings']['total']:.1f}s)")
+            else:
+                summary["failed"] += 1
+                logger.error(f"[{index}/{len(pending)}] ❌ {record['video']}: {record['error']}")
+    return summary
@@ -0,0 +1,222 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def detect_speech(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: int = 30,
+    margin_db: float = 12.0,
+    min_silence_ms: int = 400,
+    min_speech_ms: int = 200,
+    pad_ms: int = 150,
+) -> List[Tuple[int, int]]:
+    """
+    Energy-based voice activity detection.
+
+    A frame counts as speech when its energy is `margin_db` above the estimated
+    noise floor. Gaps shorter than `min_silence_ms` are bridged, regions shorter
+    than `min_speech_ms` are dropped, and each region is padded by `pad_ms`.
+
+    Args:
+        audio: Mono float32 samples in [-1, 1]
+        sample_rate: Sample rate of `audio`
+
+    Returns:
+        List of (start_sample, end_sample) speech regions, in order
+    """
+    frame_len = sample_rate * frame_ms // 1000
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return []
+
+    frames = audio[: n_frames * frame_len].reshape(n_frames, frame_len)
+    energy_db = 10 * np.log10(np.mean(frames.astype(np.float64) ** 2, axis=1) + 1e-10)
+    noise_floor = np.percentile(energy_db, 10)
+    is_speech = energy_db > max(noise_floor + margin_db, -60.0)
+
+    # Run boundaries: +1 where speech starts, -1 where it stops
+    edges = np.diff(np.concatenate(([0], is_speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    regions = []
+    max_gap = min_silence_ms // frame_ms
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] <= max_gap:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    pad = pad_ms * sample_rate // 1000
+    min_len = min_speech_ms // frame_ms
+    return [
+        (max(0, start * frame_len - pad), min(len(audio), end * frame_len + pad))
+        for start, end in regions
+        if end - start >= min_len
+    ]
+
+
+def plan_chunks(regions: List[Tuple[int, int]], max_chunk_s: float = 30.0,
+                sample_rate: int = SAMPLE_RATE) -> List[List[Tuple[int, int]]]:
+    """
+    Groups consecutive speech regions into chunks holding at most `max_chunk_s`
+    of speech. Only the regions themselves are transcribed: the silence
+    between the regions of a chunk is left out. Regions longer than
+    `max_chunk_s` are cut into `max_chunk_s` pieces.
+
+    Returns:
+        One list of (start_sample, end_sample) regions per chunk
+    """
+    max_len = int(max_chunk_s * sample_rate)
+    chunks = []
+    speech = 0  # Samples of speech in the last chunk
+    for start, end in regions:
+        while end - start > max_len:
+            chunks.append([(start, start + max_len)])
+            start += max_len
+            speech = max_len
+        if chunks and speech + end - start <= max_len:
+            chunks[-1].append((start, end))
+            speech += end - start
+        else:
+            chunks.append([(start, end)])
+            speech = end - start
+    return chunks
+
+
+def chunk_audio(audio: np.ndarray, regions: List[Tuple[int, int]],
+                sample_rate: int = SAMPLE_RATE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Concatenates the speech regions of a chunk.
+
+    Returns:
+        Tuple of (samples, chunk time where each region starts, source time where
+        it starts), both in seconds, for mapping timestamps back with `map_times`
+    """
+    lengths = np.array([end - start for start, end in regions])
+    chunk_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) / sample_rate
+    source_starts = np.array([start for start, _ in regions]) / sample_rate
+    samples = np.concatenate([audio[start:end] for start, end in regions])
+    return samples, chunk_starts, source_starts
+
+
+def map_times(times: np.ndarray, chunk_starts: np.ndarray, source_starts: np.ndarray,
+              is_end: bool = False) -> np.ndarray:
+    """
+    Maps timestamps within a concatenated chunk back to the source audio. A
+    time exactly on a region boundary maps to the end of the earlier region
+    when `is_end`, otherwise to the start of the later one.
+    """
+    region = np.maximum(np.searchsorted(chunk_starts, times, side="left" if is_end else "right") - 1, 0)
+    return source_starts[region] + (times - chunk_starts[region])
+
+
+def _init_chunk_worker(model_size: str, threads: int):
+    import torch
+    from model_registry import registry
+
+    torch.set_num_threads(threads)
+    registry.get(model_size)
+
+
+def _transcribe_chunk(samples: np.ndarray, chunk_starts: np.ndarray, source_starts: np.ndarray,
+                      model_size: str, language: Optional[str]) -> dict:
+    """Transcribes one chunk of concatenated speech regions and maps its timestamps back to the source."""
+    from model_registry import registry
+
+    options = {"word_timestamps": True}
+    if language:
+        options["language"] = language
+    result = registry.get(model_size).transcribe(samples, **options)
+
+    def to_source(start, end):
+        return (float(map_times(np.float64(start), chunk_starts, source_starts)),
+                float(map_times(np.float64(end), chunk_starts, source_starts, is_end=True)))
+
+    segments = []
+    for segment in result.get("segments", []):
+        start, end = to_source(segment["start"], segment["end"])
+        words = []
+        for w in segment.get("words", []):
+            word_start, word_end = to_source(w["start"], w["end"])
+            words.append({"word": w["word"], "start": word_start, "end": word_end})
+        segments.append({"start": start, "end": end, "text": segment["text"], "words": words})
+    return {"offset": float(source_starts[0]), "text": result["text"].strip(), "segments": segments}
+
+
+class ChunkedTranscriber:
+    def __init__(self, workers: int = config.TRANSCRIPTION_CHUNK_WORKERS, model_size: str = "base",
+                 max_chunk_s: float = config.TRANSCRIPTION_CHUNK_SECONDS):
+        """
+        Transcribes long audio by splitting it at silences and running the
+        chunks in parallel across a process pool.
+
+        Args:
+            workers: Number of worker processes, each holding its own model
+            model_size: Whisper model size loaded by the workers
+            max_chunk_s: Longest chunk sent to Whisper, in seconds
+        """
+        self.workers = max(1, workers)
+        self.model_size = model_size
+        self.max_chunk_s = max_chunk_s
+        # Split the cores between workers so they don't oversubscribe each other
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_chunk_worker,
+            initargs=(model_size, threads),
+        )
+
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None,
+                   on_partial: Optional[Callable[[int, int, dict], None]] = None,
+                   model_size: Optional[str] = None) -> dict:
+        """
+        Transcribes 16 kHz mono audio chunk by chunk.
+
+        Args:
+            audio: Mono float32 samples at 16 kHz
+            language: Target language code passed to Whisper
+            on_partial: Called as `on_partial(done, total, chunk)` as each chunk finishes
+            model_size: Whisper model size for this call, defaults to the pool's size
+
+        Returns:
+            Dict with `text`, `segments` and `words`, timestamps relative to the start of `audio`
+        """
+        model_size = model_size or self.model_size
+        chunks = plan_chunks(detect_speech(audio), self.max_chunk_s)
+        logger.info(f"Transcribing {len(chunks)} speech chunk(s) on {self.workers} worker(s)")
+
+        futures = [
+            self._executor.submit(_transcribe_chunk, *chunk_audio(audio, regions), model_size, language)
+            for regions in chunks
+        ]
+        results = []
+        for done, future in enumerate(as_completed(futures), start=1):
+            chunk = future.result()
+            results.append(chunk)
+            if on_partial:
+                on_partial(done, len(futures), chunk)
+
+        results.sort(key=lambda chunk: chunk["offset"])
+        segments = [segment for chunk in results for segment in chunk["segments"]]
+        return {
+            "text": " ".join(chunk["text"] for chunk in results if chunk["text"]),
+            "segments": segments,
+            "words": [word for segment in segments for word in segment["words"]],
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,82 @@
+import os
+
+# --- Translation service settings (override through environment variables) ---
+
+# Number of long-lived worker processes that keep the STT/TTS models loaded
+TRANSLATION_WORKERS = int(os.environ.get("TRANSLATION_WORKERS", "2"))
+
+# Whisper model used by the translation workers
+WHISPER_MODEL_SIZE = os.environ.get("WHISPER_MODEL_SIZE", "base")
+
+# Target language code for Whisper (None lets Whisper detect it)
+WHISPER_LANGUAGE = os.environ.get("WHISPER_LANGUAGE") or None
+
+# Path to the ffmpeg executable
+FFMPEG_PATH = os.environ.get("FFMPEG_PATH", "ffmpeg")
+
+# Folder holding one GIF per supported sign
+SIGN_GIF_FOLDER = os.environ.get("SIGN_GIF_FOLDER", "sign_gifs")
+
+# Translation jobs allowed to run at once behind the /jobs API
+MAX_CONCURRENT_JOBS = int(os.environ.get("MAX_CONCURRENT_JOBS", str(TRANSLATION_WORKERS)))
+
+# Seconds a finished job stays queryable through GET /jobs/{id}
+JOB_TTL_SECONDS = float(os.environ.get("JOB_TTL_SECONDS", "3600"))
+
+# Persistent transcription cache (SQLite file) and its size budget
+TRANSCRIPTION_CACHE_PATH = os.environ.get("TRANSCRIPTION_CACHE_PATH", os.path.join("cache", "transcriptions.sqlite3"))
+TRANSCRIPTION_CACHE_MAX_BYTES = int(os.environ.get("TRANSCRIPTION_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Whisper model sizes a request may choose per call
+WHISPER_REQUEST_MODEL_SIZES = ("tiny", "base", "small")
+
+# Model sizes each worker loads at startup (comma separated)
+WHISPER_PRELOAD_SIZES = [
+    size.strip() for size in os.environ.get("WHISPER_PRELOAD_SIZES", WHISPER_MODEL_SIZE).split(",") if size.strip()
+]
+
+# Memory budget for resident Whisper models per process; least recently used models are evicted beyond it
+WHISPER_MEMORY_BUDGET_BYTES = int(os.environ.get("WHISPER_MEMORY_BUDGET_MB", "2048")) * 1024 * 1024
+
+# Chunked transcription: processes per translation worker (0 disables it) and longest chunk in seconds
+TRANSCRIPTION_CHUNK_WORKERS = int(os.environ.get("TRANSCRIPTION_CHUNK_WORKERS", "0"))
+TRANSCRIPTION_CHUNK_SECONDS = float(os.environ.get("TRANSCRIPTION_CHUNK_SECONDS", "30"))
+
+# Pre-decoded sign frame atlas (built with `python sign_atlas.py`)
+SIGN_ATLAS_PATH = os.environ.get("SIGN_ATLAS_PATH", "sign_atlas.bin")
+SIGN_FRAME_SIZE = tuple(int(v) for v in os.environ.get("SIGN_FRAME_SIZE", "256x256").split("x"))
+SIGN_ATLAS_CACHE_BYTES = int(os.environ.get("SIGN_ATLAS_CACHE_MB", "256")) * 1024 * 1024
+# Signs decoded from GIFs (no atlas, or a stale atlas entry) are kept in an LRU of this size
+SIGN_DECODE_CACHE_BYTES = int(os.environ.get("SIGN_DECODE_CACHE_MB", "128")) * 1024 * 1024
+
+# Fingerspelling fallback: time per letter, cross-fade between letters, and cached words per process
+FINGERSPELL_LETTER_MS = int(os.environ.get("FINGERSPELL_LETTER_MS", "400"))
+FINGERSPELL_TRANSITION_MS = int(os.environ.get("FINGERSPELL_TRANSITION_MS", "100"))
+FINGERSPELL_CACHE_SIZE = int(os.environ.get("FINGERSPELL_CACHE_SIZE", "512"))
+
+# Headless sign video rendering: output frame rate and where rendered videos are written
+RENDER_FPS = int(os.environ.get("RENDER_FPS", "25"))
+RENDER_OUTPUT_DIR = os.environ.get("RENDER_OUTPUT_DIR", "rendered")
+
+# Base URL of the sign files referenced by sign tracks (served from SIGN_GIF_FOLDER under /signs, or a CDN)
+SIGN_ASSET_BASE_URL = os.environ.get("SIGN_ASSET_BASE_URL", "/signs")
+
+# Uploads to /stt and /video-data: content-addressed store, size limits, and how long unused files are kept
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "uploads")
+UPLOAD_MAX_AUDIO_BYTES = int(os.environ.get("UPLOAD_MAX_AUDIO_MB", "200")) * 1024 * 1024
+UPLOAD_MAX_VIDEO_BYTES = int(os.environ.get("UPLOAD_MAX_VIDEO_MB", "2048")) * 1024 * 1024
+UPLOAD_TTL_SECONDS = float(os.environ.get("UPLOAD_TTL_SECONDS", str(24 * 3600)))
+
+# Live streaming translation over /live: Whisper model, re-transcription step, commit lag bound, and audio window
+LIVE_MODEL_SIZE = os.environ.get("LIVE_MODEL_SIZE", "tiny")
+LIVE_STEP_SECONDS = float(os.environ.get("LIVE_STEP_SECONDS", "1.0"))
+LIVE_MAX_LAG_SECONDS = float(os.environ.get("LIVE_MAX_LAG_SECONDS", "2.0"))
+LIVE_WINDOW_SECONDS = float(os.environ.get("LIVE_WINDOW_SECONDS", "15"))
+# Worker processes reserved for /live, so batch translations never delay live windows
+LIVE_WORKERS = int(os.environ.get("LIVE_WORKERS", "1"))
+
+# Remote videos: on-disk download cache, its size budget, pooled connections per host, and request timeout
+REMOTE_CACHE_DIR = os.environ.get("REMOTE_CACHE_DIR", os.path.join("cache", "remote"))
+REMOTE_CACHE_MAX_BYTES = int(os.environ.get("REMOTE_CACHE_MAX_MB", "4096")) * 1024 * 1024
+REMOTE_POOL_SIZE = int(os.environ.get("REMOTE_POOL_SIZE", "8"))
+REMOTE_TIMEOUT_SECONDS = float(os.environ.get("REMOTE_TIMEOUT_SECONDS", "30"))
@@ -28,6 +28,183 @@ function getVideoSource() {
     return { videoElement, videoSrc };
 }
 
+// Sign track overlay: shows the sign for the current playback time on top of the video
+let signOverlay = null;
+
+function findCue(cues, time) {
+    // Binary search for the last cue starting at or before `time`
+    let low = 0, high = cues.length - 1, found = -1;
+    while (low <= high) {
+        const mid = (low + high) >> 1;
+        if (cues[mid][0] <= time) {
+            found = mid;
+            low = mid + 1;
+        } else {
+            high = mid - 1;
+        }
+    }
+    return found >= 0 && time < cues[found][1] ? cues[found] : null;
+}
+
+function preloadAssets(assets) {
+    // Preload every sign so switching cues never waits on the network
+    Object.values(assets).forEach(url => { new Image().src = url; });
+}
+
+// Positions an <img> over the video and shows whatever sign URL `pickSign()` returns each frame
+function createSignOverlay(videoElement, pickSign) {
+    if (signOverlay) {
+        signOverlay.stop();
+    }
+
+    const img = document.createElement("img");
+    img.style.cssText = "position:absolute;width:25%;pointer-events:none;z-index:2147483647;display:none;";
+    document.body.appendChild(img);
+
+    let currentUrl = null;
+    let frameRequest = null;
+
+    function update() {
+        const rect = videoElement.getBoundingClientRect();
+        img.style.left = `${window.scrollX + rect.right - rect.width * 0.27}px`;
+        img.style.top = `${window.scrollY + rect.bottom - rect.width * 0.27 - 40}px`;
+
+        const url = pickSign();
+        if (url !== currentUrl) {
+            currentUrl = url;
+            if (url) {
+                img.src = url;
+                img.style.display = "block";
+            } else {
+                img.style.display = "none";
+            }
+        }
+        frameRequest = requestAnimationFrame(update);
+    }
+
+    const overlay = {
+        onStop: null,
+        stop() {
+            cancelAnimationFrame(frameRequest);
+            img.remove();
+            if (overlay.onStop) {
+                overlay.onStop();
+            }
+            signOverlay = null;
+        }
+    };
+    signOverlay = overlay;
+    update();
+    return overlay;
+}
+
+function showSignTrack(videoElement, track) {
+    preloadAssets(track.assets);
+    createSignOverlay(videoElement, () => {
+        const cue = findCue(track.cues, videoElement.currentTime);
+        return cue ? track.assets[cue[2]] : null;
+    });
+    console.log(`🤟 Sign track overlay started (${track.cues.length} cues)`);
+}
+
+// Live translation: streams the video's audio to the backend and plays sign cues as they arrive
+const LIVE_SAMPLE_RATE = 16000;
+
+function toPcm16(input, inputRate) {
+    // Downsample by averaging each output sample's span, then convert to 16-bit PCM
+    const ratio = inputRate / LIVE_SAMPLE_RATE;
+    const output = new Int16Array(Math.floor(input.length / ratio));
+    for (let i = 0; i < output.length; i++) {
+        const from = Math.floor(i * ratio);
+        const to = Math.min(input.length, Math.floor((i + 1) * ratio));
+        let sum = 0;
+        for (let j = from; j < to; j++) {
+            sum += input[j];
+        }
+        const sample = Math.max(-1, Math.min(1, sum / Math.max(1, to - from)));
+        output[i] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+    }
+    return output;
+}
+
+function startLiveTranslation(videoElement, backendUrl) {
+    const socket = new WebSocket(`${backendUrl.replace(/^http/, "ws")}/live`);
+    socket.binaryType = "arraybuffer";
+
+    // Route the element's audio through Web Audio (it keeps playing through ctx.destination)
+    if (!videoElement._signAudio) {
+        const context = new AudioContext();
+        const source = context.createMediaElementSource(videoElement);
+        source.connect(context.destination);
+        videoElement._signAudio = { context, source };
+    }
+    const { context, source } = videoElement._signAudio;
+    const processor = context.createScriptProcessor(4096, 1, 1);
+    source.connect(processor);
+    processor.connect(context.destination);
+
+    function sendStart() {
+        if (socket.readyState === WebSocket.OPEN) {
+            socket.send(JSON.stringify({ type: "start", stream_time: videoElement.currentTime }));
+        }
+    }
+
+    processor.onaudioprocess = (e) => {
+        e.outputBuffer.getChannelData(0).fill(0);  // The processor itself stays silent
+        if (socket.readyState === WebSocket.OPEN && !videoElement.paused) {
+            socket.send(toPcm16(e.inputBuffer.getChannelData(0), context.sampleRate).buffer);
+        }
+    };
+    videoElement.addEventListener("seeked", sendStart);
+    socket.onopen = () => {
+        context.resume();
+        sendStart();
+        console.log("🎙 Live translation connected");
+    };
+
+    // Cues arrive shortly after they are spoken; play them in order, each for its own duration
+    const queue = [];
+    const assets = {};
+    let current = null;
+    let shownUntil = 0;
+
+    socket.onmessage = (e) => {
+        const message = JSON.parse(e.data);
+        if (message.type === "cues") {
+            const fresh = {};
+            for (const [sign, url] of Object.entries(message.assets)) {
+                fresh[sign] = assets[sign] = url.startsWith("/") ? `${backendUrl}${url}` : url;
+            }
+            preloadAssets(fresh);  // Backend URLs: relative ones would resolve against the page's origin
+            queue.push(...message.cues);
+        } else if (message.type === "error") {
+            console.error("❌ Live translation error:", message.detail);
+        }
+    };
+
+    const overlay = createSignOverlay(videoElement, () => {
+        const now = performance.now() / 1000;
+        if (now >= shownUntil) {
+            current = queue.shift() || null;
+            // Catch up when falling behind by showing queued signs faster
+            const speedup = Math.max(1, queue.length / 2);
+            shownUntil = current ? now + (current[1] - current[0]) / speedup : now;
+        }
+        return current ? assets[current[2]] : null;
+    });
+    overlay.onStop = () => {
+        videoElement.removeEventListener("seeked", sendStart);
+        processor.disconnect();
+        socket.close();
+    };
+    socket.onclose = () => {
+        console.log("🔌 Live translation disconnected");
+        if (signOverlay === overlay) {
+            overlay.stop();
+        }
+    };
+}
+
 // Listen for messages from popup.js
 chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
     console.log("📩 Message received in content.js:", request);
@@ -48,5 +225,29 @@ chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
         });
     }
 
+    if (request.action === "showSignTrack") {
+        let videoData = getVideoSource();
+
+        if (!videoData) {
+            sendResponse({ success: false, message: "No video found to overlay." });
+            return;
+        }
+
+        showSignTrack(videoData.videoElement, request.track);
+        sendResponse({ success: true });
+    }
+
+    if (request.action === "startLiveTranslation") {
+        let videoData = getVideoSource();
+
+        if (!videoData) {
+            sendResponse({ success: false, message: "No video found to translate." });
+            return;
+        }
+
+        startLiveTranslation(videoData.videoElement, request.backendUrl);
+        sendResponse({ success: true });
+    }
+
     return true; // Required for async sendResponse
 });
@@ -1,34 +1,208 @@
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import cv2
+import numpy as np
 
 # Path to the extracted frames
 frames_dir = "sign_language_data/datasets/Custom/frames"
 output_dir = "sign_language_data/datasets/Custom/processed_frames"
 
-# Ensure output directory exists
-os.makedirs(output_dir, exist_ok=True)
-
 # Resize dimensions
 IMG_SIZE = (224, 224)
 
-def resize_frames():
-    if not os.path.exists(frames_dir):
-        print(f"Error: Frames directory '{frames_dir}' not found.")
-        return
-
-    for img_name in os.listdir(frames_dir):
-        img_path = os.path.join(frames_dir, img_name)
-        img = cv2.imread(img_path)
-        
-        if img is None:
-            print(f"Warning: Skipping {img_name} (Not a valid image)")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+INTERPOLATIONS = {
+    "nearest": cv2.INTER_NEAREST,
+    "linear": cv2.INTER_LINEAR,
+    "cubic": cv2.INTER_CUBIC,
+    "area": cv2.INTER_AREA,
+    "lanczos": cv2.INTER_LANCZOS4,
+}
+
+# Manifest of processed frames, kept inside the output directory
+MANIFEST_NAME = ".resize_manifest.json"
+# Save the manifest every N processed frames so an interrupted run keeps its progress
+MANIFEST_SAVE_EVERY = 5000
+
+
+def list_frames(root):
+    """Relative paths of every image below `root`, in a stable order."""
+    frames = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                frames.append(os.path.relpath(os.path.join(dirpath, name), root))
+    return frames
+
+
+def load_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"settings": None, "frames": {}}
+
+
+def save_manifest(path, manifest):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def _resize_one(task):
+    """
+    Resizes a single frame. Runs in a pool worker.
+
+    The source is read once; its hash is compared with the previous run's so a
+    frame whose mtime changed but whose content did not is not re-encoded.
+
+    Returns:
+        Tuple of (relative path, status, manifest entry or None)
+    """
+    rel_path, src_path, out_path, size, interpolation, stat, previous_hash = task
+    try:
+        with open(src_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return rel_path, "invalid", None
+
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    entry = {"mtime_ns": stat[0], "size": stat[1], "hash": digest}
+    if digest == previous_hash and os.path.exists(out_path):
+        return rel_path, "unchanged", entry
+
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        return rel_path, "invalid", None
+
+    img_resized = cv2.resize(img, size, interpolation=interpolation)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    if not cv2.imwrite(out_path, img_resized):
+        return rel_path, "invalid", None
+    return rel_path, "resized", entry
+
+
+def resize_frames(src_dir=frames_dir, dst_dir=output_dir, size=IMG_SIZE, interpolation="linear", workers=None,
+                  force=False):
+    """
+    Resizes every frame below `src_dir` into `dst_dir`, keeping the folder layout.
+
+    Frames whose size and mtime match the manifest from the previous run are
+    skipped without being read, so a rerun after adding one clip only touches
+    the new frames. Changing the output size or interpolation reprocesses all.
+
+    Args:
+        src_dir: Folder of extracted frames
+        dst_dir: Folder for the resized frames
+        size: Output (width, height)
+        interpolation: One of `INTERPOLATIONS`
+        workers: Worker processes (None uses every core, 1 runs in-process)
+        force: Reprocess every frame regardless of the manifest
+
+    Returns:
+        Dict with counts per status and the elapsed time
+    """
+    if not os.path.exists(src_dir):
+        print(f"Error: Frames directory '{src_dir}' not found.")
+        return None
+    os.makedirs(dst_dir, exist_ok=True)
+
+    manifest_path = os.path.join(dst_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    settings = {"size": list(size), "interpolation": interpolation}
+    if force or manifest.get("settings") != settings:
+        manifest = {"settings": settings, "frames": {}}
+    entries = manifest["frames"]
+
+    started = time.perf_counter()
+    frames = list_frames(src_dir)
+    counts = {"resized": 0, "unchanged": 0, "skipped": 0, "invalid": 0, "removed": 0}
+
+    # Drop outputs whose source frame is gone
+    current = set(frames)
+    for rel_path in [p for p in entries if p not in current]:
+        del entries[rel_path]
+        try:
+            os.remove(os.path.join(dst_dir, rel_path))
+        except OSError:
+            pass
+        counts["removed"] += 1
+
+    tasks = []
+    for rel_path in frames:
+        src_path = os.path.join(src_dir, rel_path)
+        out_path = os.path.join(dst_dir, rel_path)
+        st = os.stat(src_path)
+        entry = entries.get(rel_path)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size \
+                and os.path.exists(out_path):
+            counts["skipped"] += 1
             continue
-        
-        img_resized = cv2.resize(img, IMG_SIZE)
-        output_path = os.path.join(output_dir, img_name)
-        cv2.imwrite(output_path, img_resized)
+        previous_hash = entry["hash"] if entry else None
+        tasks.append((rel_path, src_path, out_path, tuple(size), INTERPOLATIONS[interpolation],
+                      (st.st_mtime_ns, st.st_size), previous_hash))
+
+    total = len(tasks)
+    print(f"📂 {len(frames)} frame(s) found, {counts['skipped']} unchanged, {total} to process")
+    if not total:
+        save_manifest(manifest_path, manifest)
+        return {**counts, "seconds": time.perf_counter() - started}
+
+    workers = workers or os.cpu_count() or 1
+    report_every = max(1, min(1000, total // 20))
+    process_started = time.perf_counter()
+
+    def collect(results):
+        for done, (rel_path, status, entry) in enumerate(results, 1):
+            counts[status] += 1
+            if entry is None:
+                entries.pop(rel_path, None)
+                print(f"Warning: Skipping {rel_path} (Not a valid image)")
+            else:
+                entries[rel_path] = entry
+            if done % MANIFEST_SAVE_EVERY == 0:
+                save_manifest(manifest_path, manifest)
+            if done % report_every == 0 or done == total:
+                elapsed = time.perf_counter() - process_started
+                rate = done / elapsed if elapsed else 0.0
+                eta = (total - done) / rate if rate else 0.0
+                print(f"⏳ {done}/{total} ({done * 100 // total}%) - {rate:.0f} frames/s, ETA {eta:.0f}s")
+
+    try:
+        if workers == 1:
+            collect(map(_resize_one, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                collect(executor.map(_resize_one, tasks, chunksize=max(1, min(256, total // (workers * 8)))))
+    finally:
+        save_manifest(manifest_path, manifest)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Frames resized and saved successfully: {counts['resized']} resized, "
+          f"{counts['skipped'] + counts['unchanged']} unchanged, {counts['invalid']} invalid "
+          f"in {elapsed:.1f}s ({total / elapsed:.0f} frames/s)")
+    return {**counts, "seconds": elapsed}
 
-    print("✅ Frames resized and saved successfully.")
 
 if __name__ == "__main__":
-    resize_frames()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resize extracted frames in parallel, skipping unchanged ones")
+    parser.add_argument("--frames", default=frames_dir, help="Folder of extracted frames")
+    parser.add_argument("--output", default=output_dir, help="Folder for the resized frames")
+    parser.add_argument("--size", type=int, nargs=2, default=IMG_SIZE, metavar=("WIDTH", "HEIGHT"),
+                        help="Output frame size")
+    parser.add_argument("--interpolation", choices=sorted(INTERPOLATIONS), default="linear",
+                        help="Resize interpolation")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="Reprocess every frame")
+    args = parser.parse_args()
+
+    resize_frames(args.frames, args.output, tuple(args.size), args.interpolation, args.workers, args.force)
@@ -0,0 +1,7 @@
+# File names inside a shard folder, shared by the writers and the loaders
+# without pulling in their dependencies (cv2, mediapipe)
+
+# Frame shard index written by video_to_frames.py
+INDEX_NAME = "index.json"
+# Hand landmark store written by hand_landmarks.py
+LANDMARKS_NAME = "landmarks.bin"
@@ -0,0 +1,261 @@
+import json
+import os
+import queue
+import threading
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from dataset_files import INDEX_NAME, LANDMARKS_NAME
+from hand_landmarks import LandmarkStore
+
+
+class ShardedFrameDataset:
+    dtype = np.uint8
+
+    def __init__(self, shards_dir):
+        """
+        Memory-mapped view of the frame shards written by `video_to_frames.py`.
+
+        Shards are mapped read-only, so opening a dataset costs nothing up front
+        and frames are paged in by the OS as batches touch them.
+
+        Args:
+            shards_dir: Folder holding `index.json` and the shard files
+        """
+        self.shards_dir = shards_dir
+        with open(os.path.join(shards_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+
+        width, height = self.index["frame_size"]
+        self.frame_shape = (height, width, 3)
+        self.sample_shape = self.frame_shape
+        self.labels: List[str] = self.index["labels"]
+        label_ids = {label: i for i, label in enumerate(self.labels)}
+
+        self.shards = [
+            np.memmap(os.path.join(shards_dir, shard["file"]), dtype=np.uint8, mode="r",
+                      shape=(shard["count"], *self.frame_shape))
+            for shard in self.index["shards"]
+        ]
+        # Per-frame label ids, one array per shard
+        self.shard_labels = [np.empty(shard["count"], np.int32) for shard in self.index["shards"]]
+        for video in self.index["videos"]:
+            self.shard_labels[video["shard"]][video["offset"]:video["offset"] + video["count"]] = \
+                label_ids[video["label"]]
+
+    def __len__(self) -> int:
+        return self.index["frame_count"]
+
+    @property
+    def num_classes(self) -> int:
+        return len(self.labels)
+
+    def take(self, shard: int, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Frames and label ids at `offsets` of one shard, copied with a single fancy index."""
+        offsets = np.sort(offsets)  # Sequential page access
+        return self.shards[shard][offsets], self.shard_labels[shard][offsets]
+
+
+class LandmarkDataset:
+    dtype = np.float32
+
+    def __init__(self, path, hands_only: bool = True, shard_frames: int = 4096):
+        """
+        Memory-mapped view of the hand keypoints written by `hand_landmarks.py`,
+        served through the same `DataLoader` as the frames.
+
+        The store is one contiguous array, so it is split into virtual shards of
+        `shard_frames` frames for the loader's shard-level shuffling.
+
+        Args:
+            path: Landmark file, or the shard folder holding `landmarks.bin`
+            hands_only: Skip frames where no hand was detected
+            shard_frames: Frames per virtual shard
+        """
+        if os.path.isdir(path):
+            path = os.path.join(path, LANDMARKS_NAME)
+        self.store = LandmarkStore(path)
+        self.sample_shape = self.store.keypoints.shape[1:]  # 2 hands x 21 landmarks x xyz
+        self.labels: List[str] = self.store.labels
+
+        rows = np.arange(len(self.store))
+        if hands_only:
+            rows = rows[np.asarray(self.store.scores).max(axis=1) > 0]
+        # Frame rows of each virtual shard, in store order
+        self.shards = [rows[start:start + shard_frames] for start in range(0, len(rows), shard_frames)]
+        self._count = len(rows)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def num_classes(self) -> int:
+        return len(self.labels)
+
+    def take(self, shard: int, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Keypoints and label ids at `offsets` of one virtual shard, copied with a single fancy index."""
+        rows = self.shards[shard][np.sort(offsets)]
+        return self.store.keypoints[rows], self.store.frame_labels[rows]
+
+
+class DataLoader:
+    def __init__(
+        self,
+        dataset: Union[ShardedFrameDataset, LandmarkDataset],
+        batch_size: int = 32,
+        shuffle: bool = True,
+        shards_per_window: int = 4,
+        prefetch: int = 4,
+        workers: int = 2,
+        transform: Optional[Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]] = None,
+        drop_last: bool = False,
+        seed: Optional[int] = None,
+    ):
+        """
+        Batches over a `ShardedFrameDataset` or `LandmarkDataset`, assembled
+        ahead of time on background threads.
+
+        Shuffling happens at two levels: shard order is permuted every epoch,
+        and samples are shuffled within a window of `shards_per_window` shards,
+        so each batch mixes several shards while reads stay local to a few
+        mapped files.
+
+        Args:
+            dataset: Dataset to read from
+            batch_size: Samples per batch
+            shuffle: Shuffle shards and samples every epoch
+            shards_per_window: Shards whose samples are shuffled together
+            prefetch: Batches prepared ahead of the consumer
+            workers: Threads assembling batches
+            transform: Optional `(samples, labels) -> (samples, labels)` applied on the worker threads
+            drop_last: Drop the final incomplete batch
+            seed: Seed for reproducible shuffling
+        """
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.shards_per_window = max(1, shards_per_window)
+        self.prefetch = max(1, prefetch)
+        self.workers = max(1, workers)
+        self.transform = transform
+        self.drop_last = drop_last
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        count = len(self.dataset)
+        return count // self.batch_size if self.drop_last else -(-count // self.batch_size)
+
+    def batch_plan(self) -> Iterator[np.ndarray]:
+        """
+        Yields each batch of the epoch as an array of (shard, offset) rows,
+        without touching any frame data.
+        """
+        order = np.arange(len(self.dataset.shards))
+        if self.shuffle:
+            self._rng.shuffle(order)
+
+        leftover = np.empty((0, 2), np.int64)
+        for start in range(0, len(order), self.shards_per_window):
+            window = order[start:start + self.shards_per_window]
+            samples = np.concatenate([leftover] + [
+                np.column_stack((np.full(len(self.dataset.shards[s]), s), np.arange(len(self.dataset.shards[s]))))
+                for s in window
+            ])
+            if self.shuffle:
+                samples = samples[self._rng.permutation(len(samples))]
+            full = len(samples) // self.batch_size * self.batch_size
+            for i in range(0, full, self.batch_size):
+                yield samples[i:i + self.batch_size]
+            leftover = samples[full:]
+        if len(leftover) and not self.drop_last:
+            yield leftover
+
+    def _assemble(self, plan: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        frames = np.empty((len(plan), *self.dataset.sample_shape), self.dataset.dtype)
+        labels = np.empty(len(plan), np.int32)
+        for shard in np.unique(plan[:, 0]):
+            rows = np.flatnonzero(plan[:, 0] == shard)
+            rows = rows[np.argsort(plan[rows, 1])]  # Match `take`'s sorted order
+            frames[rows], labels[rows] = self.dataset.take(int(shard), plan[rows, 1])
+        if self.transform:
+            frames, labels = self.transform(frames, labels)
+        return frames, labels
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yields `(samples, labels)` batches for one epoch, in plan order: uint8
+        frames of shape N x H x W x 3 (BGR), or float32 keypoints of shape
+        N x 2 x 21 x 3 from a `LandmarkDataset`, with int32 label ids.
+        """
+        plans = self.batch_plan()
+        ready: "queue.Queue" = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        lock = threading.Lock()
+        # Each worker claims the next plan under the lock and waits its turn to
+        # publish, so batches come out in plan order
+        turn = threading.Condition()
+        state = {"next": 0, "published": 0, "done": False}
+
+        def work():
+            while not stop.is_set():
+                with lock:
+                    if state["done"]:
+                        return
+                    plan = next(plans, None)
+                    if plan is None:
+                        state["done"] = True
+                        number = state["next"]
+                    else:
+                        number = state["next"]
+                        state["next"] += 1
+                if plan is None:
+                    item = StopIteration
+                else:
+                    try:
+                        item = self._assemble(plan)
+                    except Exception as e:
+                        item = e
+                with turn:
+                    turn.wait_for(lambda: state["published"] == number or stop.is_set())
+                    if stop.is_set():
+                        return
+                    while not stop.is_set():
+                        try:
+                            ready.put(item, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if item is not StopIteration:
+                        state["published"] += 1
+                    turn.notify_all()
+                if item is StopIteration:
+                    return
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = ready.get()
+                if item is StopIteration:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            with turn:
+                turn.notify_all()
+            for thread in threads:
+                thread.join()
+
+    def generator(self, epochs: Optional[int] = 1) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Plain generator over `epochs` epochs (None repeats forever), e.g. for
+        `tf.data.Dataset.from_generator(loader.generator, ...)`.
+        """
+        epoch = 0
+        while epochs is None or epoch < epochs:
+            yield from self
+            epoch += 1
@@ -0,0 +1,110 @@
+import logging
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+import config
+from sign_lexicon import normalize_token
+
+logger = logging.getLogger(__name__)
+
+
+class Fingerspeller:
+    def __init__(
+        self,
+        letter_frames: Callable[[str], Tuple[Optional[np.ndarray], Optional[int]]],
+        frame_ms: int = 100,
+        letter_ms: int = config.FINGERSPELL_LETTER_MS,
+        transition_ms: int = config.FINGERSPELL_TRANSITION_MS,
+        cache_size: int = config.FINGERSPELL_CACHE_SIZE,
+    ):
+        """
+        Builds fingerspelling clips for words that have no sign of their own.
+
+        Args:
+            letter_frames: Returns (BGR frames, frame duration in ms) for a letter, or (None, None)
+            frame_ms: Frame duration of the generated clips
+            letter_ms: How long each letter is shown
+            transition_ms: Cross-fade between consecutive letters
+            cache_size: Number of composed words kept in the LRU cache
+        """
+        self.letter_frames = letter_frames
+        self.frame_ms = frame_ms
+        self.letter_ms = letter_ms
+        self.transition_ms = transition_ms
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # word -> composed frames
+        self._letters = {}  # letter -> resampled frames (None if missing)
+
+    def can_spell(self, word: str) -> bool:
+        letters = self._letters_of(word)
+        return bool(letters) and all(self._letter(letter) is not None for letter in letters)
+
+    def clear(self):
+        """Drops the cached letter clips and composed words, e.g. after the sign assets changed."""
+        self._cache.clear()
+        self._letters.clear()
+
+    @staticmethod
+    def _letters_of(word: str) -> str:
+        return "".join(ch for ch in normalize_token(word) if ch.isalpha())
+
+    def _letter(self, letter: str) -> Optional[np.ndarray]:
+        """A letter's clip resampled to `letter_ms` at `frame_ms` per frame."""
+        if letter not in self._letters:
+            frames, _ = self.letter_frames(letter)
+            if frames is None or not len(frames):
+                self._letters[letter] = None
+            else:
+                count = max(1, round(self.letter_ms / self.frame_ms))
+                picks = np.linspace(0, len(frames) - 1, count).round().astype(int)
+                self._letters[letter] = np.asarray(frames)[picks]
+        return self._letters[letter]
+
+    def spell(self, word: str) -> Optional[np.ndarray]:
+        """
+        Returns the BGR frames fingerspelling `word` (played at `frame_ms`), or
+        None if the word has no letters or a letter sign is missing.
+        """
+        letters = self._letters_of(word)
+        if not letters:
+            return None
+
+        frames = self._cache.get(letters)
+        if frames is not None:
+            self._cache.move_to_end(letters)
+            return frames
+
+        clips = [self._letter(letter) for letter in letters]
+        if any(clip is None for clip in clips):
+            missing = sorted({l for l, clip in zip(letters, clips) if clip is None})
+            logger.warning(f"Cannot fingerspell '{word}': missing letter sign(s) {missing}")
+            return None
+
+        frames = self._compose(clips)
+        self._cache[letters] = frames
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return frames
+
+    def _compose(self, clips) -> np.ndarray:
+        height, width = clips[0].shape[1:3]
+        clips = [
+            clip if clip.shape[1:3] == (height, width)
+            else np.stack([cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA) for frame in clip])
+            for clip in clips
+        ]
+
+        fade = round(self.transition_ms / self.frame_ms)
+        parts = [clips[0]]
+        if fade > 0:
+            # Blend weights for the cross-fade frames, excluding the pure endpoints
+            alphas = np.linspace(0, 1, fade + 2, dtype=np.float32)[1:-1, None, None, None]
+        for clip in clips[1:]:
+            if fade > 0:
+                a, b = parts[-1][-1].astype(np.float32), clip[0].astype(np.float32)
+                parts.append(((1 - alphas) * a + alphas * b).astype(np.uint8))
+            parts.append(clip)
+        return np.concatenate(parts)
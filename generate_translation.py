@@ -1,49 +1,80 @@
-import sys
-import subprocess
 import os
+import sys
+import uuid
 
-def run_stt_model(video_url):
-    """
-    Runs the STT model to extract audio from the video and convert it to text.
-    Saves the output in 'transcription.txt'.
-    """
-    stt_command = ["python", "stt_model.py", video_url]
-    result = subprocess.run(stt_command, capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        print(f"Error in STT Model: {result.stderr}", file=sys.stderr)
-        sys.exit(1)
-    
-    print(f"STT Output: {result.stdout}")
+import config
+from sign_track import build_sign_track
+from stt import SpeechToText
+from tts import TextToSign
 
-def run_tts_model():
-    """
-    Runs the TTS model using 'transcription.txt' to generate sign language video.
+
+def generate_translation(video_url, stt=None, tts=None, progress=None, model_size=None, render_video=False,
+                         output_path=None):
     """
-    if not os.path.exists("transcription.txt"):
-        print("Error: transcription.txt not found.", file=sys.stderr)
-        sys.exit(1)
-    
-    tts_command = ["python", "tts_model.py"]
-    result = subprocess.run(tts_command, capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        print(f"Error in TTS Model: {result.stderr}", file=sys.stderr)
-        sys.exit(1)
-    
-    return result.stdout.strip()
+    Runs the full translation pipeline in-process: speech-to-text on the video,
+    then maps the timed words of the transcription to sign language GIFs.
 
-def generate_translation(video_url):
+    Already-loaded `SpeechToText`/`TextToSign` instances can be passed in so the
+    Whisper model is not reloaded for every video. `progress(stage, **info)` is
+    called as each stage advances. `model_size` overrides the Whisper model
+    for this video only. The result always carries a sign track (timed cues and
+    asset URLs) a client can overlay on the original video. With `render_video`,
+    the signs are also encoded into a video at `output_path` (a fresh file in
+    `config.RENDER_OUTPUT_DIR` by default).
+    """
     print(f"Processing video: {video_url}")
-    run_stt_model(video_url)
-    sign_language_video = run_tts_model()
-    return sign_language_video
+    stt = stt or SpeechToText(
+        model_size=config.WHISPER_MODEL_SIZE,
+        ffmpeg_path=config.FFMPEG_PATH,
+        language=config.WHISPER_LANGUAGE,
+    )
+    tts = tts or TextToSign(None, config.SIGN_GIF_FOLDER)
+
+    # Stages hand their outputs over in memory; nothing is written to shared paths,
+    # so any number of translations can run side by side
+    timeline = stt.transcribe(video_url, progress=progress, model_size=model_size)
+    if timeline is None:
+        raise RuntimeError(f"Transcription failed for: {video_url}")
+
+    if progress:
+        progress("sign_assembly", status="started")
+    signs = tts.timeline_to_signs(timeline)
+    if progress:
+        progress("sign_assembly", status="done", signs=len(signs))
+
+    translation = {
+        "text": timeline.text,
+        "timeline": timeline.to_dict(),
+        "signs": signs,
+        "track": build_sign_track(signs, tts),
+    }
+
+    if render_video:
+        output_path = output_path or os.path.join(config.RENDER_OUTPUT_DIR, f"{uuid.uuid4().hex}.mp4")
+        if progress:
+            progress("rendering", status="started")
+        try:
+            translation["video"] = tts.render_video(signs, output_path, progress=progress)
+        except BaseException:
+            if os.path.exists(output_path):
+                os.remove(output_path)  # Never leave a half-written video behind
+            raise
+        if progress:
+            progress("rendering", status="done")
+
+    return translation
+
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Error: No video URL provided.", file=sys.stderr)
         sys.exit(1)
-    
+
     video_url = sys.argv[1]
-    output_video = generate_translation(video_url)
-    print(f"Generated Sign Language Video: {output_video}")
+    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    try:
+        translation = generate_translation(video_url, render_video=True, output_path=output_path)
+    except (RuntimeError, OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Generated Sign Language Video: {translation['video']}")
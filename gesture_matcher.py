@@ -0,0 +1,230 @@
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Largest query x template distance block computed at once (float32 bytes)
+MATCH_BLOCK_BYTES = 64 * 1024 * 1024
+# Vocabulary size from which queries go through the approximate inverted-file index
+IVF_MIN_TEMPLATES = 20000
+# Clusters of the inverted-file index searched per query
+IVF_PROBES = 8
+# k-means iterations when (re)training the inverted-file index
+IVF_TRAIN_ITERATIONS = 10
+
+
+def landmark_features(keypoints: np.ndarray) -> np.ndarray:
+    """
+    Normalizes hand landmarks into matching features: positions relative to
+    the wrist, scaled by hand size, so templates match regardless of where
+    the hand is in the frame or how far it is from the camera.
+
+    Args:
+        keypoints: (..., 21, 3) landmarks or (..., 63) flattened landmarks
+
+    Returns:
+        float32 features of shape (..., 63)
+    """
+    points = np.asarray(keypoints, np.float32)
+    points = points.reshape(*points.shape[:-1], 21, 3) if points.shape[-1] == 63 else points
+    relative = points - points[..., :1, :]
+    scale = np.linalg.norm(relative, axis=-1).max(axis=-1)[..., None, None]
+    relative = relative / np.where(scale > 0, scale, 1)
+    return relative.reshape(*relative.shape[:-2], -1)
+
+
+def _nearest_squared(queries: np.ndarray, templates: np.ndarray,
+                     norms: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Nearest template index and squared distance for each query, by brute force in bounded blocks."""
+    block = max(1, MATCH_BLOCK_BYTES // (4 * len(templates)))
+    indices = np.empty(len(queries), np.intp)
+    squared = np.empty(len(queries), np.float32)
+    for start in range(0, len(queries), block):
+        q = queries[start:start + block]
+        # ||q - t||^2 = ||q||^2 + ||t||^2 - 2 q.t, for every pair at once
+        distances = np.einsum("ij,ij->i", q, q)[:, None] + norms[None, :] - 2 * q @ templates.T
+        nearest = distances.argmin(axis=1)
+        indices[start:start + block] = nearest
+        squared[start:start + block] = np.maximum(distances[np.arange(len(q)), nearest], 0)
+    return indices, squared
+
+
+def _groups(keys: np.ndarray, values: np.ndarray):
+    """(key, values with that key) pairs, one per distinct key."""
+    order = np.argsort(keys, kind="stable")
+    unique, starts = np.unique(keys[order], return_index=True)
+    return zip(unique, np.split(values[order], starts[1:]))
+
+
+class GestureMatcher:
+    def __init__(self, dim: int, max_distance: Optional[float] = None,
+                 ivf_min_templates: int = IVF_MIN_TEMPLATES, probes: int = IVF_PROBES):
+        """
+        Nearest-template gesture classifier.
+
+        Templates live in one contiguous float32 matrix (grown by doubling), so
+        a batch of queries is matched exactly with one blocked matrix product.
+        From `ivf_min_templates` on, queries only scan the templates of their
+        `probes` nearest k-means clusters (an approximate inverted-file index).
+
+        Args:
+            dim: Feature dimension of every template
+            max_distance: Matches farther than this are reported as no match (None label)
+            ivf_min_templates: Templates needed before switching to the inverted-file index
+            probes: Clusters searched per query by the inverted-file index
+        """
+        self.dim = dim
+        self.max_distance = max_distance
+        self.ivf_min_templates = ivf_min_templates
+        self.probes = probes
+        self._templates = np.empty((64, dim), np.float32)
+        self._norms = np.empty(64, np.float32)  # Squared norm per template
+        self._labels = np.empty(64, dtype=object)
+        self._count = 0
+        self._centroids = None  # Inverted-file index: cluster centres ...
+        self._centroid_norms = None
+        self._lists = []        # ... and the template indices of each cluster
+        self._trained_at = 0    # Templates when the clusters were last trained
+
+    @classmethod
+    def from_dict(cls, gestures: Dict[str, Sequence[float]], **kwargs) -> "GestureMatcher":
+        """Matcher over a {label: feature vector} mapping."""
+        vectors = np.asarray(list(gestures.values()), np.float32)
+        matcher = cls(vectors.shape[1], **kwargs)
+        matcher.add(list(gestures.keys()), vectors)
+        return matcher
+
+    @classmethod
+    def from_landmarks(cls, store, **kwargs) -> "GestureMatcher":
+        """
+        Matcher with one template per video of a `hand_landmarks.LandmarkStore`:
+        the mean normalized features of the frames where a hand was found.
+        """
+        features, has_hand = store.hand_features()
+        features = landmark_features(features)
+        labels, vectors = [], []
+        for video in store.videos:
+            frames = slice(video["start"], video["start"] + video["count"])
+            if has_hand[frames].any():
+                labels.append(video["label"])
+                vectors.append(features[frames][has_hand[frames]].mean(axis=0))
+        matcher = cls(features.shape[1], **kwargs)
+        if vectors:
+            matcher.add(labels, np.stack(vectors))
+        return matcher
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def templates(self) -> np.ndarray:
+        return self._templates[:self._count]
+
+    @property
+    def labels(self) -> np.ndarray:
+        return self._labels[:self._count]
+
+    def add(self, labels: Iterable[str], vectors: np.ndarray):
+        """Appends templates; several templates may share a label."""
+        vectors = np.asarray(vectors, np.float32).reshape(-1, self.dim)
+        labels = list(labels)
+        if len(labels) != len(vectors):
+            raise ValueError(f"Got {len(labels)} label(s) for {len(vectors)} template(s)")
+
+        needed = self._count + len(vectors)
+        if needed > len(self._templates):
+            capacity = max(needed, 2 * len(self._templates))
+            for name in ("_templates", "_norms", "_labels"):
+                old = getattr(self, name)
+                new = np.empty((capacity, *old.shape[1:]), old.dtype)
+                new[:self._count] = old[:self._count]
+                setattr(self, name, new)
+
+        end = self._count + len(vectors)
+        self._templates[self._count:end] = vectors
+        self._norms[self._count:end] = np.einsum("ij,ij->i", vectors, vectors)
+        self._labels[self._count:end] = labels
+        start, self._count = self._count, end
+
+        if self._count >= self.ivf_min_templates:
+            if self._centroids is None or self._count >= 2 * self._trained_at:
+                self._train()  # Retrain as the vocabulary doubles, so clusters stay balanced
+            else:
+                self._index(np.arange(start, end))
+
+    # --- Inverted-file index ---
+
+    def _train(self):
+        """Clusters the templates with k-means (on a sample) and rebuilds the cluster lists."""
+        rng = np.random.default_rng(0)
+        clusters = int(np.sqrt(self._count))
+        sample = self.templates[rng.choice(self._count, min(self._count, 64 * clusters), replace=False)]
+        centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+        for _ in range(IVF_TRAIN_ITERATIONS):
+            nearest, _ = _nearest_squared(sample, centroids, np.einsum("ij,ij->i", centroids, centroids))
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, nearest, sample)
+            counts = np.bincount(nearest, minlength=clusters)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+        self._centroids = centroids
+        self._centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+        self._lists = [np.empty(0, np.intp) for _ in range(clusters)]
+        self._trained_at = self._count
+        self._index(np.arange(self._count))
+
+    def _index(self, rows: np.ndarray):
+        """Adds templates to the list of their nearest cluster."""
+        nearest, _ = _nearest_squared(self._templates[rows], self._centroids, self._centroid_norms)
+        for cluster, members in _groups(nearest, rows):
+            self._lists[cluster] = np.concatenate((self._lists[cluster], members))
+
+    def _search_index(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate nearest template index and squared distance, scanning `probes` clusters per query."""
+        probes = min(self.probes, len(self._centroids))
+        squared = (np.einsum("ij,ij->i", queries, queries)[:, None] + self._centroid_norms[None, :]
+                   - 2 * queries @ self._centroids.T)
+        probed = np.argpartition(squared, probes - 1, axis=1)[:, :probes]
+        owners = np.repeat(np.arange(len(queries)), probes)
+
+        indices = np.zeros(len(queries), np.intp)
+        best = np.full(len(queries), np.inf, np.float32)
+        # Each probed cluster is scanned once, for all the queries probing it
+        for cluster, rows in _groups(probed.ravel(), owners):
+            members = self._lists[cluster]
+            if not len(members):
+                continue
+            nearest, distances = _nearest_squared(queries[rows], self._templates[members], self._norms[members])
+            closer = distances < best[rows]
+            best[rows[closer]] = distances[closer]
+            indices[rows[closer]] = members[nearest[closer]]
+
+        missed = np.flatnonzero(np.isinf(best))  # Only empty clusters probed
+        if len(missed):
+            indices[missed], best[missed] = _nearest_squared(queries[missed], self.templates,
+                                                             self._norms[:self._count])
+        return indices, best
+
+    def match(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Classifies a batch of feature vectors.
+
+        Args:
+            queries: (N, dim) features, or a single (dim,) vector
+
+        Returns:
+            Tuple of (labels, distances) with one entry per query; labels are
+            None where no template is within `max_distance`
+        """
+        queries = np.asarray(queries, np.float32).reshape(-1, self.dim)
+        if not self._count:
+            return np.full(len(queries), None, dtype=object), np.full(len(queries), np.inf, np.float32)
+
+        if self._centroids is None:
+            indices, squared = _nearest_squared(queries, self.templates, self._norms[:self._count])
+        else:
+            indices, squared = self._search_index(queries)
+        distances = np.sqrt(squared)
+        labels = self._labels[indices]
+        if self.max_distance is not None:
+            labels = np.where(distances <= self.max_distance, labels, None)
+        return labels, distances
@@ -0,0 +1,228 @@
+import json
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
+
+import numpy as np
+
+from dataset_files import INDEX_NAME, LANDMARKS_NAME
+
+# File layout: fixed header | keypoints (float32, N x 2 x 21 x 3) | scores (float32, N x 2)
+#              | handedness (int8, N x 2) | JSON index
+_MAGIC = b"HANDLMK1"
+_HEADER = struct.Struct("<8sQQ")  # magic, index offset, index length
+_DATA_OFFSET = 4096
+
+NUM_HANDS = 2
+NUM_LANDMARKS = 21
+# Hand slots: slot 0 holds the left hand, slot 1 the right (as classified by MediaPipe)
+LEFT, RIGHT, NO_HAND = 0, 1, -1
+
+# Frames per task sent to a worker
+CHUNK_FRAMES = 256
+
+_hands = None
+_shards = None
+
+
+def _init_worker(shards_dir, shards, min_detection_confidence):
+    global _hands, _shards
+    import mediapipe as mp
+
+    _hands = mp.solutions.hands.Hands(
+        static_image_mode=True, max_num_hands=NUM_HANDS, min_detection_confidence=min_detection_confidence
+    )
+    _shards = [(os.path.join(shards_dir, shard["file"]), shard["count"]) for shard in shards]
+
+
+def _extract_chunk(task):
+    """Runs MediaPipe Hands over frames [start, stop) of one shard in a pool worker."""
+    import cv2
+
+    shard, start, stop, frame_shape = task
+    path, count = _shards[shard]
+    frames = np.memmap(path, dtype=np.uint8, mode="r", shape=(count, *frame_shape))[start:stop]
+
+    keypoints = np.zeros((len(frames), NUM_HANDS, NUM_LANDMARKS, 3), np.float32)
+    scores = np.zeros((len(frames), NUM_HANDS), np.float32)
+    handedness = np.full((len(frames), NUM_HANDS), NO_HAND, np.int8)
+    for i, frame in enumerate(frames):
+        result = _hands.process(cv2.cvtColor(np.asarray(frame), cv2.COLOR_BGR2RGB))
+        if not result.multi_hand_landmarks:
+            continue
+        for landmarks, classification in zip(result.multi_hand_landmarks, result.multi_handedness):
+            label = classification.classification[0]
+            slot = LEFT if label.label == "Left" else RIGHT
+            if label.score <= scores[i, slot]:
+                continue  # Keep the more confident of two hands with the same side
+            keypoints[i, slot] = [[lm.x, lm.y, lm.z] for lm in landmarks.landmark]
+            scores[i, slot] = label.score
+            handedness[i, slot] = slot
+    return shard, start, keypoints, scores, handedness
+
+
+def extract_landmarks(shards_dir, output_path=None, workers=None, min_detection_confidence=0.5) -> dict:
+    """
+    Runs MediaPipe Hands once over every frame of a shard set and stores the
+    landmarks next to it.
+
+    Args:
+        shards_dir: Folder written by `video_to_frames.py`
+        output_path: Landmark file (default: `<shards_dir>/landmarks.bin`)
+        workers: Processes running MediaPipe (None uses every core)
+        min_detection_confidence: MediaPipe hand detection threshold
+
+    Returns:
+        The landmark index
+    """
+    with open(os.path.join(shards_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+        frame_index = json.load(f)
+    output_path = output_path or os.path.join(shards_dir, LANDMARKS_NAME)
+    width, height = frame_index["frame_size"]
+    frame_shape = (height, width, 3)
+
+    shards = frame_index["shards"]
+    shard_starts = np.concatenate([[0], np.cumsum([shard["count"] for shard in shards])]).astype(int)
+    total = int(shard_starts[-1])
+
+    offsets = {"keypoints": _DATA_OFFSET}
+    offsets["scores"] = offsets["keypoints"] + total * NUM_HANDS * NUM_LANDMARKS * 3 * 4
+    offsets["handedness"] = offsets["scores"] + total * NUM_HANDS * 4
+    index_offset = offsets["handedness"] + total * NUM_HANDS
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.truncate(index_offset)
+    keypoints, scores, handedness = _open_arrays(tmp_path, offsets, total, "r+")
+
+    tasks = [
+        (s, start, min(start + CHUNK_FRAMES, shard["count"]), frame_shape)
+        for s, shard in enumerate(shards)
+        for start in range(0, shard["count"], CHUNK_FRAMES)
+    ]
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    done = 0
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(shards_dir, shards, min_detection_confidence)
+    ) as executor:
+        for shard, start, chunk_keypoints, chunk_scores, chunk_handedness in executor.map(_extract_chunk, tasks):
+            begin = shard_starts[shard] + start
+            end = begin + len(chunk_keypoints)
+            keypoints[begin:end], scores[begin:end], handedness[begin:end] = \
+                chunk_keypoints, chunk_scores, chunk_handedness
+            done += len(chunk_keypoints)
+            elapsed = time.perf_counter() - started
+            print(f"⏳ {done}/{total} frames - {done / elapsed:.0f} frames/s")
+    for array in (keypoints, scores, handedness):
+        array.flush()
+    del keypoints, scores, handedness
+
+    videos = [
+        {"video": video["video"], "label": video["label"],
+         "start": int(shard_starts[video["shard"]]) + video["offset"], "count": video["count"]}
+        for video in frame_index["videos"]
+    ]
+    index = {
+        "frame_count": total,
+        "num_hands": NUM_HANDS,
+        "num_landmarks": NUM_LANDMARKS,
+        "offsets": offsets,
+        "labels": frame_index["labels"],
+        "videos": videos,
+    }
+    index_bytes = json.dumps(index).encode("utf-8")
+    with open(tmp_path, "r+b") as f:
+        f.seek(index_offset)
+        f.write(index_bytes)
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, index_offset, len(index_bytes)))
+    os.replace(tmp_path, output_path)
+
+    print(f"✅ Stored hand landmarks for {total} frame(s): {output_path}")
+    return index
+
+
+def _open_arrays(path, offsets, total, mode):
+    keypoints = np.memmap(path, dtype=np.float32, mode=mode, offset=offsets["keypoints"],
+                          shape=(total, NUM_HANDS, NUM_LANDMARKS, 3))
+    scores = np.memmap(path, dtype=np.float32, mode=mode, offset=offsets["scores"], shape=(total, NUM_HANDS))
+    handedness = np.memmap(path, dtype=np.int8, mode=mode, offset=offsets["handedness"], shape=(total, NUM_HANDS))
+    return keypoints, scores, handedness
+
+
+class LandmarkStore:
+    def __init__(self, path):
+        """
+        Read-only, memory-mapped view of a landmark file built by `extract_landmarks`.
+
+        Attributes:
+            keypoints: float32 array (frames x 2 hands x 21 landmarks x xyz); zeros where no hand
+            scores: float32 array (frames x 2) of handedness confidence; 0 where no hand
+            handedness: int8 array (frames x 2) of LEFT/RIGHT, or NO_HAND
+            frame_labels: int32 array of label ids per frame (see `labels`)
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            magic, index_offset, index_length = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"Not a landmark store: {path}")
+            f.seek(index_offset)
+            self.index = json.loads(f.read(index_length))
+
+        total = self.index["frame_count"]
+        self.keypoints, self.scores, self.handedness = _open_arrays(path, self.index["offsets"], total, "r")
+        self.labels = self.index["labels"]
+        self.videos = self.index["videos"]
+        label_ids = {label: i for i, label in enumerate(self.labels)}
+        self.frame_labels = np.empty(total, np.int32)
+        for video in self.videos:
+            self.frame_labels[video["start"]:video["start"] + video["count"]] = label_ids[video["label"]]
+
+    def __len__(self) -> int:
+        return self.index["frame_count"]
+
+    def video_frames(self, video: str) -> slice:
+        """Frame range of a video in the store."""
+        for entry in self.videos:
+            if entry["video"] == video:
+                return slice(entry["start"], entry["start"] + entry["count"])
+        raise KeyError(video)
+
+    def hand_features(self, frames=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-frame features of the most confident hand, flattened to 63 values
+        as `tty2.py` feeds the classifier.
+
+        Args:
+            frames: Optional frame indices or slice (default: every frame)
+
+        Returns:
+            Tuple of (float32 features N x 63, bool mask of frames with a hand)
+        """
+        frames = slice(None) if frames is None else frames
+        scores = np.asarray(self.scores[frames])
+        best = scores.argmax(axis=1)
+        keypoints = np.asarray(self.keypoints[frames])[np.arange(len(best)), best]
+        return keypoints.reshape(len(best), -1), scores.max(axis=1) > 0
+
+    def training_arrays(self, frames=None) -> Tuple[np.ndarray, np.ndarray]:
+        """(features, label ids) for the frames with a detected hand, ready for `model.fit`."""
+        features, has_hand = self.hand_features(frames)
+        labels = self.frame_labels[slice(None) if frames is None else frames]
+        return features[has_hand], labels[has_hand]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute MediaPipe hand landmarks for a frame shard set")
+    parser.add_argument("shards", help="Folder written by video_to_frames.py")
+    parser.add_argument("--out", help=f"Landmark file (default: <shards>/{LANDMARKS_NAME})")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--min-confidence", type=float, default=0.5, help="Hand detection threshold")
+    args = parser.parse_args()
+
+    extract_landmarks(args.shards, args.out, args.workers, args.min_confidence)
@@ -0,0 +1,255 @@
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+
+import config
+from remote_fetch import is_remote
+from transcription_cache import normalize_url
+from translation_worker import JobCancelled, TranslationWorkerPool, run_translation_job
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+def coalesce_key(video_url: str, options: Optional[dict] = None) -> str:
+    """Identifies requests that would produce the same translation: normalized video plus options."""
+    video = normalize_url(video_url) if is_remote(video_url) else video_url
+    return hashlib.sha256(f"{video}|{json.dumps(options or {}, sort_keys=True)}".encode()).hexdigest()
+
+
+@dataclass
+class Job:
+    id: str
+    video_url: str
+    options: dict = field(default_factory=dict)
+    status: str = QUEUED
+    stage: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    events: List[dict] = field(default_factory=list)
+    subscribers: List[asyncio.Queue] = field(default_factory=list)
+    key: Optional[str] = None  # Coalescing key, see `coalesce_key`
+    refs: int = 0  # Requests still interested in the result
+    task: Optional[asyncio.Task] = None
+    cancel_event: Optional[object] = None  # Shared with the worker process, see `run_translation_job`
+
+    def to_dict(self) -> dict:
+        """Public view of the job returned by `GET /jobs/{id}`."""
+        return {
+            "job_id": self.id,
+            "video_url": self.video_url,
+            "options": self.options,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.events[-1] if self.events else None,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "requests": self.refs,
+        }
+
+
+class JobManager:
+    def __init__(
+        self,
+        worker_pool: TranslationWorkerPool,
+        max_concurrent_jobs: int = config.MAX_CONCURRENT_JOBS,
+        job_ttl: float = config.JOB_TTL_SECONDS,
+    ):
+        """
+        Tracks asynchronous translation jobs and fans out their progress events.
+
+        Submissions for a video and options that already have an unfinished job
+        attach to that job instead of starting another (single flight): they
+        share its result and progress stream. Each submission holds a
+        reference, and a job is cancelled only once every reference is released.
+        A cancelled job keeps its concurrency slot and stays attachable until
+        its worker has actually stopped, so it is never run twice side by side.
+
+        Args:
+            worker_pool: Pool that runs the translation jobs
+            max_concurrent_jobs: Jobs allowed to run at once; the rest stay queued
+            job_ttl: Seconds a finished job is kept before it is forgotten
+        """
+        self.worker_pool = worker_pool
+        self.job_ttl = job_ttl
+        self.jobs: Dict[str, Job] = {}
+        self._inflight: Dict[str, Job] = {}  # Coalescing key -> unfinished job
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent_jobs))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._manager = None
+        self._progress_queue = None
+        self._listener: Optional[threading.Thread] = None
+
+    def start(self):
+        """Starts the IPC queue that worker processes report progress on."""
+        self._loop = asyncio.get_running_loop()
+        self._manager = multiprocessing.get_context("spawn").Manager()
+        self._progress_queue = self._manager.Queue()
+        self._listener = threading.Thread(target=self._listen_for_progress, name="job-progress", daemon=True)
+        self._listener.start()
+
+    def shutdown(self):
+        """Stops the progress listener and the IPC manager."""
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
+            self._listener.join(timeout=5)
+            self._manager.shutdown()
+            self._progress_queue = None
+
+    def _listen_for_progress(self):
+        """Forwards progress events from the worker processes to the event loop."""
+        while True:
+            try:
+                item = self._progress_queue.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            job_id, event = item
+            self._loop.call_soon_threadsafe(self._publish, job_id, event)
+
+    def _publish(self, job_id: str, event: dict):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        if "stage" in event:
+            job.stage = event["stage"]
+        job.events.append(event)
+        for queue in job.subscribers:
+            queue.put_nowait(event)
+
+    def submit(self, video_url: str, options: Optional[dict] = None) -> Job:
+        """
+        Creates a job and schedules it, or attaches to an identical unfinished
+        job; returns immediately. `options` are passed on to `generate_translation`.
+        Every call takes a reference on the returned job (see `release`).
+        """
+        self._prune()
+        options = options or {}
+        key = coalesce_key(video_url, options)
+        job = self._inflight.get(key)
+        if job is not None:
+            if job.refs == 0 and job.cancel_event is not None:
+                job.cancel_event.clear()  # Revive a job whose cancellation has not taken effect yet
+            job.refs += 1
+            logger.info(f"Coalesced request into job {job.id} ({job.refs} request(s))")
+            return job
+
+        job = Job(id=uuid.uuid4().hex, video_url=video_url, options=options, key=key, refs=1,
+                  cancel_event=self._manager.Event() if self._manager is not None else None)
+        self.jobs[job.id] = job
+        self._inflight[key] = job
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def release(self, job: Job):
+        """
+        Drops one reference to a job. When no request is left waiting for an
+        unfinished job, it is cancelled: a queued job never starts, and a
+        running one is told to stop at its next stage boundary.
+        """
+        job.refs = max(0, job.refs - 1)
+        if job.refs or job.status in FINISHED_STATES:
+            return
+        logger.info(f"Cancelling job {job.id}: no request is waiting for it")
+        if job.status == QUEUED and job.task is not None:
+            job.task.cancel()
+        elif job.cancel_event is not None:
+            job.cancel_event.set()
+
+    async def wait(self, job: Job) -> Job:
+        """
+        Waits for a job to finish, then releases the caller's reference. If the
+        caller is cancelled (e.g. the client went away), only its reference is
+        dropped; other requests attached to the job keep it running.
+        """
+        try:
+            await asyncio.shield(job.task)
+        finally:
+            self.release(job)
+        return job
+
+    async def _run(self, job: Job):
+        try:
+            async with self._semaphore:
+                job.status = RUNNING
+                self._publish(job.id, {"status": RUNNING})
+                # The slot is held until the worker returns, including after a cancel request
+                while True:
+                    try:
+                        job.result = await self.worker_pool.run(
+                            run_translation_job, job.id, job.video_url, self._progress_queue, job.options,
+                            job.cancel_event,
+                        )
+                        job.status = COMPLETED
+                    except JobCancelled:
+                        if job.refs:
+                            # A request attached after the worker had already stopped: start over
+                            job.cancel_event.clear()
+                            continue
+                        job.status = CANCELLED
+                    except Exception as e:
+                        logger.exception(f"Job {job.id} failed")
+                        job.error = str(e)
+                        job.status = FAILED
+                    break
+        except asyncio.CancelledError:
+            job.status = CANCELLED  # Cancelled while still queued
+        finally:
+            if self._inflight.get(job.key) is job:
+                del self._inflight[job.key]
+            job.finished_at = time.time()
+            self._publish(job.id, {"status": job.status})
+
+    async def events(self, job_id: str) -> AsyncIterator[dict]:
+        """
+        Yields every progress event of a job, replaying the ones already emitted,
+        until the job finishes.
+        """
+        job = self.jobs[job_id]
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in job.events:
+            queue.put_nowait(event)
+        job.subscribers.append(queue)
+        try:
+            while True:
+                if queue.empty() and job.status in FINISHED_STATES:
+                    return
+                event = await queue.get()
+                yield event
+                if event.get("status") in FINISHED_STATES:
+                    return
+        finally:
+            job.subscribers.remove(queue)
+
+    def _prune(self):
+        """Forgets finished jobs older than the TTL."""
+        cutoff = time.time() - self.job_ttl
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
@@ -0,0 +1,183 @@
+import logging
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+import numpy as np
+
+import config
+from sign_lexicon import SignLexicon, normalize_token
+from sign_track import asset_url, letter_cues
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+# Committed words kept to prompt the next window; older ones have already been sent as cues
+PROMPT_WORDS = 30
+
+
+def transcribe_window(samples: np.ndarray, offset: float, model_size: str, language: Optional[str],
+                      prompt: str = "") -> List[dict]:
+    """
+    Transcribes one rolling window inside a worker process.
+
+    Args:
+        samples: Mono float32 16 kHz audio of the window
+        offset: Stream time of the first sample, added to every timestamp
+        model_size: Whisper model size
+        language: Language code, or None to detect it
+        prompt: Recently committed text, so the window continues it consistently
+
+    Returns:
+        Word timestamps as [{"word", "start", "end"}]
+    """
+    from model_registry import registry
+
+    options = {"word_timestamps": True, "condition_on_previous_text": False, "fp16": False}
+    if language:
+        options["language"] = language
+    if prompt:
+        options["initial_prompt"] = prompt
+    result = registry.get(model_size).transcribe(samples, **options)
+    return [
+        {"word": w["word"], "start": w["start"] + offset, "end": w["end"] + offset}
+        for segment in result.get("segments", [])
+        for w in segment.get("words", [])
+    ]
+
+
+class LiveSession:
+    def __init__(
+        self,
+        lexicon: SignLexicon,
+        model_size: str = config.LIVE_MODEL_SIZE,
+        language: Optional[str] = config.WHISPER_LANGUAGE,
+        step_s: float = config.LIVE_STEP_SECONDS,
+        max_lag_s: float = config.LIVE_MAX_LAG_SECONDS,
+        window_s: float = config.LIVE_WINDOW_SECONDS,
+    ):
+        """
+        Incremental transcription of a live audio stream with stable-prefix commit.
+
+        Audio accumulates in a rolling window that is re-transcribed every
+        `step_s` seconds. A word is committed once two consecutive passes agree
+        on it, or once it ends more than `max_lag_s` before the newest audio,
+        so committed output never lags by much more than that. Committed words
+        are dropped from the window, which never exceeds `window_s`.
+
+        Args:
+            lexicon: Sign lexicon used to turn committed words into sign cues
+            model_size: Whisper model size (small models keep up in real time)
+            language: Language code, or None to detect it
+            step_s: New audio needed before the window is transcribed again
+            max_lag_s: Words older than this are committed without agreement
+            window_s: Longest audio window sent to Whisper
+        """
+        self.lexicon = lexicon
+        self.model_size = model_size
+        self.language = language
+        self.step_s = step_s
+        self.max_lag_s = max_lag_s
+        self.window_s = window_s
+        self.reset(0.0)
+
+    def reset(self, stream_time: float):
+        """Starts over at `stream_time` (e.g. after the video was seeked)."""
+        self.generation = getattr(self, "generation", 0) + 1
+        self._buffer = np.empty(0, np.float32)
+        self._offset = stream_time      # Stream time of the first buffered sample
+        self._stepped_at = 0            # Buffer length at the last window
+        self._committed_end = stream_time
+        self._pending: List[dict] = []  # Previous pass's uncommitted words
+        self._unsigned: List[dict] = []  # Committed words held back because a phrase may continue
+        self.committed: Deque[dict] = deque(maxlen=PROMPT_WORDS)  # Most recent committed words only
+
+    @property
+    def audio_end(self) -> float:
+        return self._offset + len(self._buffer) / SAMPLE_RATE
+
+    def feed(self, pcm: bytes):
+        """Appends little-endian 16-bit mono PCM at 16 kHz."""
+        samples = np.frombuffer(pcm, "<i2").astype(np.float32) / 32768.0
+        self._buffer = np.concatenate((self._buffer, samples))
+
+    def ready(self) -> bool:
+        return len(self._buffer) - self._stepped_at >= self.step_s * SAMPLE_RATE
+
+    def window(self) -> Tuple[np.ndarray, float, str]:
+        """The audio to transcribe next: (samples, stream offset, prompt)."""
+        self._stepped_at = len(self._buffer)
+        prompt = "".join(w["word"] for w in self.committed).strip()
+        return self._buffer.copy(), self._offset, prompt
+
+    def commit(self, words: List[dict], audio_end: Optional[float] = None) -> List[dict]:
+        """
+        Compares a new pass over the window with the previous one and commits
+        the agreed prefix plus any word older than `max_lag_s`.
+
+        Args:
+            words: Word timestamps of the new pass
+            audio_end: Stream time the pass covered up to (default: current buffer end)
+
+        Returns:
+            The newly committed words
+        """
+        audio_end = self.audio_end if audio_end is None else audio_end
+        # Only words after what is already committed are candidates
+        hypothesis = [w for w in words if w["start"] >= self._committed_end - 0.05 and normalize_token(w["word"])]
+
+        agreed = 0
+        while (agreed < len(hypothesis) and agreed < len(self._pending)
+               and normalize_token(hypothesis[agreed]["word"]) == normalize_token(self._pending[agreed]["word"])):
+            agreed += 1
+        while agreed < len(hypothesis) and hypothesis[agreed]["end"] <= audio_end - self.max_lag_s:
+            agreed += 1
+
+        new_words = hypothesis[:agreed]
+        self._pending = hypothesis[agreed:]
+        if new_words:
+            self.committed.extend(new_words)
+            self._committed_end = new_words[-1]["end"]
+        self._trim()
+        return new_words
+
+    def _trim(self):
+        """Drops committed audio, keeping the window within `window_s`."""
+        cut = self._committed_end
+        if self.audio_end - cut > self.window_s:
+            cut = self.audio_end - self.window_s  # No commits for a while (e.g. music): slide anyway
+            self._pending = [w for w in self._pending if w["start"] >= cut]
+        drop = int((cut - self._offset) * SAMPLE_RATE)
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._offset += drop / SAMPLE_RATE
+            self._stepped_at = max(0, self._stepped_at - drop)
+
+    def cues_for(self, words: List[dict], audio_end: Optional[float] = None) -> dict:
+        """
+        Sign cues for newly committed words, in the sign track format, with
+        the asset URLs they reference.
+
+        Trailing words that begin a longer phrase ("thank" of "thank you") are
+        held back until the next commit, unless that would exceed `max_lag_s`.
+        """
+        audio_end = self.audio_end if audio_end is None else audio_end
+        words = self._unsigned + words
+        hold = len(words)
+        for i in range(max(0, len(words) - 4), len(words)):
+            if words[i]["end"] > audio_end - self.max_lag_s and self.lexicon.is_prefix(w["word"] for w in words[i:]):
+                hold = i
+                break
+        words, self._unsigned = words[:hold], words[hold:]
+
+        cues = []
+        for match in self.lexicon.resolve([w["word"] for w in words]):
+            start, end = words[match.start]["start"], words[match.end - 1]["end"]
+            if match.sign_id:
+                cues.append([round(start, 3), round(end, 3), match.sign_id])
+            else:
+                cues.extend(letter_cues(match.text, start, end, self.lexicon))
+        # One snapshot: a refresh on another thread may remove a sign after it was resolved
+        files, versions = self.lexicon.assets, self.lexicon.versions
+        cues = [cue for cue in cues if cue[2] in files]
+        assets = {cue[2]: asset_url(files[cue[2]], versions.get(cue[2])) for cue in cues}
+        return {"cues": cues, "assets": assets, "text": "".join(w["word"] for w in words).strip()}
@@ -0,0 +1,116 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def _model_nbytes(model) -> int:
+    """Memory held by a torch model's parameters and buffers, in bytes."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class WhisperModelRegistry:
+    def __init__(self, memory_budget: int = config.WHISPER_MEMORY_BUDGET_BYTES, download_root: str = None):
+        """
+        Process-wide registry of loaded Whisper models.
+
+        Every `SpeechToText` in the process shares the models held here. When the
+        models together use more than `memory_budget` bytes, the least recently
+        used ones are dropped (the one just requested is always kept).
+
+        Args:
+            memory_budget: Upper bound on the memory of resident models, in bytes
+            download_root: Directory the model checkpoints are downloaded to
+        """
+        self.memory_budget = memory_budget
+        self.download_root = download_root or os.path.join(os.path.expanduser("~"), ".cache", "whisper")
+        self._models = OrderedDict()  # model size -> (model, nbytes)
+        self._lock = threading.Lock()  # Guards `_models` and `_load_locks`; never held while loading
+        self._load_locks = {}  # model size -> lock held while that size loads
+
+    def _resident(self, model_size: str):
+        """The loaded model for `model_size`, marked most recently used, or None. Call with `_lock` held."""
+        entry = self._models.get(model_size)
+        if entry is None:
+            return None
+        self._models.move_to_end(model_size)
+        return entry[0]
+
+    def get(self, model_size: str):
+        """
+        Returns the loaded model for `model_size`, loading it if needed. A cold
+        load only blocks other requests for the same size; models already
+        loaded are served meanwhile.
+        """
+        with self._lock:
+            model = self._resident(model_size)
+            if model is not None:
+                return model
+            load_lock = self._load_locks.setdefault(model_size, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                model = self._resident(model_size)  # Loaded by another thread while we waited
+            if model is not None:
+                return model
+            model = self._load(model_size)
+            nbytes = _model_nbytes(model)
+            with self._lock:
+                self._models[model_size] = (model, nbytes)
+                self._evict()
+            return model
+
+    def _load(self, model_size: str):
+        import whisper
+
+        # Force CPU usage to avoid CUDA errors
+        os.environ["CUDA_VISIBLE_DEVICES"] = ""
+        os.makedirs(self.download_root, exist_ok=True)
+
+        started = time.perf_counter()
+        logger.info(f"Loading Whisper Model '{model_size}'...")
+        try:
+            model = whisper.load_model(model_size, download_root=self.download_root)
+        except Exception as e:
+            logger.error(f"Error loading Whisper Model: {e}")
+            logger.info(f"Attempting to download model '{model_size}' manually...")
+            model_path = os.path.join(self.download_root, f"{model_size}.pt")
+            if not os.path.exists(model_path):
+                whisper._download(whisper._MODELS[model_size], self.download_root, False)
+                logger.info(f"Model downloaded to {model_path}")
+            model = whisper.load_model(model_size, download_root=self.download_root)
+        logger.info(f"Whisper Model '{model_size}' loaded in {time.perf_counter() - started:.1f}s")
+        return model
+
+    def _evict(self):
+        while len(self._models) > 1 and self.resident_bytes() > self.memory_budget:
+            model_size, _ = self._models.popitem(last=False)
+            logger.info(f"Evicted Whisper Model '{model_size}' to stay within memory budget")
+
+    def resident_bytes(self) -> int:
+        return sum(nbytes for _, nbytes in self._models.values())
+
+    def preload(self, model_sizes: Iterable[str]):
+        """Loads the given model sizes up front, e.g. at server startup."""
+        for model_size in model_sizes:
+            self.get(model_size)
+
+    def stats(self) -> dict:
+        """Resident models (least recently used first) and their memory use."""
+        with self._lock:
+            return {
+                "models": {size: nbytes for size, (_, nbytes) in self._models.items()},
+                "resident_bytes": self.resident_bytes(),
+                "memory_budget": self.memory_budget,
+            }
+
+
+# Shared by every SpeechToText in this process
+registry = WhisperModelRegistry()
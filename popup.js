@@ -1,3 +1,12 @@
+const BACKEND_URL = "http://127.0.0.1:8000";
+
+// Human-readable labels for the progress stages reported by the backend
+const STAGE_LABELS = {
+    audio_extraction: "🎧 Extracting audio",
+    transcription: "📝 Transcribing",
+    sign_assembly: "🤟 Assembling signs",
+};
+
 document.addEventListener("DOMContentLoaded", function () {
     const startButton = document.getElementById("startTranslation");
     const statusMessage = document.getElementById("status");
@@ -23,8 +32,8 @@ document.addEventListener("DOMContentLoaded", function () {
                     console.log("✅ Video detected:", response.videoURL);
                     updateStatus("✅ Video detected! Sending to backend...", "green");
 
-                    // Send video URL to backend
-                    fetch("http://127.0.0.1:8000/translate/", {
+                    // Submit a translation job, then follow its progress
+                    fetch(`${BACKEND_URL}/jobs`, {
                         method: "POST",
                         headers: {
                             "Content-Type": "application/json",
@@ -38,12 +47,9 @@ document.addEventListener("DOMContentLoaded", function () {
                             return res.json();
                         })
                         .then(data => {
-                            console.log("✅ Backend Response:", data);
-                            if (data.translation) {
-                                updateStatus(`✅ Translation received!<br>${data.translation}`, "green");
-                            } else {
-                                updateStatus("❌ Error in translation!", "red");
-                            }
+                            console.log("✅ Job queued:", data.job_id);
+                            updateStatus("⏳ Translation queued...", "gray");
+                            followJob(data.job_id, tabs[0].id);
                         })
                         .catch(error => {
                             console.error("❌ Backend request failed", error);
@@ -54,6 +60,72 @@ document.addEventListener("DOMContentLoaded", function () {
         });
     });
 
+    const liveButton = document.getElementById("startLiveTranslation");
+    if (liveButton) {
+        liveButton.addEventListener("click", function () {
+            chrome.tabs.query({ active: true, currentWindow: true }, function (tabs) {
+                if (tabs.length === 0) {
+                    updateStatus("❌ No active tab found", "red");
+                    return;
+                }
+
+                // Streams the playing video's audio to the backend; signs appear as words are recognized
+                chrome.tabs.sendMessage(tabs[0].id, { action: "startLiveTranslation", backendUrl: BACKEND_URL },
+                    function (response) {
+                        if (!response || !response.success) {
+                            updateStatus("❌ No video found", "red");
+                        } else {
+                            updateStatus("🎙 Live translation running...", "green");
+                        }
+                    });
+            });
+        });
+    }
+
+    function followJob(jobId, tabId) {
+        const events = new EventSource(`${BACKEND_URL}/jobs/${jobId}/events`);
+
+        events.onmessage = function (e) {
+            const event = JSON.parse(e.data);
+            if (!event.stage) {
+                return;
+            }
+            let message = `⏳ ${STAGE_LABELS[event.stage] || event.stage}...`;
+            if (event.status === "segment" || event.status === "chunk") {
+                message += ` (segment ${event.segment}/${event.total})`;
+            }
+            updateStatus(message, "gray");
+        };
+
+        events.addEventListener("done", function (e) {
+            events.close();
+            const job = JSON.parse(e.data);
+            console.log("✅ Backend Response:", job);
+            if (job.status === "completed" && job.result) {
+                updateStatus(`✅ Translation received!<br>${job.result.text}`, "green");
+                if (job.result.track) {
+                    showSignTrack(tabId, job.result.track);
+                }
+            } else {
+                updateStatus(`❌ Error in translation! ${job.error || ""}`, "red");
+            }
+        });
+
+        events.onerror = function () {
+            events.close();
+            updateStatus("❌ Lost connection to backend!", "red");
+        };
+    }
+
+    // Hands the sign track to the page, which overlays it on the playing video
+    function showSignTrack(tabId, track) {
+        const assets = {};
+        for (const [sign, url] of Object.entries(track.assets)) {
+            assets[sign] = url.startsWith("/") ? `${BACKEND_URL}${url}` : url;
+        }
+        chrome.tabs.sendMessage(tabId, { action: "showSignTrack", track: { ...track, assets } });
+    }
+
     function updateStatus(message, color) {
         statusMessage.innerHTML = message;
         statusMessage.style.color = color;
@@ -0,0 +1,395 @@
+import hashlib
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from transcription_cache import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Audio chunks closer than this are fetched in one request (the gap is downloaded too)
+RANGE_MERGE_GAP = 64 * 1024
+# Longest single range request; longer merged ranges are split
+RANGE_MAX_BYTES = 8 * 1024 * 1024
+# Bytes per read when streaming a response
+STREAM_CHUNK_BYTES = 256 * 1024
+# Seconds a HEAD response is reused before the server is asked again
+_HEAD_TTL = 30
+
+_CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+
+def is_remote(source: str) -> bool:
+    return urlsplit(source).scheme in ("http", "https")
+
+
+@dataclass
+class RemoteSource:
+    """What to hand to ffmpeg: a local (possibly sparse) file, or a byte stream."""
+    path: Optional[str] = None
+    chunks: Optional[Iterator[bytes]] = None
+
+
+# --- MP4 parsing ---
+
+def _read_box_header(data: bytes, offset: int = 0) -> Tuple[int, bytes, int]:
+    """Returns (box size, box type, header length) of the box at `offset`."""
+    size, box_type = struct.unpack_from(">I4s", data, offset)
+    header = 8
+    if size == 1:
+        size = struct.unpack_from(">Q", data, offset + 8)[0]
+        header = 16
+    return size, box_type, header
+
+
+def _iter_boxes(data: bytes, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yields (type, payload start, box end) for the boxes in data[start:end]."""
+    offset = start
+    while offset + 8 <= end:
+        size, box_type, header = _read_box_header(data, offset)
+        box_end = end if size == 0 else offset + size
+        if size and size < header:
+            return  # Corrupt box
+        yield box_type, offset + header, box_end
+        offset = box_end
+
+
+def _find_sound_tables(moov: bytes) -> Optional[dict]:
+    """Returns the raw sample tables of the first sound track in a `moov` box payload."""
+    for box_type, start, end in _iter_boxes(moov, 0, len(moov)):
+        if box_type != b"trak":
+            continue
+        tables = {}
+
+        def walk(s, e):
+            for t, ps, pe in _iter_boxes(moov, s, e):
+                if t in _CONTAINER_BOXES:
+                    walk(ps, pe)
+                elif t in (b"hdlr", b"stsz", b"stsc", b"stco", b"co64"):
+                    tables[t] = (ps, pe)
+
+        walk(start, end)
+        hdlr = tables.get(b"hdlr")
+        if hdlr and moov[hdlr[0] + 8:hdlr[0] + 12] == b"soun" and b"stsz" in tables and b"stsc" in tables:
+            return {t: moov[s:e] for t, (s, e) in tables.items()}
+    return None
+
+
+def audio_chunk_ranges(moov: bytes) -> Optional[List[Tuple[int, int]]]:
+    """
+    Byte ranges (offset, length) of the sound track's chunks, from the sample
+    tables of a `moov` box payload, or None if there is no usable sound track.
+    """
+    tables = _find_sound_tables(moov)
+    if tables is None or not (b"stco" in tables or b"co64" in tables):
+        return None
+
+    stsz = tables[b"stsz"]
+    sample_size, sample_count = struct.unpack_from(">II", stsz, 4)
+    if sample_size:
+        sizes = np.full(sample_count, sample_size, np.int64)
+    else:
+        sizes = np.frombuffer(stsz, ">u4", sample_count, 12).astype(np.int64)
+
+    if b"co64" in tables:
+        co = tables[b"co64"]
+        offsets = np.frombuffer(co, ">u8", struct.unpack_from(">I", co, 4)[0], 8).astype(np.int64)
+    else:
+        co = tables[b"stco"]
+        offsets = np.frombuffer(co, ">u4", struct.unpack_from(">I", co, 4)[0], 8).astype(np.int64)
+
+    stsc = tables[b"stsc"]
+    entries = np.frombuffer(stsc, ">u4", struct.unpack_from(">I", stsc, 4)[0] * 3, 8).reshape(-1, 3)
+    # Samples per chunk for every chunk: each stsc run lasts until the next run's first chunk
+    first_chunks = entries[:, 0].astype(np.int64) - 1
+    run_lengths = np.diff(np.append(first_chunks, len(offsets)))
+    per_chunk = np.repeat(entries[:, 1].astype(np.int64), run_lengths)[:len(offsets)]
+
+    bounds = np.concatenate(([0], np.cumsum(per_chunk)))
+    bounds = np.minimum(bounds, len(sizes))
+    cumulative = np.concatenate(([0], np.cumsum(sizes)))
+    lengths = cumulative[bounds[1:]] - cumulative[bounds[:-1]]
+    return [(int(o), int(n)) for o, n in zip(offsets, lengths) if n > 0]
+
+
+def merge_ranges(ranges: List[Tuple[int, int]], max_gap: int = RANGE_MERGE_GAP,
+                 max_length: int = RANGE_MAX_BYTES) -> List[Tuple[int, int]]:
+    """
+    Merges (offset, length) ranges whose gap is at most `max_gap` bytes, then
+    splits the results into requests of at most `max_length` bytes.
+    """
+    merged = []
+    for offset, length in sorted(ranges):
+        if merged and offset - (merged[-1][0] + merged[-1][1]) <= max_gap:
+            last_offset, last_length = merged[-1]
+            merged[-1] = (last_offset, max(last_length, offset + length - last_offset))
+        else:
+            merged.append((offset, length))
+    return [
+        (start, min(max_length, offset + length - start))
+        for offset, length in merged
+        for start in range(offset, offset + length, max_length)
+    ]
+
+
+class RemoteFetcher:
+    def __init__(self, cache_dir: str = config.REMOTE_CACHE_DIR, max_bytes: int = config.REMOTE_CACHE_MAX_BYTES,
+                 pool_size: int = config.REMOTE_POOL_SIZE, timeout: float = config.REMOTE_TIMEOUT_SECONDS):
+        """
+        Fetches remote videos for audio decoding.
+
+        Requests go through one pooled keep-alive session. For MP4/MOV files on
+        servers that support ranges, only the container index and the audio
+        chunks are downloaded, into a sparse local file that ffmpeg decodes
+        with video disabled. Other sources are streamed straight into ffmpeg
+        while being saved. Downloads are cached on disk keyed by URL and the
+        server's validators (ETag / Last-Modified / size), and the least
+        recently used ones are evicted beyond `max_bytes`.
+
+        Args:
+            cache_dir: Folder of the on-disk cache
+            max_bytes: Size budget of the cache (space actually used by sparse files)
+            pool_size: Connections kept alive per host, and parallel range requests
+            timeout: Connect/read timeout in seconds
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._heads = {}  # url -> (time, response headers)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # --- Validators ---
+
+    def head(self, url: str) -> dict:
+        """Response headers of a HEAD request, reused for a few seconds."""
+        now = time.monotonic()
+        cached = self._heads.get(url)
+        if cached and now - cached[0] < _HEAD_TTL:
+            return cached[1]
+        response = self.session.head(url, allow_redirects=True, timeout=self.timeout)
+        response.raise_for_status()
+        headers = {k.lower(): v for k, v in response.headers.items()}
+        self._heads[url] = (now, headers)
+        return headers
+
+    def validator(self, url: str) -> str:
+        """
+        Identifies the current version of a remote file, for cache keys:
+        its ETag, else Last-Modified plus size. Empty if the server sends neither.
+        """
+        try:
+            headers = self.head(url)
+        except requests.RequestException as e:
+            logger.warning(f"HEAD failed for {url}: {e}")
+            return ""
+        if headers.get("etag"):
+            return headers["etag"]
+        if headers.get("last-modified"):
+            return f"{headers['last-modified']}|{headers.get('content-length', '')}"
+        return ""
+
+    # --- Cache ---
+
+    def _entry_paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + ".bin"), os.path.join(self.cache_dir, key + ".json")
+
+    def _cached(self, url: str, validator: str) -> Optional[str]:
+        data_path, meta_path = self._entry_paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not validator or meta.get("validator") != validator or not os.path.exists(data_path):
+            return None
+        os.utime(meta_path)  # LRU order
+        return data_path
+
+    def _store(self, url: str, validator: str, tmp_path: str, kind: str) -> str:
+        data_path, meta_path = self._entry_paths(url)
+        os.replace(tmp_path, data_path)
+        # Written even without a validator so eviction sees the file; such entries are never reused
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "validator": validator, "kind": kind}, f)
+        self._evict()
+        return data_path
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            meta_path = os.path.join(self.cache_dir, name)
+            data_path = meta_path[:-5] + ".bin"
+            try:
+                stat = os.stat(data_path)
+                # Allocated blocks, not the apparent size: audio-only downloads are sparse
+                used = stat.st_blocks * 512 if hasattr(stat, "st_blocks") else stat.st_size
+                entries.append((os.path.getmtime(meta_path), used, meta_path, data_path))
+            except OSError:
+                continue
+            total += used
+        for _, used, meta_path, data_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for path in (meta_path, data_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= used
+            logger.info(f"Evicted cached download {os.path.basename(data_path)}")
+
+    # --- Fetching ---
+
+    def _get_range(self, url: str, offset: int, length: int) -> bytes:
+        response = self.session.get(url, headers={"Range": f"bytes={offset}-{offset + length - 1}"},
+                                    timeout=self.timeout)
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise requests.HTTPError(f"Server ignored range request for {url}")
+        return response.content
+
+    def _fetch_audio_only(self, url: str, size: int) -> Optional[str]:
+        """
+        Downloads the boxes before the media data, the `moov` index and the
+        audio chunks of an MP4/MOV into a sparse file. Returns None if the file
+        is not a (non-fragmented) MP4 with a sound track.
+        """
+        head = self._get_range(url, 0, min(size, 64 * 1024))
+        if head[4:8] != b"ftyp":
+            return None
+
+        # Walk the top-level boxes with small ranged reads until `moov` is found
+        pieces = [(0, head)]
+        offset, moov = 0, None
+        while offset < size:
+            header = head[offset:offset + 16] if offset + 16 <= len(head) else self._get_range(url, offset, 16)
+            box_size, box_type, _ = _read_box_header(header)
+            box_size = size - offset if box_size == 0 else box_size
+            if box_type == b"moov":
+                moov_box = self._get_range(url, offset, box_size)
+                pieces.append((offset, moov_box))
+                moov = moov_box[_read_box_header(moov_box)[2]:]
+            elif box_type == b"moof":
+                return None  # Fragmented MP4: samples live outside the index
+            if box_size < 8:
+                return None
+            offset += box_size
+        if moov is None:
+            return None
+
+        ranges = audio_chunk_ranges(moov)
+        if not ranges:
+            return None
+        ranges = merge_ranges(ranges)
+        audio_bytes = sum(length for _, length in ranges)
+        logger.info(f"Fetching {audio_bytes / 1e6:.1f} MB of audio out of {size / 1e6:.1f} MB "
+                    f"in {len(ranges)} range request(s): {url}")
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "r+b") as f:
+                f.truncate(size)  # Sparse: video samples are never written
+
+                def write(at, data):
+                    f.seek(at)
+                    f.write(data)
+
+                for at, data in pieces:
+                    write(at, data)
+                # Sliding window: at most `pool_size` requests (and their bodies) in flight at once
+                with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+                    in_flight = deque()
+                    for at, length in ranges:
+                        if len(in_flight) >= self.pool_size:
+                            done_at, future = in_flight.popleft()
+                            write(done_at, future.result())
+                        in_flight.append((at, executor.submit(self._get_range, url, at, length)))
+                    while in_flight:
+                        done_at, future = in_flight.popleft()
+                        write(done_at, future.result())
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def _stream(self, url: str, validator: str) -> Iterator[bytes]:
+        """Yields the response body while saving it to the cache."""
+        response = self.session.get(url, stream=True, timeout=self.timeout)
+        response.raise_for_status()
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        complete = False
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(STREAM_CHUNK_BYTES):
+                    f.write(chunk)
+                    yield chunk
+            complete = True
+        finally:
+            response.close()
+            if complete:
+                self._store(url, validator, tmp_path, "full")
+            else:
+                os.remove(tmp_path)
+
+    def open(self, url: str) -> RemoteSource:
+        """
+        Prepares a remote video for decoding: a cached or audio-only local
+        file when possible, otherwise a stream of the whole file.
+        """
+        validator = self.validator(url)
+        cached = self._cached(url, validator)
+        if cached:
+            logger.info(f"Remote cache hit: {url}")
+            return RemoteSource(path=cached)
+
+        try:
+            headers = self.head(url)
+        except requests.RequestException:
+            headers = {}
+        size = int(headers.get("content-length") or 0)
+        if headers.get("accept-ranges", "").lower() == "bytes" and size:
+            try:
+                tmp_path = self._fetch_audio_only(url, size)
+            except (requests.RequestException, struct.error, ValueError) as e:
+                logger.warning(f"Audio-only fetch failed, streaming the whole file instead: {e}")
+                tmp_path = None
+            if tmp_path:
+                return RemoteSource(path=self._store(url, validator, tmp_path, "audio"))
+
+        return RemoteSource(chunks=self._stream(url, validator))
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> RemoteFetcher:
+    """Per-process shared fetcher, so its connection pool is reused across videos."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = RemoteFetcher()
+        return _fetcher
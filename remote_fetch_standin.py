@@ -0,0 +1,101 @@
+import http.server
+import logging
+import struct
+import threading
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _full_box(box_type: bytes, payload: bytes) -> bytes:
+    return _box(box_type, b"\0\0\0\0" + payload)
+
+
+def _trak(handler: bytes, sizes: List[int], samples_per_chunk: int, offsets: List[int]) -> bytes:
+    hdlr = _full_box(b"hdlr", b"\0\0\0\0" + handler + b"\0" * 13)
+    stsz = _full_box(b"stsz", struct.pack(">II", 0, len(sizes)) + b"".join(struct.pack(">I", n) for n in sizes))
+    stsc = _full_box(b"stsc", struct.pack(">IIII", 1, 1, samples_per_chunk, 1))
+    stco = _full_box(b"stco", struct.pack(">I", len(offsets)) + b"".join(struct.pack(">I", o) for o in offsets))
+    return _box(b"trak", _box(b"mdia", hdlr + _box(b"minf", _box(b"stbl", stsc + stsz + stco))))
+
+
+def build_test_mp4(chunks: int = 8, video_chunk_bytes: int = 256 * 1024,
+                   audio_sample_bytes: int = 400) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Builds a minimal MP4 (ftyp | mdat | moov) with interleaved video and audio
+    chunks. Only the box structure and sample tables are real; the samples are
+    filler bytes, enough for `remote_fetch` but not for a decoder.
+
+    Returns:
+        Tuple of (file bytes, (offset, length) of every audio chunk)
+    """
+    ftyp = _box(b"ftyp", b"isom\0\0\0\0isom")
+    payload = bytearray()
+    mdat_start = len(ftyp) + 8
+    video_offsets, audio_ranges = [], []
+    for i in range(chunks):
+        video_offsets.append(mdat_start + len(payload))
+        payload += b"V" * video_chunk_bytes
+        audio_ranges.append((mdat_start + len(payload), 2 * audio_sample_bytes))
+        payload += bytes([97 + i % 26]) * (2 * audio_sample_bytes)  # Two audio samples per chunk
+    moov = _box(b"moov", _trak(b"vide", [video_chunk_bytes] * chunks, 1, video_offsets)
+                + _trak(b"soun", [audio_sample_bytes] * (2 * chunks), 2, [o for o, _ in audio_ranges]))
+    return ftyp + _box(b"mdat", bytes(payload)) + moov, audio_ranges
+
+
+class RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves `server.body` for any path, honouring single `Range` requests when `server.ranges` is set."""
+    protocol_version = "HTTP/1.1"  # Keep-alive, as a real CDN would
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def _respond(self, send_body: bool):
+        body, etag = self.server.body, self.server.etag
+        self.server.requests.append((self.command, self.headers.get("Range")))
+        status, start, end = 200, 0, len(body) - 1
+        range_header = self.headers.get("Range")
+        if range_header and self.server.ranges and range_header.startswith("bytes="):
+            first, last = range_header[len("bytes="):].split("-")
+            status, start, end = 206, int(first), min(int(last or end), end)
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Accept-Ranges", "bytes" if self.server.ranges else "none")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body[start:end + 1])
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def do_GET(self):
+        self._respond(True)
+
+
+def serve(body: bytes, ranges: bool = True, etag: str = '"v1"') -> http.server.ThreadingHTTPServer:
+    """
+    Starts a local stand-in for a video host on a free port, in a daemon thread.
+    `server.body`, `server.etag` and `server.ranges` may be changed while it runs;
+    `server.requests` records (method, Range header) of every request.
+    """
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    server.body, server.ranges, server.etag, server.requests = body, ranges, etag, []
+    threading.Thread(target=server.serve_forever, name="http-standin", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    server = serve(build_test_mp4()[0])
+    print(f"🌐 Serving a test MP4 with range support at http://127.0.0.1:{server.server_port}/video.mp4")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
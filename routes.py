@@ -1,23 +1,62 @@
-from fastapi import APIRouter, UploadFile, File, Form
-import shutil
-import os
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import JSONResponse
+import logging
+
+import config
+from upload_store import UploadTooLarge
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Size limit of each upload route, enforced on Content-Length before the body is received
+UPLOAD_LIMITS = {"/stt": config.UPLOAD_MAX_AUDIO_BYTES, "/video-data": config.UPLOAD_MAX_VIDEO_BYTES}
+# Allowance for the multipart framing around the file
+MULTIPART_OVERHEAD = 64 * 1024
 
 # Test Route
 @router.get("/test")
 def test_api():
     return {"message": "API is working!"}
 
+async def reject_oversized_uploads(request: Request, call_next):
+    """
+    HTTP middleware answering 413 as soon as a declared Content-Length exceeds
+    the route's limit, before the multipart body is spooled to disk. Uploads
+    without a Content-Length are still checked while they are stored.
+    """
+    limit = UPLOAD_LIMITS.get(request.url.path)
+    length = request.headers.get("content-length", "")
+    if limit is not None and length.isdigit() and int(length) > limit + MULTIPART_OVERHEAD:
+        return JSONResponse(status_code=413, content={"detail": f"Upload exceeds {limit} bytes"})
+    return await call_next(request)
+
+async def store_upload(request: Request, upload: UploadFile, max_bytes: int):
+    """Streams an upload into the content-addressed store, mapping size violations to 413."""
+    try:
+        return await request.app.state.upload_store.save(upload, max_bytes)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+async def process_once(request: Request, stored, kind: str, compute):
+    """Returns the stored `kind` result for this content, computing and storing it on first sight."""
+    store = request.app.state.upload_store
+    result = store.get_result(stored.digest, kind)
+    if result is not None:
+        logger.info(f"♻️ Reusing {kind} result for {stored.digest[:12]}")
+        return result, True
+    try:
+        result = await compute(stored.path)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Processing error: {e}")
+    store.put_result(stored.digest, kind, result)
+    return result, False
+
 # Speech-to-Text Endpoint
 @router.post("/stt")
-async def speech_to_text(audio: UploadFile = File(...)):
-    file_path = f"temp/{audio.filename}"
-    os.makedirs("temp", exist_ok=True)  # Ensure temp directory exists
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(audio.file, buffer)
-    # TODO: Call AI model for speech-to-text conversion
-    return {"text": "Transcribed text will appear here."}
+async def speech_to_text(request: Request, audio: UploadFile = File(...)):
+    stored = await store_upload(request, audio, config.UPLOAD_MAX_AUDIO_BYTES)
+    result, cached = await process_once(request, stored, "stt", request.app.state.worker_pool.transcribe)
+    return {"text": result["text"], "timeline": result["timeline"], "sha256": stored.digest, "cached": cached}
 
 # Text-to-Sign Animation Endpoint
 @router.post("/text-to-sign")
@@ -27,10 +66,8 @@ async def text_to_sign(text: str = Form(...)):
 
 # Video Data Processing Endpoint
 @router.post("/video-data")
-async def process_video(video: UploadFile = File(...)):
-    file_path = f"temp/{video.filename}"
-    os.makedirs("temp", exist_ok=True)  # Ensure temp directory exists
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(video.file, buffer)
-    # TODO: Call utility functions for video processing
-    return {"message": "Video processing completed"}
+async def process_video(request: Request, video: UploadFile = File(...)):
+    stored = await store_upload(request, video, config.UPLOAD_MAX_VIDEO_BYTES)
+    result, cached = await process_once(request, stored, "translation", request.app.state.worker_pool.translate)
+    return {"message": "Video processing completed", "translation": result["text"], "signs": result["signs"],
+            "track": result["track"], "sha256": stored.digest, "cached": cached}
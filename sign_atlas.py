@@ -0,0 +1,198 @@
+import json
+import logging
+import mmap
+import struct
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import cv2
+import imageio
+import numpy as np
+
+import config
+from sign_lexicon import file_version
+
+logger = logging.getLogger(__name__)
+
+# File layout: fixed header | frames (uint8, N x H x W x 3, BGR) | JSON index
+_MAGIC = b"SIGNATL1"
+_HEADER = struct.Struct("<8sQQ")  # magic, index offset, index length
+_DATA_OFFSET = 4096  # Frames start page-aligned
+
+DEFAULT_FRAME_MS = 100
+
+
+def decode_gif(gif_path, frame_size: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, int]:
+    """
+    Decodes a GIF into a BGR frame stack.
+
+    Args:
+        gif_path: Path to the GIF
+        frame_size: Optional (width, height) every frame is resized to
+
+    Returns:
+        Tuple of (uint8 array of shape N x H x W x 3 in BGR order, frame duration in ms)
+    """
+    reader = imageio.get_reader(gif_path)
+    try:
+        frame_ms = int(reader.get_meta_data().get("duration") or DEFAULT_FRAME_MS)
+        frames = []
+        for frame in reader:
+            frame = np.asarray(frame)
+            if frame.ndim == 2:
+                frame = np.repeat(frame[..., None], 3, axis=2)
+            frame = frame[..., :3]  # Drop alpha
+            if frame_size and (frame.shape[1], frame.shape[0]) != tuple(frame_size):
+                frame = cv2.resize(frame, tuple(frame_size), interpolation=cv2.INTER_AREA)
+            frames.append(frame)
+    finally:
+        reader.close()
+    if not frames:
+        return np.empty((0, 0, 0, 3), np.uint8), frame_ms
+    # RGB -> BGR for the whole clip at once
+    return np.ascontiguousarray(np.stack(frames)[..., ::-1]), frame_ms
+
+
+def build_atlas(sign_gif_folder, atlas_path, frame_size: Tuple[int, int] = config.SIGN_FRAME_SIZE) -> dict:
+    """
+    Decodes every GIF in `sign_gif_folder` once into a single atlas file.
+
+    Returns:
+        The atlas index (frame size, channel order, and per-sign offset/count)
+    """
+    sign_gif_folder, atlas_path = Path(sign_gif_folder), Path(atlas_path)
+    width, height = frame_size
+    signs = {}
+    offset = 0
+
+    tmp_path = atlas_path.with_name(atlas_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * _DATA_OFFSET)
+        for gif_path in sorted(sign_gif_folder.glob("*.gif")):
+            try:
+                frames, frame_ms = decode_gif(gif_path, frame_size)
+            except Exception as e:
+                logger.warning(f"Skipping {gif_path.name}: {e}")
+                continue
+            if not len(frames):
+                logger.warning(f"Skipping {gif_path.name}: no frames")
+                continue
+            f.write(frames.tobytes())
+            signs[gif_path.stem.lower()] = {
+                "offset": offset,
+                "count": len(frames),
+                "frame_ms": frame_ms,
+                "version": file_version(gif_path.stat()),  # Compared with the lexicon to detect stale entries
+            }
+            offset += len(frames)
+
+        index = {
+            "frame_size": [width, height],
+            "channel_order": "BGR",
+            "frame_count": offset,
+            "signs": signs,
+        }
+        index_bytes = json.dumps(index).encode("utf-8")
+        index_offset = f.tell()
+        f.write(index_bytes)
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, index_offset, len(index_bytes)))
+    tmp_path.replace(atlas_path)
+
+    logger.info(f"Built sign atlas with {len(signs)} sign(s), {offset} frame(s): {atlas_path}")
+    return index
+
+
+class SignAtlas:
+    def __init__(self, atlas_path, cache_bytes: int = config.SIGN_ATLAS_CACHE_BYTES):
+        """
+        Read-only, memory-mapped view of a sign atlas built by `build_atlas`.
+
+        Frames are always returned as zero-copy views into the mapped file.
+        The most recently used signs, up to `cache_bytes`, form a hot set
+        whose pages the kernel is asked to read ahead (`MADV_WILLNEED`);
+        pages of signs leaving the hot set are released (`MADV_DONTNEED`).
+
+        Args:
+            atlas_path: Path to the atlas file
+            cache_bytes: Budget of the hot set
+        """
+        self.atlas_path = Path(atlas_path)
+        with open(self.atlas_path, "rb") as f:
+            magic, index_offset, index_length = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"Not a sign atlas: {self.atlas_path}")
+            f.seek(index_offset)
+            self.index = json.loads(f.read(index_length))
+
+        width, height = self.index["frame_size"]
+        self.signs = self.index["signs"]
+        self._frame_bytes = height * width * 3
+        with open(self.atlas_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._frames = np.ndarray(
+            (self.index["frame_count"], height, width, 3), np.uint8, self._mmap, offset=_DATA_OFFSET,
+        )
+        self.cache_bytes = cache_bytes
+        self._hot = OrderedDict()  # word -> bytes of the sign, in LRU order
+        self._hot_bytes = 0
+
+    def __contains__(self, word: str) -> bool:
+        return word.lower() in self.signs
+
+    def __len__(self) -> int:
+        return len(self.signs)
+
+    def frame_ms(self, word: str) -> int:
+        return self.signs[word.lower()]["frame_ms"]
+
+    def version(self, word: str) -> Optional[str]:
+        """Version of the GIF a sign was built from (see `sign_lexicon.file_version`); None for old atlases."""
+        entry = self.signs.get(word.lower())
+        return entry.get("version") if entry else None
+
+    def _advise(self, entry: dict, advice_name: str):
+        advice = getattr(mmap, advice_name, None)
+        if advice is None or not hasattr(self._mmap, "madvise"):
+            return  # Not available on this platform
+        start = _DATA_OFFSET + entry["offset"] * self._frame_bytes
+        aligned = start - start % mmap.PAGESIZE
+        self._mmap.madvise(advice, aligned, start - aligned + entry["count"] * self._frame_bytes)
+
+    def frames(self, word: str) -> Optional[np.ndarray]:
+        """BGR frames of a sign (N x H x W x 3) as a view into the atlas, or None if it has no such sign."""
+        word = word.lower()
+        entry = self.signs.get(word)
+        if entry is None:
+            return None
+
+        if word in self._hot:
+            self._hot.move_to_end(word)
+        else:
+            size = entry["count"] * self._frame_bytes
+            if size <= self.cache_bytes:
+                self._advise(entry, "MADV_WILLNEED")
+                self._hot[word] = size
+                self._hot_bytes += size
+                while self._hot_bytes > self.cache_bytes:
+                    evicted, evicted_size = self._hot.popitem(last=False)
+                    self._hot_bytes -= evicted_size
+                    self._advise(self.signs[evicted], "MADV_DONTNEED")
+        return self._frames[entry["offset"]:entry["offset"] + entry["count"]]
+
+
+# --- Build Script ---
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-decode sign GIFs into a memory-mapped frame atlas")
+    parser.add_argument("--gifs", default=config.SIGN_GIF_FOLDER, help="Folder of sign GIFs")
+    parser.add_argument("--out", default=config.SIGN_ATLAS_PATH, help="Atlas file to write")
+    parser.add_argument("--size", type=int, nargs=2, default=config.SIGN_FRAME_SIZE, metavar=("WIDTH", "HEIGHT"),
+                        help="Frame size every sign is resized to")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    index = build_atlas(args.gifs, args.out, tuple(args.size))
+    print(f"✅ Atlas written to {args.out}: {len(index['signs'])} signs, {index['frame_count']} frames")
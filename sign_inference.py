@@ -0,0 +1,148 @@
+import logging
+import os
+from collections import deque
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Keypoints per hand fed to the classifier: 21 landmarks x (x, y, z)
+FEATURES = 63
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 300):
+        """Rolling per-frame latency, in milliseconds, over the last `window` frames."""
+        self._samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds * 1000)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(self._samples, q)) if self._samples else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {"frames": len(self), "p50_ms": self.percentile(50), "p99_ms": self.percentile(99)}
+
+
+class SignInferenceEngine:
+    def __init__(
+        self,
+        model_path: str,
+        labels: Dict[str, int],
+        backend: str = "auto",
+        max_hands: int = 2,
+        quantize: bool = True,
+        target_fps: float = 30.0,
+    ):
+        """
+        Low-latency CPU inference for the hand-keypoint sign classifier.
+
+        All hands of a frame are classified in one call. With the "tflite"
+        backend, the Keras model is converted once (dynamic-range quantized by
+        default) and cached next to it as `.tflite`. The "keras" backend calls a
+        traced `tf.function` instead of `model.predict`, which skips the
+        per-call setup `predict` does.
+
+        Args:
+            model_path: Keras model (.h5) or TFLite model (.tflite)
+            labels: Word -> class id mapping of the classifier
+            backend: "tflite", "keras", or "auto" (TFLite when available)
+            max_hands: Largest batch per frame
+            quantize: Quantize weights when converting to TFLite
+            target_fps: Frame budget used by `should_skip`
+        """
+        self.max_hands = max_hands
+        self.frame_budget = 1.0 / target_fps
+        self.latency = LatencyTracker()
+        self._ema = 0.0
+        self._skipped = False
+
+        # Class id -> word, so a prediction maps to its label with one index
+        self.labels = np.empty(max(labels.values()) + 1, dtype=object)
+        for word, class_id in labels.items():
+            self.labels[class_id] = word
+
+        import tensorflow as tf
+
+        self.backend = backend
+        if backend == "auto":
+            self.backend = "tflite" if hasattr(tf, "lite") else "keras"
+        if self.backend == "tflite":
+            self._init_tflite(tf, model_path, quantize)
+        else:
+            self._init_keras(tf, model_path)
+        logger.info(f"Sign inference backend: {self.backend}")
+
+    def _init_tflite(self, tf, model_path: str, quantize: bool):
+        tflite_path = model_path if model_path.endswith(".tflite") else os.path.splitext(model_path)[0] + ".tflite"
+        if not os.path.exists(tflite_path) or (
+            tflite_path != model_path and os.path.getmtime(tflite_path) < os.path.getmtime(model_path)
+        ):
+            converter = tf.lite.TFLiteConverter.from_keras_model(tf.keras.models.load_model(model_path))
+            if quantize:
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            with open(tflite_path, "wb") as f:
+                f.write(converter.convert())
+            logger.info(f"Converted {model_path} to {tflite_path}")
+
+        self._interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=os.cpu_count())
+        input_index = self._interpreter.get_input_details()[0]["index"]
+        self._interpreter.resize_tensor_input(input_index, [self.max_hands, FEATURES])
+        self._interpreter.allocate_tensors()
+        self._input_index = input_index
+        self._output_index = self._interpreter.get_output_details()[0]["index"]
+        self._batch = np.zeros((self.max_hands, FEATURES), np.float32)
+
+    def _init_keras(self, tf, model_path: str):
+        model = tf.keras.models.load_model(model_path)
+        self._model_fn = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec([None, FEATURES], tf.float32)],
+        )
+        self._model_fn(tf.zeros([1, FEATURES]))  # Trace once up front
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        if self.backend == "tflite":
+            # Fixed-size input tensor: pad the batch rather than reallocating
+            self._batch[:len(batch)] = batch
+            self._batch[len(batch):] = 0
+            self._interpreter.set_tensor(self._input_index, self._batch)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output_index)[:len(batch)]
+        return self._model_fn(batch).numpy()
+
+    def predict(self, keypoints: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Classifies every hand of a frame in one call.
+
+        Args:
+            keypoints: One 63-value keypoint vector per hand
+
+        Returns:
+            Tuple of (words, confidences), one entry per hand
+        """
+        if not len(keypoints):
+            return self.labels[:0], np.empty(0, np.float32)
+        batch = np.asarray(keypoints, np.float32).reshape(-1, FEATURES)[:self.max_hands]
+        scores = self._run(batch)
+        class_ids = scores.argmax(axis=1)
+        return self.labels[class_ids], scores[np.arange(len(class_ids)), class_ids]
+
+    def record_frame(self, seconds: float):
+        """Records the end-to-end processing time of a frame."""
+        self.latency.add(seconds)
+        self._ema = 0.9 * self._ema + 0.1 * seconds if self._ema else seconds
+
+    def should_skip(self) -> bool:
+        """
+        True when frames take longer than the frame budget, in which case every
+        other frame skips inference and reuses the previous predictions.
+        """
+        self._skipped = self._ema > self.frame_budget and not self._skipped
+        return self._skipped
+
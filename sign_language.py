@@ -1,48 +1,82 @@
+import os
+
 import cv2
 import mediapipe as mp
 import numpy as np
 from flask import Flask, request, jsonify
 
+from gesture_matcher import GestureMatcher, landmark_features
+from hand_landmarks import LANDMARKS_NAME, NUM_LANDMARKS, LandmarkStore
+from sign_pipeline import SignPipeline
+
 app = Flask(__name__)
 
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 
-# Sample gestures for sign language (Replace with actual dataset)
-SIGN_GESTURES = {
-    "hello": np.array([0.5, 0.3, 0.2, 0.7, 0.1]),  
-    "thank": np.array([0.6, 0.2, 0.3, 0.8, 0.15]),
-    "you": np.array([0.4, 0.25, 0.5, 0.6, 0.2]),
-}
+# Hand landmarks of the training videos, written by hand_landmarks.py
+LANDMARKS_PATH = os.path.join("sign_language_data/datasets/Custom/shards", LANDMARKS_NAME)
+
+def load_gesture_matcher(path=LANDMARKS_PATH):
+    """One template per training video (see `GestureMatcher.from_landmarks`), or an empty matcher."""
+    if not os.path.exists(path):
+        print(f"⚠️ Warning: No hand landmarks at '{path}', gestures will not be recognized.")
+        return GestureMatcher(NUM_LANDMARKS * 3)
+    return GestureMatcher.from_landmarks(LandmarkStore(path))
+
+# All gesture templates stacked into one matrix; grow it with gesture_matcher.add(labels, vectors)
+gesture_matcher = load_gesture_matcher()
 
-def generate_sign_gesture(text):
+def match_gestures(keypoints):
+    """Returns the closest gesture for each hand's (21, 3) landmarks (one hand or a batch)."""
+    labels, _ = gesture_matcher.match(landmark_features(keypoints))
+    return list(labels)
+
+def generate_sign_gesture(text, source=0):
     """Generates sign language gestures from text."""
-    cap = cv2.VideoCapture(0)  # Open webcam
     hands = mp.solutions.hands.Hands()
     words = text.split()
-    
-    for word in words:
-        print(f"🎥 Generating sign for: {word}")
+    if not words:
+        return f"Generated sign sequence for: {text}"
+    current = {"index": 0}
+
+    def detect(frame):
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        result = hands.process(rgb_frame)
+        gestures = []
+        if result.multi_hand_landmarks and len(gesture_matcher):
+            # Every hand in the frame is matched in one batch
+            keypoints = np.array([[[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark]
+                                  for hand_landmarks in result.multi_hand_landmarks], np.float32)
+            gestures = [label for label in match_gestures(keypoints) if label is not None]
+        return result, gestures
 
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
+    def show(packet):
+        frame, (result, gestures) = packet.frame, packet.result
+        word = words[current["index"]]
 
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            result = hands.process(rgb_frame)
+        if result.multi_hand_landmarks:
+            for hand_landmarks in result.multi_hand_landmarks:
+                mp_drawing.draw_landmarks(frame, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS)
 
-            if result.multi_hand_landmarks:
-                for hand_landmarks in result.multi_hand_landmarks:
-                    mp_drawing.draw_landmarks(frame, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS)
+        cv2.putText(frame, f"Sign: {word}", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
+        if gestures:
+            color = (0, 200, 0) if word.lower() in gestures else (0, 0, 255)
+            cv2.putText(frame, f"Seen: {', '.join(gestures)}", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2,
+                        cv2.LINE_AA)
+        cv2.imshow("Sign Language Generator", frame)
 
-            cv2.putText(frame, f"Sign: {word}", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
-            cv2.imshow("Sign Language Generator", frame)
+        if cv2.waitKey(1) & 0xFF == ord("q"):
+            current["index"] += 1  # Move to the next word
+            if current["index"] == len(words):
+                return False
+            print(f"🎥 Generating sign for: {words[current['index']]}")
+        return True
 
-            if cv2.waitKey(300) & 0xFF == ord("q"):
-                break  # Move to the next word
+    print(f"🎥 Generating sign for: {words[0]}")
+    # Webcam (or video file) capture and hand detection run on their own threads
+    SignPipeline(source, process=detect).run(show)
 
-    cap.release()
     cv2.destroyAllWindows()
     return f"Generated sign sequence for: {text}"
 
@@ -54,4 +88,8 @@ def generate_sign():
     if not transcript:
         return jsonify({"error": "No transcript provided"}), 400
 
-    response = g
+    response = generate_sign_gesture(transcript)
+    return jsonify({"message": response})
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=5000)
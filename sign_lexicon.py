@@ -0,0 +1,295 @@
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SIGN_EXTENSIONS = (".gif",)
+# Seconds between full rescans that catch files overwritten in place (the folder mtime does not change)
+RESCAN_INTERVAL = 5.0
+
+_PUNCTUATION = re.compile(r"[^\w']+")
+_PHRASE_SEPARATORS = re.compile(r"[\s_\-]+")
+
+# Suffix rules tried in order: (suffix, replacement)
+_SUFFIX_RULES = (
+    ("'s", ""), ("s'", "s"),
+    ("ies", "y"), ("ves", "f"), ("es", ""), ("s", ""),
+    ("ing", ""), ("ing", "e"),
+    ("ied", "y"), ("ed", ""), ("ed", "e"),
+    ("er", ""), ("est", ""), ("ly", ""),
+)
+
+_END = "\0"  # Trie key holding the sign id of a complete phrase
+
+
+def file_version(stat: os.stat_result) -> str:
+    """Version string of a sign file: changes whenever the file is rewritten."""
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def normalize_token(token: str) -> str:
+    """Lowercases a token and strips surrounding punctuation ("Rain." -> "rain")."""
+    return _PUNCTUATION.sub("", token.lower()).strip("'")
+
+
+def phrase_tokens(phrase: str) -> Tuple[str, ...]:
+    """Splits a phrase or asset name ("thank_you", "thank you") into normalized tokens."""
+    return tuple(t for t in (normalize_token(part) for part in _PHRASE_SEPARATORS.split(phrase)) if t)
+
+
+@dataclass
+class SignMatch:
+    start: int          # Index of the first token covered
+    end: int            # Index one past the last token covered
+    text: str           # Original tokens joined by spaces
+    sign_id: Optional[str]
+
+
+@dataclass
+class _Index:
+    """One snapshot of the lexicon. Only the lemma memo changes once it is published."""
+    trie: dict
+    vocabulary: set                   # Every token of every phrase, for lemmatization
+    assets: Dict[str, str]            # sign id -> file name
+    versions: Dict[str, str]          # sign id -> asset version (changes when the file does)
+    lemmas: Dict[str, str] = field(default_factory=dict)  # Lemmatization memo, filled by lookups
+
+
+def _build_trie(entries: Iterable[Tuple[str, str]]) -> Tuple[dict, set]:
+    """Trie and vocabulary over (phrase, sign id) entries; later entries win."""
+    trie, vocabulary = {}, set()
+    for phrase, sign_id in entries:
+        tokens = phrase_tokens(phrase)
+        if not tokens:
+            continue
+        node = trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = sign_id
+        vocabulary.update(tokens)
+    return trie, vocabulary
+
+
+def _insert(node: dict, tokens: Tuple[str, ...], sign_id: str) -> dict:
+    """Copy of `node` with the phrase added; only the nodes along its path are copied."""
+    node = dict(node)
+    if tokens:
+        node[tokens[0]] = _insert(node.get(tokens[0], {}), tokens[1:], sign_id)
+    else:
+        node[_END] = sign_id
+    return node
+
+
+def _delete(node: dict, tokens: Tuple[str, ...]) -> dict:
+    """Copy of `node` without the phrase, pruning branches that no longer lead to any phrase."""
+    if not tokens:
+        return {key: child for key, child in node.items() if key != _END}
+    child = node.get(tokens[0])
+    if child is None:
+        return node
+    child = _delete(child, tokens[1:])
+    node = dict(node)
+    if child:
+        node[tokens[0]] = child
+    else:
+        del node[tokens[0]]
+    return node
+
+
+def _lemmatize(index: _Index, token: str) -> str:
+    """See `SignLexicon.lemmatize`; memoized per snapshot."""
+    lemma = index.lemmas.get(token)
+    if lemma is not None:
+        return lemma
+    lemma = token
+    if token not in index.vocabulary:
+        for suffix, replacement in _SUFFIX_RULES:
+            if token.endswith(suffix) and len(token) > len(suffix) + 1:
+                candidate = token[: -len(suffix)] + replacement
+                if candidate in index.vocabulary:
+                    lemma = candidate
+                    break
+                # Doubled final consonant: "running" -> "runn" -> "run"
+                if len(candidate) > 2 and candidate[-1] == candidate[-2] and candidate[:-1] in index.vocabulary:
+                    lemma = candidate[:-1]
+                    break
+    index.lemmas[token] = lemma
+    return lemma
+
+
+class SignLexicon:
+    def __init__(self, sign_folder=None, phrases: Optional[Dict[str, str]] = None):
+        """
+        In-memory index of the available signs.
+
+        Tokens are normalized and lemmatized against the known vocabulary, and a
+        trie over token sequences finds the longest multi-word phrase at each
+        position, so resolving a transcript is a single pass with no filesystem
+        access.
+
+        The index is an immutable snapshot: `refresh`, `add` and `remove` build
+        a new one and publish it with a single assignment, so lookups on other
+        threads never see a half-updated trie and need no lock.
+
+        Args:
+            sign_folder: Folder whose sign files ("thank_you.gif") define the signs
+            phrases: Extra phrase -> sign id entries
+        """
+        self.sign_folder = sign_folder
+        self.phrases: Dict[str, str] = dict(phrases or {})  # Kept across refreshes
+        self._index = _Index(*_build_trie(self.phrases.items()), {}, {})
+        self._refresh_lock = threading.Lock()
+        self._folder_mtime = None
+        self._scanned_at = float("-inf")
+
+        if sign_folder is not None:
+            self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._index.assets)
+
+    @property
+    def assets(self) -> Dict[str, str]:
+        """sign id -> file name, from the current snapshot."""
+        return self._index.assets
+
+    @property
+    def versions(self) -> Dict[str, str]:
+        """sign id -> asset version, from the current snapshot."""
+        return self._index.versions
+
+    # --- Index maintenance ---
+
+    def add(self, phrase: str, sign_id: str):
+        """Adds an extra phrase; it is kept across refreshes."""
+        tokens = phrase_tokens(phrase)
+        if not tokens:
+            return
+        with self._refresh_lock:
+            self.phrases[phrase] = sign_id
+            index = self._index
+            self._index = _Index(_insert(index.trie, tokens, sign_id), index.vocabulary | set(tokens),
+                                 index.assets, index.versions)
+
+    def remove(self, phrase: str):
+        """Removes a phrase from the index (and from the extra phrases)."""
+        tokens = phrase_tokens(phrase)
+        if not tokens:
+            return
+        with self._refresh_lock:
+            self.phrases.pop(phrase, None)
+            index = self._index
+            self._index = _Index(_delete(index.trie, tokens), index.vocabulary, index.assets, index.versions)
+
+    def refresh(self) -> bool:
+        """
+        Re-indexes the sign folder if it changed since the last scan. Costs one
+        `stat` when the folder is unchanged; at most every `RESCAN_INTERVAL`
+        seconds the files are stat'ed as well, so a GIF overwritten in place
+        gets a new version. When signs were added or removed, a new trie is
+        built from the assets and extra phrases and swapped in. Safe to call
+        from a worker thread while other threads look signs up.
+
+        Returns:
+            True if the index (or an asset version) was updated
+        """
+        with self._refresh_lock:
+            try:
+                mtime = os.stat(self.sign_folder).st_mtime_ns
+            except OSError:
+                return False
+            now = time.monotonic()
+            if mtime == self._folder_mtime and now - self._scanned_at < RESCAN_INTERVAL:
+                return False
+            self._folder_mtime = mtime
+            self._scanned_at = now
+
+            current = {}
+            versions = {}
+            with os.scandir(self.sign_folder) as entries:
+                for entry in entries:
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext.lower() in SIGN_EXTENSIONS and entry.is_file():
+                        stat = entry.stat()
+                        current[stem.lower()] = entry.name
+                        versions[stem.lower()] = file_version(stat)
+
+            index = self._index
+            changed = [sign_id for sign_id, version in versions.items()
+                       if sign_id in index.assets and index.versions.get(sign_id) != version]
+            removed = index.assets.keys() - current.keys()
+            added = current.keys() - index.assets.keys()
+            if not (added or removed or changed):
+                return False
+            if added or removed:
+                # Extra phrases come last, so they take precedence over asset names
+                trie, vocabulary = _build_trie([*((sign_id, sign_id) for sign_id in current),
+                                                *self.phrases.items()])
+                self._index = _Index(trie, vocabulary, current, versions)
+            else:
+                self._index = _Index(index.trie, index.vocabulary, current, versions, index.lemmas)
+        logger.info(f"Sign lexicon updated: +{len(added)} -{len(removed)} ~{len(changed)} ({len(current)} signs)")
+        return True
+
+    # --- Lookup ---
+
+    def lemmatize(self, token: str) -> str:
+        """
+        Maps a normalized token to a base form the lexicon knows ("raining" -> "rain"),
+        or returns it unchanged.
+        """
+        return _lemmatize(self._index, token)
+
+    def lookup(self, word: str) -> Optional[str]:
+        """Sign id for a single word or phrase, or None."""
+        index = self._index
+        node = index.trie
+        for token in phrase_tokens(word):
+            node = node.get(_lemmatize(index, token))
+            if node is None:
+                return None
+        return node.get(_END)
+
+    def is_prefix(self, tokens: Iterable[str]) -> bool:
+        """True if `tokens` are the start of a longer phrase in the lexicon."""
+        index = self._index
+        node = index.trie
+        for token in tokens:
+            node = node.get(_lemmatize(index, normalize_token(token)))
+            if node is None:
+                return False
+        return any(key != _END for key in node)
+
+    def resolve(self, tokens: Iterable[str]) -> List[SignMatch]:
+        """
+        Resolves a token sequence to signs, preferring the longest phrase at
+        each position. Tokens without a sign come back with `sign_id=None`.
+        """
+        index = self._index
+        tokens = list(tokens)
+        keys = [_lemmatize(index, normalize_token(token)) for token in tokens]
+        matches = []
+        i = 0
+        while i < len(tokens):
+            if not keys[i]:
+                i += 1  # Pure punctuation
+                continue
+            node, j = index.trie, i
+            best_end, best_id = None, None
+            while j < len(keys) and keys[j] in node:
+                node = node[keys[j]]
+                j += 1
+                if _END in node:
+                    best_end, best_id = j, node[_END]
+            if best_end is None:
+                matches.append(SignMatch(i, i + 1, tokens[i], None))
+                i += 1
+            else:
+                matches.append(SignMatch(i, best_end, " ".join(tokens[i:best_end]), best_id))
+                i = best_end
+        return matches
@@ -0,0 +1,191 @@
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Union
+
+import cv2
+import numpy as np
+
+from sign_inference import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FramePacket:
+    frame_id: int
+    captured_at: float          # time.perf_counter() when the frame was read
+    frame: np.ndarray
+    result: Any = None          # Set by the inference stage
+    timings: dict = field(default_factory=dict)
+
+
+class DropQueue:
+    def __init__(self, maxsize: int = 1):
+        """
+        Bounded queue that never blocks the producer: when full, the oldest
+        item is dropped to make room, so consumers always see recent frames.
+        """
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None):
+        return self._queue.get(timeout=timeout)
+
+
+class SignPipeline:
+    def __init__(
+        self,
+        source: Union[int, str] = 0,
+        process: Optional[Callable[[np.ndarray], Any]] = None,
+        queue_size: int = 1,
+        max_age: float = 0.25,
+        realtime: Optional[bool] = None,
+        flip: bool = False,
+    ):
+        """
+        Pipelined capture -> inference -> sink runtime.
+
+        Capture and inference each run on their own thread; the sink runs on
+        the calling thread (so `cv2.imshow` stays on the main thread). Stages
+        are connected by `DropQueue`s, and the inference stage also discards
+        frames older than `max_age`, so a slow stage drops frames instead of
+        building up lag.
+
+        Args:
+            source: Webcam index or video file path
+            process: Inference callable, `frame -> result`, run on the inference thread
+            queue_size: Capacity of each queue between stages
+            max_age: Frames waiting longer than this (seconds) are skipped by inference
+            realtime: Pace a video file at its own frame rate (default: True for files)
+            flip: Mirror frames horizontally (selfie view)
+        """
+        self.source = source
+        self.process = process or (lambda frame: None)
+        self.max_age = max_age
+        self.is_file = isinstance(source, str) and not source.isdigit()
+        self.realtime = self.is_file if realtime is None else realtime
+        self.flip = flip
+
+        self._frames = DropQueue(queue_size)
+        self._results = DropQueue(queue_size)
+        self._stop = threading.Event()
+        self._threads = []
+        self.latency = LatencyTracker()  # Capture -> sink
+        self.stale = 0                   # Frames skipped by inference for being too old
+        self.captured = 0
+        self.error: Optional[Exception] = None  # Raised by `process`, re-raised by `run`
+
+    # --- Stages ---
+
+    def _capture(self):
+        source = int(self.source) if isinstance(self.source, str) and self.source.isdigit() else self.source
+        cap = cv2.VideoCapture(source)
+        if not self.is_file:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Keep the driver from queueing old frames
+        frame_interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        started = time.perf_counter()
+        try:
+            while not self._stop.is_set() and cap.isOpened():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if self.flip:
+                    frame = cv2.flip(frame, 1)
+                if self.realtime:
+                    delay = started + self.captured * frame_interval - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                self._frames.put(FramePacket(self.captured, time.perf_counter(), frame))
+                self.captured += 1
+        finally:
+            cap.release()
+            self._frames.put(None)  # End of stream
+
+    def _infer(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    packet = self._frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if packet is None:
+                    break
+                if time.perf_counter() - packet.captured_at > self.max_age:
+                    self.stale += 1
+                    continue
+                started = time.perf_counter()
+                packet.result = self.process(packet.frame)
+                packet.timings["inference_ms"] = (time.perf_counter() - started) * 1000
+                self._results.put(packet)
+        except Exception as e:
+            logger.exception("Inference stage failed, stopping the pipeline")
+            self.error = e
+            self._stop.set()  # Stops the capture thread too
+        finally:
+            self._results.put(None)
+
+    # --- Control ---
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture, name="sign-capture", daemon=True),
+            threading.Thread(target=self._infer, name="sign-inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+
+    def run(self, sink: Callable[[FramePacket], bool]):
+        """
+        Starts the pipeline and feeds processed frames to `sink` on this thread
+        until the source ends or `sink` returns False. An exception raised by
+        `process` stops the pipeline and is re-raised here.
+        """
+        self.error = None
+        self.start()
+        try:
+            while True:
+                try:
+                    packet = self._results.get(timeout=0.1)
+                except queue.Empty:
+                    if not any(thread.is_alive() for thread in self._threads):
+                        break
+                    continue
+                if packet is None:
+                    break
+                if sink(packet) is False:
+                    break
+                self.latency.add(time.perf_counter() - packet.captured_at)
+        finally:
+            self.stop()
+        if self.error is not None:
+            raise self.error
+        logger.info(f"Pipeline finished: {self.stats()}")
+
+    def stats(self) -> dict:
+        return {
+            **self.latency.summary(),
+            "captured": self.captured,
+            "dropped": self._frames.dropped + self._results.dropped,
+            "stale": self.stale,
+        }
@@ -0,0 +1,142 @@
+import logging
+import os
+import subprocess
+from typing import Iterable, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Encoder arguments per output container
+_CODECS = {
+    ".mp4": ["-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", "-movflags", "+faststart"],
+    ".webm": ["-c:v", "libvpx-vp9", "-deadline", "realtime", "-cpu-used", "8", "-b:v", "0", "-crf", "35",
+              "-pix_fmt", "yuv420p"],
+}
+
+
+class SignVideoWriter:
+    def __init__(self, output_path: str, frame_size: Tuple[int, int], fps: int = config.RENDER_FPS,
+                 ffmpeg_path: str = config.FFMPEG_PATH):
+        """
+        Streams raw BGR frames into an ffmpeg encoder process.
+
+        Args:
+            output_path: Video to write; the extension (.mp4 or .webm) picks the codec
+            frame_size: (width, height) of every frame
+            fps: Constant output frame rate
+            ffmpeg_path: Path to ffmpeg executable
+        """
+        extension = os.path.splitext(output_path)[1].lower()
+        if extension not in _CODECS:
+            raise ValueError(f"Unsupported output format: {extension} (use .mp4 or .webm)")
+
+        self.output_path = output_path
+        self.frame_size = tuple(frame_size)
+        self.frames_written = 0
+        width, height = self.frame_size
+        command = [
+            ffmpeg_path, "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            *_CODECS[extension], output_path,
+        ]
+        logger.debug(f"Running command: {command}")
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def write(self, frame: np.ndarray):
+        if (frame.shape[1], frame.shape[0]) != self.frame_size:
+            frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_AREA)
+        self._process.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+        self.frames_written += 1
+
+    def close(self):
+        """Flushes the encoder and raises if ffmpeg failed."""
+        self._process.stdin.close()
+        stderr = self._process.stderr.read().decode(errors="replace").strip()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"ffmpeg encoding failed: {stderr}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._process.kill()
+            self._process.wait()
+
+
+class SignRenderer:
+    def __init__(self, tts, fps: int = config.RENDER_FPS, frame_size: Tuple[int, int] = config.SIGN_FRAME_SIZE,
+                 ffmpeg_path: str = config.FFMPEG_PATH):
+        """
+        Headless renderer that turns a sign sequence into a video file.
+
+        Args:
+            tts: `TextToSign` providing sign frames and fingerspelling
+            fps: Constant output frame rate
+            frame_size: (width, height) of the output video
+            ffmpeg_path: Path to ffmpeg executable
+        """
+        self.tts = tts
+        self.fps = fps
+        self.frame_size = tuple(frame_size)
+        self.ffmpeg_path = ffmpeg_path
+        width, height = self.frame_size
+        self._blank = np.zeros((height, width, 3), np.uint8)
+
+    def _clip(self, entry: dict) -> Tuple[Optional[np.ndarray], int]:
+        frames, frame_ms = self.tts.sign_frames(entry.get("sign_id"))
+        if frames is None and entry.get("fingerspell"):
+            frames, frame_ms = self.tts.fingerspeller.spell(entry["word"]), self.tts.fingerspeller.frame_ms
+        return frames, frame_ms
+
+    def frames(self, signs: Iterable[dict], timed: bool = True) -> Iterator[np.ndarray]:
+        """
+        Yields output frames at a constant `fps`, one at a time.
+
+        Each sign's frames are repeated or dropped to keep its own frame timing.
+        With `timed`, blank frames are inserted so each sign starts at its word's
+        start time (a sign that overruns delays the next one rather than being cut).
+        """
+        written = 0
+        for entry in signs:
+            frames, frame_ms = self._clip(entry)
+            if frames is None:
+                continue
+
+            start = entry.get("start")
+            if timed and start is not None:
+                while written < round(start * self.fps):
+                    yield self._blank
+                    written += 1
+
+            clip_written = 0
+            clip_time = 0.0
+            for frame in frames:
+                clip_time += frame_ms / 1000
+                while clip_written < round(clip_time * self.fps):
+                    yield frame
+                    clip_written += 1
+            written += clip_written
+
+    def render(self, signs: Iterable[dict], output_path: str, timed: bool = True, progress=None) -> str:
+        """
+        Encodes the sign sequence into `output_path` (.mp4 or .webm), writing
+        frames to ffmpeg as they are produced.
+
+        Returns:
+            The output path
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with SignVideoWriter(output_path, self.frame_size, self.fps, self.ffmpeg_path) as writer:
+            for frame in self.frames(signs, timed):
+                writer.write(frame)
+                if progress and writer.frames_written % (self.fps * 10) == 0:
+                    progress("rendering", status="frames", seconds=writer.frames_written / self.fps)
+        logger.info(f"Rendered {writer.frames_written} frame(s) to {output_path}")
+        return output_path
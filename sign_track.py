@@ -0,0 +1,60 @@
+from typing import Iterable, List, Optional
+from urllib.parse import quote
+
+import config
+
+SIGN_TRACK_VERSION = 1
+
+
+def build_sign_track(signs: Iterable[dict], tts, asset_base_url: str = config.SIGN_ASSET_BASE_URL) -> dict:
+    """
+    Builds a lightweight sign track for client-side overlay.
+
+    Cues are `[start, end, sign_id]` in seconds, taken from the timed signs of
+    `TextToSign.timeline_to_signs`. Fingerspelled words are split into one cue
+    per letter across the word's time range. Asset URLs carry the file version,
+    so clients and CDNs can cache them indefinitely.
+
+    Args:
+        signs: Timed sign entries
+        tts: `TextToSign` whose lexicon provides the assets
+        asset_base_url: Base URL the sign files are served from
+
+    Returns:
+        Dict with `version`, `cues` and `assets` (sign id -> URL)
+    """
+    lexicon = tts.lexicon
+    cues: List[list] = []
+    for entry in signs:
+        start, end = entry.get("start"), entry.get("end")
+        if start is None or end is None:
+            continue
+        if entry.get("sign_id"):
+            cues.append([round(start, 3), round(end, 3), entry["sign_id"]])
+        elif entry.get("fingerspell"):
+            cues.extend(letter_cues(entry["word"], start, end, lexicon))
+
+    used = {cue[2] for cue in cues}
+    assets = {
+        sign_id: asset_url(lexicon.assets[sign_id], lexicon.versions.get(sign_id), asset_base_url)
+        for sign_id in sorted(used)
+    }
+    return {"version": SIGN_TRACK_VERSION, "cues": cues, "assets": assets}
+
+
+def letter_cues(word: str, start: float, end: float, lexicon) -> List[list]:
+    """Fingerspelling cues for `word`, splitting [start, end] evenly across its letters."""
+    letter_ids = [lexicon.lookup(ch) for ch in word.lower() if ch.isalpha()]
+    if not letter_ids or None in letter_ids:
+        return []
+    step = (end - start) / len(letter_ids)
+    return [
+        [round(start + i * step, 3), round(start + (i + 1) * step, 3), sign_id]
+        for i, sign_id in enumerate(letter_ids)
+    ]
+
+
+def asset_url(file_name: str, version: Optional[str], base_url: str = config.SIGN_ASSET_BASE_URL) -> str:
+    """Versioned URL of a sign file."""
+    url = f"{base_url.rstrip('/')}/{quote(file_name)}"
+    return f"{url}?v={version}" if version else url
@@ -1,14 +1,25 @@
 import os
 import subprocess
-import whisper
 import time
 import shutil
 import tempfile
 import logging
-from typing import Optional, Tuple
+import threading
+from typing import Callable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from model_registry import registry
+from remote_fetch import get_fetcher, is_remote
+from timeline import Timeline
+
+# Whisper expects 16 kHz mono audio
+SAMPLE_RATE = 16000
 
 class SpeechToText:
-    def __init__(self, model_size: str = "base", ffmpeg_path: Optional[str] = None, language: Optional[str] = None):
+    def __init__(self, model_size: str = "base", ffmpeg_path: Optional[str] = None, language: Optional[str] = None,
+                 cache=None, chunk_workers: int = 0):
         """
         Initialize the Speech-to-Text processor with Whisper.
         
@@ -16,44 +27,36 @@ class SpeechToText:
             model_size: Size of the Whisper model ('tiny', 'base', 'small', 'medium', 'large')
             ffmpeg_path: Path to ffmpeg executable, uses system path if None
             language: Target language code (e.g., 'en' for English) to improve transcription accuracy
+            cache: Optional `TranscriptionCache` consulted before running Whisper
+            chunk_workers: When > 0, split audio at silences and transcribe the chunks
+                in parallel across this many processes
         """
         # Set up logging
         self.setup_logging()
         
-        # Force CPU usage to avoid CUDA errors
-        os.environ["CUDA_VISIBLE_DEVICES"] = ""
-        
-        # Ensure the whisper cache directory exists
-        cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "whisper")
-        os.makedirs(cache_dir, exist_ok=True)
-        self.logger.info(f"Whisper cache directory: {cache_dir}")
-        
+        # Models are shared process-wide, so constructing this class is cheap
         self.logger.info("Initializing Whisper Model...")
-        try:
-            # Try to load the model with explicit download location
-            self.model = whisper.load_model(model_size, download_root=cache_dir)
-            self.logger.info(f"Whisper Model '{model_size}' loaded successfully!")
-        except Exception as e:
-            self.logger.error(f"Error loading Whisper Model: {e}")
-            
-            # Try to download the model manually
-            try:
-                self.logger.info(f"Attempting to download model '{model_size}' manually...")
-                model_path = os.path.join(cache_dir, f"{model_size}.pt")
-                if not os.path.exists(model_path):
-                    whisper._download(model_size, cache_dir, False)
-                    self.logger.info(f"Model downloaded to {model_path}")
-                
-                # Try loading again
-                self.model = whisper.load_model(model_size, download_root=cache_dir)
-                self.logger.info("Model loaded successfully after manual download!")
-            except Exception as download_error:
-                self.logger.error(f"Manual download failed: {download_error}")
-                raise
+        registry.get(model_size)
 
         self.ffmpeg_path = ffmpeg_path or "ffmpeg"
+        self.model_size = model_size
         self.language = language
+        self.cache = cache
+        self.chunk_workers = chunk_workers
+        self._chunked_transcriber = None  # Created on first chunked transcription
+        self.last_words = []  # Word timestamps of the most recent transcription
+        self.last_text = None  # Text of the most recent transcription
         self.temp_files = []  # Track temporary files for cleanup
+
+    @property
+    def last_timeline(self) -> Timeline:
+        """Word timeline of the most recent transcription."""
+        return self._timeline(self.last_text, self.last_words)
+
+    @property
+    def model(self):
+        """The Whisper model for this instance's default size, from the shared registry."""
+        return registry.get(self.model_size)
     
     def setup_logging(self):
         """Configure logging for the module."""
@@ -66,7 +69,10 @@ class SpeechToText:
 
     def extract_audio(self, video_path: str) -> Optional[str]:
         """
-        Extracts audio from video and saves it as a temporary file.
+        Extracts audio from video and saves it as a temporary WAV file.
+
+        `transcribe_video` decodes audio in memory via `load_audio`; this is kept
+        for callers that need the audio on disk.
         
         Args:
             video_path: Path to the video file
@@ -78,21 +84,20 @@ class SpeechToText:
             self.logger.error(f"Video file not found: {video_path}")
             return None
             
-        temp_dir = tempfile.gettempdir()
-        self.logger.info(f"Using temporary directory: {temp_dir}")
-        
-        filename = os.path.basename(video_path).split('.')[0]
-        audio_wav_path = os.path.join(temp_dir, f"{filename}_extracted_audio.wav")
+        filename = os.path.splitext(os.path.basename(video_path))[0]
+        fd, audio_wav_path = tempfile.mkstemp(prefix=f"{filename}_", suffix="_extracted_audio.wav")
+        os.close(fd)
         self.temp_files.append(audio_wav_path)
 
         self.logger.info(f"Extracting audio from {video_path}...")
         self.logger.info(f"Output audio will be saved to: {audio_wav_path}")
 
-        command = f'"{self.ffmpeg_path}" -i "{video_path}" -acodec pcm_s16le -ar 16000 -ac 1 "{audio_wav_path}" -y'
+        command = [self.ffmpeg_path, "-nostdin", "-i", video_path, "-acodec", "pcm_s16le",
+                   "-ar", str(SAMPLE_RATE), "-ac", "1", audio_wav_path, "-y"]
         
         try:
             self.logger.debug(f"Running command: {command}")
-            subprocess.run(command, shell=True, check=True)
+            subprocess.run(command, check=True)
             
             if os.path.exists(audio_wav_path):
                 file_size = os.path.getsize(audio_wav_path)
@@ -109,82 +114,165 @@ class SpeechToText:
             self.logger.error(f"Unexpected error during audio extraction: {e}")
             return None
 
-    def transcribe_audio(self, audio_path: str) -> Tuple[Optional[str], Optional[str]]:
+    def load_audio(self, video_path: str, start: Optional[float] = None,
+                   end: Optional[float] = None) -> Optional[np.ndarray]:
         """
-        Transcribes extracted audio and saves it to a temporary file.
-        
+        Decodes the audio track straight from ffmpeg's stdout into memory.
+
+        http(s) URLs are fetched through `remote_fetch`: only the audio is
+        downloaded when the container allows it, otherwise the download is
+        streamed into ffmpeg as it arrives.
+
         Args:
-            audio_path: Path to the audio file
-            
+            video_path: Path or http(s) URL of the video
+            start: Optional start offset in seconds
+            end: Optional end offset in seconds
+
         Returns:
-            Tuple of (path to transcription file, raw transcription text) or (None, None) on failure
+            16 kHz mono float32 samples in [-1, 1], or None if decoding failed
         """
-        self.logger.info(f"Checking file before transcription: {audio_path}")
+        chunks = None
+        if is_remote(video_path):
+            try:
+                source = get_fetcher().open(video_path)
+            except Exception as e:
+                self.logger.error(f"Could not fetch remote video {video_path}: {e}")
+                return None
+            input_path, chunks = (source.path, None) if source.path else ("pipe:0", source.chunks)
+        elif os.path.exists(video_path):
+            input_path = video_path
+        else:
+            self.logger.error(f"Video file not found: {video_path}")
+            return None
 
-        if not os.path.exists(audio_path):
-            self.logger.error(f"Error: Audio file not found -> {audio_path}")
-            return None, None
-            
-        # Check file size and permissions
+        command = [self.ffmpeg_path, "-hide_banner", "-loglevel", "error"]
+        if chunks is None:
+            command.append("-nostdin")
+        if start:
+            # Input seeking: ffmpeg skips straight to the offset instead of decoding up to it
+            command += ["-ss", f"{start:.3f}"]
+        command += ["-i", input_path]
+        if end is not None:
+            command += ["-t", f"{end - (start or 0):.3f}"]
+        command += ["-vn", "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"]
+
+        self.logger.info(f"Decoding audio from {video_path}...")
         try:
-            file_size = os.path.getsize(audio_path)
-            self.logger.info(f"Audio file size: {file_size} bytes")
-            
-            # Check if file is readable
-            with open(audio_path, 'rb') as f:
-                f.read(10)  # Try to read first 10 bytes
-                self.logger.info("Audio file is readable")
+            self.logger.debug(f"Running command: {command}")
+            if chunks is None:
+                stdout = subprocess.run(command, capture_output=True, check=True).stdout
+            else:
+                stdout = self._run_ffmpeg_streaming(command, chunks)
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"FFmpeg audio decoding failed: {e.stderr.decode(errors='replace').strip()}")
+            return None
         except Exception as e:
-            self.logger.error(f"Error accessing audio file: {e}")
-            return None, None
+            self.logger.error(f"Unexpected error during audio decoding: {e}")
+            return None
 
-        try:
-            self.logger.info("Transcribing with Whisper...")
-            
-            # Check whisper cache directory
-            cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "whisper")
-            if os.path.exists(cache_dir):
-                self.logger.info(f"Whisper cache directory exists: {cache_dir}")
+        audio = np.frombuffer(stdout, np.int16).astype(np.float32) / 32768.0
+        self.logger.info(f"Audio decoded: {len(audio) / SAMPLE_RATE:.1f}s")
+        return audio
+
+    @staticmethod
+    def _run_ffmpeg_streaming(command: list, chunks) -> bytes:
+        """Runs ffmpeg on `pipe:0`, feeding it `chunks` from a writer thread, and returns its stdout."""
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        failure = []
+
+        def feed():
+            try:
+                for chunk in chunks:
+                    process.stdin.write(chunk)
+            except BrokenPipeError:
+                pass  # ffmpeg stopped reading (e.g. the requested range ended)
+            except Exception as e:
+                failure.append(e)
+            finally:
+                chunks.close()
                 try:
-                    cache_contents = os.listdir(cache_dir)
-                    self.logger.info(f"Cache contents: {cache_contents}")
-                except Exception as e:
-                    self.logger.warning(f"Could not list cache directory contents: {e}")
-            else:
-                self.logger.warning(f"Whisper cache directory not found: {cache_dir}")
-            
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        stdout = process.stdout.read()
+        stderr = process.stderr.read()
+        process.wait()
+        writer.join()
+        if failure:
+            raise failure[0]
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command, stdout, stderr)
+        return stdout
+
+    def _transcribe(self, audio, progress: Optional[Callable] = None,
+                    model_size: Optional[str] = None) -> Tuple[str, list]:
+        """
+        Runs Whisper on an audio file path or on in-memory 16 kHz samples.
+
+        Returns:
+            Tuple of (transcription text, word timestamps)
+        """
+        self.logger.info("Transcribing with Whisper...")
+        if progress:
+            progress("transcription", status="started")
+
+        if self.chunk_workers > 0:
+            transcription, words = self._transcribe_chunked(audio, progress, model_size)
+        else:
             # Configure transcription options
             options = {}
             if self.language:
                 options["language"] = self.language
-            
+
             # Add word-level timestamps for better synchronization
             options["word_timestamps"] = True
+
+            model = registry.get(model_size or self.model_size)
+            result = model.transcribe(audio, **options)
+            transcription = result["text"]
+            words = [
+                {"word": word_data["word"], "start": word_data["start"], "end": word_data["end"]}
+                for segment in result.get("segments", [])
+                for word_data in segment.get("words", [])
+            ]
+
+            if progress:
+                segments = result.get("segments", [])
+                for index, segment in enumerate(segments):
+                    progress("transcription", status="segment", segment=index + 1,
+                             total=len(segments), end=segment["end"], text=segment["text"])
+        if progress:
+            progress("transcription", status="done")
+        return transcription, words
+
+    def transcribe_audio(self, audio_path: str, progress: Optional[Callable] = None,
+                         model_size: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Transcribes an audio file and saves the transcription to a temporary file.
+        
+        Args:
+            audio_path: Path to the audio file
+            progress: Optional callback `progress(stage, **info)` for progress reporting
+            model_size: Whisper model size for this call, defaults to the instance's size
             
+        Returns:
+            Tuple of (path to transcription file, raw transcription text) or (None, None) on failure
+        """
+        if not os.path.exists(audio_path):
+            self.logger.error(f"Error: Audio file not found -> {audio_path}")
+            return None, None
+
+        try:
             # Convert backslashes to forward slashes for compatibility
             normalized_path = audio_path.replace('\\', '/')
-            self.logger.info(f"Using normalized path for transcription: {normalized_path}")
-            
-            result = self.model.transcribe(normalized_path, **options)
-            transcription = result["text"]
-            
-            # Create a unique filename
+            transcription, words = self._transcribe(normalized_path, progress, model_size)
+
+            self.last_words, self.last_text = words, transcription
             filename = os.path.basename(audio_path).split('_extracted_audio')[0]
-            temp_transcript_path = os.path.join(tempfile.gettempdir(), f"{filename}_transcription.txt")
-            self.temp_files.append(temp_transcript_path)
-            
-            with open(temp_transcript_path, "w", encoding="utf-8") as f:
-                f.write(transcription)
-                
-                # Optionally, also save word-level timestamps if available
-                if "segments" in result:
-                    f.write("\n\n--- Word Timestamps ---\n")
-                    for segment in result["segments"]:
-                        if "words" in segment:
-                            for word_data in segment["words"]:
-                                f.write(f"{word_data['word']}: {word_data['start']:.2f}s - {word_data['end']:.2f}s\n")
-
-            self.logger.info(f"Transcription saved to: {temp_transcript_path}")
+            temp_transcript_path = self._save_transcript(filename, transcription, words)
             return temp_transcript_path, transcription
         except Exception as e:
             self.logger.error(f"Error in transcription: {e}")
@@ -192,24 +280,148 @@ class SpeechToText:
             self.logger.error(f"Detailed traceback: {traceback.format_exc()}")
             return None, None
 
-    def transcribe_video(self, video_path: str) -> Tuple[Optional[str], Optional[str]]:
+    def _transcribe_chunked(self, audio, progress: Optional[Callable],
+                            model_size: Optional[str]) -> Tuple[str, list]:
+        """Transcribes speech chunks in parallel, reporting each chunk as it finishes."""
+        from chunked_transcription import ChunkedTranscriber
+
+        if self._chunked_transcriber is None:
+            self._chunked_transcriber = ChunkedTranscriber(self.chunk_workers, self.model_size)
+
+        def on_partial(done, total, chunk):
+            self.logger.info(f"Chunk {done}/{total} transcribed (offset {chunk['offset']:.1f}s)")
+            if progress:
+                progress("transcription", status="chunk", segment=done, total=total,
+                         start=chunk["offset"], text=chunk["text"])
+
+        if isinstance(audio, str):
+            import whisper
+            audio = whisper.load_audio(audio)
+        result = self._chunked_transcriber.transcribe(audio, self.language, on_partial, model_size)
+        return result["text"], result["words"]
+
+    def _save_transcript(self, filename: str, transcription: str, words: list) -> str:
+        """Writes the transcript as a JSON word timeline to a uniquely named temporary file."""
+        fd, temp_transcript_path = tempfile.mkstemp(prefix=f"{filename}_", suffix="_transcription.json")
+        os.close(fd)
+        self.temp_files.append(temp_transcript_path)
+
+        Timeline.from_words(words, transcription).save(temp_transcript_path)
+
+        self.logger.info(f"Transcription saved to: {temp_transcript_path}")
+        return temp_transcript_path
+
+    @staticmethod
+    def _timeline(text: Optional[str], words: list) -> Timeline:
+        if not words and text:
+            return Timeline.from_text(text)
+        return Timeline.from_words(words, text)
+
+    def transcribe(self, video_path: str, progress: Optional[Callable] = None,
+                   model_size: Optional[str] = None, start: Optional[float] = None,
+                   end: Optional[float] = None) -> Optional[Timeline]:
         """
-        Extracts audio and transcribes it.
-        
+        Decodes the audio in memory and transcribes it, without writing files
+        or touching instance state, so one instance can serve concurrent jobs.
+        Same arguments as `transcribe_words`.
+
+        Returns:
+            The word timeline of the transcription, or None on failure
+        """
+        result = self.transcribe_words(video_path, progress, model_size, start, end)
+        return None if result is None else self._timeline(*result)
+
+    def transcribe_words(self, video_path: str, progress: Optional[Callable] = None,
+                         model_size: Optional[str] = None, start: Optional[float] = None,
+                         end: Optional[float] = None) -> Optional[Tuple[str, list]]:
+        """
+        Decodes the audio in memory and transcribes it into raw Whisper words.
+
         Args:
-            video_path: Path to the video file
-            
+            video_path: Path or http(s) URL of the video
+            progress: Optional callback `progress(stage, **info)` for progress reporting
+            model_size: Whisper model size for this call, defaults to the instance's size
+            start: Optional start offset in seconds; only this range is decoded
+            end: Optional end offset in seconds
+
         Returns:
-            Tuple of (path to transcription file, raw transcription text) or (None, None) on failure
+            Tuple of (transcription text, word timestamps), or None on failure
         """
         self.logger.info(f"Starting transcription process for: {video_path}")
-        
-        audio_path = self.extract_audio(video_path)
-        if audio_path:
-            transcript_path, transcript_text = self.transcribe_audio(audio_path)
-            return transcript_path, transcript_text
-        return None, None
-    
+        model_size = model_size or self.model_size
+
+        cache_key = None
+        if self.cache is not None:
+            try:
+                etag = get_fetcher().validator(video_path) if is_remote(video_path) else None
+                cache_key = self.cache.key_for(video_path, model_size, self.language, etag=etag,
+                                               time_range=(start, end))
+                cached = self.cache.get(cache_key)
+            except Exception as e:
+                self.logger.warning(f"Transcription cache unavailable: {e}")
+                cache_key, cached = None, None
+            if cached is not None:
+                self.logger.info("Transcription cache hit")
+                if progress:
+                    progress("transcription", status="cached")
+                return cached["text"], cached["words"]
+
+        if progress:
+            progress("audio_extraction", status="started")
+        audio = self.load_audio(video_path, start, end)
+        if audio is None:
+            return None
+        if progress:
+            progress("audio_extraction", status="done", duration=len(audio) / SAMPLE_RATE)
+
+        try:
+            transcript_text, words = self._transcribe(audio, progress, model_size)
+        except Exception as e:
+            self.logger.error(f"Error in transcription: {e}")
+            import traceback
+            self.logger.error(f"Detailed traceback: {traceback.format_exc()}")
+            return None
+
+        if start:
+            # Whisper timestamps are relative to the decoded range
+            for word in words:
+                word["start"] += start
+                word["end"] += start
+
+        if cache_key is not None:
+            try:
+                self.cache.put(cache_key, transcript_text, words)
+            except Exception as e:
+                self.logger.warning(f"Could not store transcription in cache: {e}")
+        return transcript_text, words
+
+    def transcribe_video(self, video_path: str, progress: Optional[Callable] = None,
+                         model_size: Optional[str] = None, start: Optional[float] = None,
+                         end: Optional[float] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Transcribes a video and saves the transcription to a temporary file.
+        Pipelines should prefer `transcribe`, which hands the timeline over in memory.
+
+        Args:
+            video_path: Path or http(s) URL of the video
+            progress: Optional callback `progress(stage, **info)` for progress reporting
+            model_size: Whisper model size for this call, defaults to the instance's size
+            start: Optional start offset in seconds; only this range is decoded
+            end: Optional end offset in seconds
+
+        Returns:
+            Tuple of (path to transcription file, raw transcription text) or (None, None) on failure
+        """
+        result = self.transcribe_words(video_path, progress, model_size, start, end)
+        if result is None:
+            return None, None
+        transcript_text, words = result
+        self.last_words, self.last_text = words, transcript_text
+
+        name = os.path.basename(urlsplit(video_path).path) if is_remote(video_path) else os.path.basename(video_path)
+        filename = os.path.splitext(name)[0] or "remote"
+        return self._save_transcript(filename, transcript_text, words), transcript_text
+
     def cleanup(self):
         """Remove all temporary files created during processing."""
         for file_path in self.temp_files:
@@ -227,37 +439,43 @@ class SpeechToText:
 if __name__ == "__main__":
     import argparse
     import sys
-    
-    # Default values that match your original script
-    default_ffmpeg_path = r"D:\ffmpeg-2025-03-13-git-958c46800e-essentials_build\ffmpeg-2025-03-13-git-958c46800e-essentials_build\bin\ffmpeg.exe"
-    default_video_path = r"D:\fullstack projects\sign_language_extension\sign_language_data\models\test_video.mp4"
-    
-    # Check if any command line arguments were provided
-    if len(sys.argv) > 1:
-        # Use argparse if arguments were provided
-        parser = argparse.ArgumentParser(description="Transcribe video audio using Whisper")
-        parser.add_argument("--video", required=True, help="Path to the video file")
-        parser.add_argument("--model", default="base", choices=["tiny", "base", "small", "medium", "large"], 
-                            help="Whisper model size")
-        parser.add_argument("--ffmpeg", default=None, help="Path to ffmpeg executable")
-        parser.add_argument("--language", default=None, help="Target language code (e.g., 'en' for English)")
-        
-        args = parser.parse_args()
-        video_path = args.video
-        ffmpeg_path = args.ffmpeg or default_ffmpeg_path
-        model_size = args.model
-        language = args.language
-    else:
-        # Use default values if no arguments were provided (backwards compatibility)
-        video_path = default_video_path
-        ffmpeg_path = default_ffmpeg_path
-        model_size = "base"
-        language = None
-        print(f"Using default video: {video_path}")
-    
+
+    import config
+
+    parser = argparse.ArgumentParser(description="Transcribe video audio using Whisper")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", help="Path to the video file")
+    source.add_argument("--batch", help="Directory, glob pattern, or list file of videos to transcribe")
+    parser.add_argument("--model", default=config.WHISPER_MODEL_SIZE, choices=["tiny", "base", "small", "medium", "large"],
+                        help="Whisper model size")
+    parser.add_argument("--ffmpeg", default=config.FFMPEG_PATH, help="Path to ffmpeg executable")
+    parser.add_argument("--language", default=config.WHISPER_LANGUAGE, help="Target language code (e.g., 'en' for English)")
+    parser.add_argument("--start", type=float, default=None, help="Start offset in seconds")
+    parser.add_argument("--end", type=float, default=None, help="End offset in seconds")
+    parser.add_argument("--chunk-workers", type=int, default=0,
+                        help="Split audio at silences and transcribe chunks in parallel on N processes")
+    parser.add_argument("--workers", type=int, default=1, help="Batch mode: number of worker processes")
+    parser.add_argument("--output", default="transcriptions.jsonl", help="Batch mode: JSONL manifest to append to")
+
+    args = parser.parse_args()
+
+    if args.batch:
+        from batch_transcribe import collect_videos, run_batch
+
+        videos = collect_videos(args.batch)
+        if not videos:
+            print(f"❌ No videos found for: {args.batch}")
+            sys.exit(1)
+        summary = run_batch(videos, args.output, workers=args.workers, model_size=args.model,
+                            ffmpeg_path=args.ffmpeg, language=args.language, chunk_workers=args.chunk_workers)
+        print(f"\n✅ Batch finished: {summary['processed']} transcribed, {summary['failed']} failed, "
+              f"{summary['skipped']} skipped. Manifest: {args.output}")
+        sys.exit(1 if summary["failed"] else 0)
+
     try:
-        stt = SpeechToText(model_size=model_size, ffmpeg_path=ffmpeg_path, language=language)
-        transcript_path, transcript_text = stt.transcribe_video(video_path)
+        stt = SpeechToText(model_size=args.model, ffmpeg_path=args.ffmpeg, language=args.language,
+                           chunk_workers=args.chunk_workers)
+        transcript_path, transcript_text = stt.transcribe_video(args.video, start=args.start, end=args.end)
 
         if transcript_path:
             print(f"\n✅ Final Transcription saved at: {transcript_path}")
@@ -269,4 +487,4 @@ if __name__ == "__main__":
     finally:
         # Clean up temporary files
         if 'stt' in locals():
-            stt.cleanup()
\ No newline at end of file
+            stt.cleanup()
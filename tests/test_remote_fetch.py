@@ -0,0 +1,93 @@
+import pytest
+
+from remote_fetch import RemoteFetcher
+from remote_fetch_standin import build_test_mp4, serve
+
+
+@pytest.fixture
+def mp4():
+    return build_test_mp4()
+
+
+@pytest.fixture
+def server(mp4):
+    server = serve(mp4[0])
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def url(server):
+    return f"http://127.0.0.1:{server.server_port}/video.mp4"
+
+
+def make_fetcher(cache_dir) -> RemoteFetcher:
+    """A fresh fetcher on `cache_dir`: it shares the on-disk cache but re-asks the server for validators."""
+    return RemoteFetcher(str(cache_dir), max_bytes=1 << 30, pool_size=2, timeout=5)
+
+
+def requested_bytes(server) -> int:
+    """Bytes requested by GET, counting a GET without a range as the whole body."""
+    total = 0
+    for method, range_header in server.requests:
+        if method != "GET":
+            continue
+        if range_header is None:
+            return len(server.body)
+        first, last = range_header[len("bytes="):].split("-")
+        total += int(last) - int(first) + 1
+    return total
+
+
+def test_audio_only_fetch(mp4, server, url, tmp_path):
+    data, audio_ranges = mp4
+    source = make_fetcher(tmp_path).open(url)
+
+    assert source.path is not None and source.chunks is None
+    with open(source.path, "rb") as f:
+        local = f.read()
+    assert len(local) == len(data)
+    for offset, length in audio_ranges:
+        assert local[offset:offset + length] == data[offset:offset + length]
+    # Only the container index and the audio chunks are downloaded, not the video samples
+    assert requested_bytes(server) < len(data) // 4
+
+
+def test_cache_hit_sends_no_download(server, url, tmp_path):
+    fetcher = make_fetcher(tmp_path)
+    path = fetcher.open(url).path
+
+    server.requests.clear()
+    assert fetcher.open(url).path == path
+    assert server.requests == []  # Validator still fresh: nothing is sent
+
+    assert make_fetcher(tmp_path).open(url).path == path
+    assert [method for method, _ in server.requests] == ["HEAD"]  # Revalidated, not downloaded
+
+
+def test_changed_etag_invalidates_cache(server, url, tmp_path):
+    make_fetcher(tmp_path).open(url)
+
+    server.etag = '"v2"'
+    server.requests.clear()
+    fetcher = make_fetcher(tmp_path)
+    assert fetcher.validator(url) == '"v2"'
+    assert fetcher.open(url).path is not None
+    assert requested_bytes(server) > 0  # Downloaded again
+
+    server.requests.clear()
+    make_fetcher(tmp_path).open(url)
+    assert requested_bytes(server) == 0  # The new version is cached
+
+
+def test_server_without_ranges_streams_whole_file(mp4, server, url, tmp_path):
+    data, _ = mp4
+    server.ranges = False
+    source = make_fetcher(tmp_path).open(url)
+
+    assert source.path is None
+    assert b"".join(source.chunks) == data
+
+    server.requests.clear()
+    assert make_fetcher(tmp_path).open(url).path is not None  # Saved while streaming
+    assert requested_bytes(server) == 0
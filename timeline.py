@@ -0,0 +1,201 @@
+import json
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+TIMELINE_VERSION = 1
+
+# Legacy transcript format: free text, then "--- Word Timestamps ---" and "word: 0.00s - 0.00s" lines
+_LEGACY_MARKER = "--- Word Timestamps ---"
+_LEGACY_LINE = re.compile(r"^(?P<word>.*):\s*(?P<start>[\d.]+)s\s*-\s*(?P<end>[\d.]+)s\s*$")
+
+
+class Timeline:
+    def __init__(self, starts, ends, word_ids, vocab: List[str], text: Optional[str] = None):
+        """
+        Columnar word timeline: parallel `starts`/`ends` (seconds) and `word_ids`
+        arrays sorted by start time, with `vocab[word_id]` giving the word.
+
+        Words without timing information have NaN start/end.
+
+        Args:
+            starts: Word start times in seconds
+            ends: Word end times in seconds
+            word_ids: Index of each word in `vocab`
+            vocab: Distinct words
+            text: Full transcript text, defaults to the words joined by spaces
+        """
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+        self.word_ids = np.asarray(word_ids, dtype=np.int32)
+        self.vocab = list(vocab)
+        self._text = text
+        self._max_ends = None  # Running maximum of `ends`, built by `slice`
+
+    # --- Construction ---
+
+    @classmethod
+    def from_words(cls, words: Iterable[dict], text: Optional[str] = None) -> "Timeline":
+        """Builds a timeline from `{"word", "start", "end"}` dicts (Whisper's word timestamps)."""
+        vocab, index = [], {}
+        starts, ends, word_ids = [], [], []
+        for word_data in words:
+            word = word_data["word"].strip()
+            if not word:
+                continue
+            if word not in index:
+                index[word] = len(vocab)
+                vocab.append(word)
+            word_ids.append(index[word])
+            starts.append(word_data.get("start", np.nan))
+            ends.append(word_data.get("end", np.nan))
+
+        timeline = cls(starts, ends, word_ids, vocab, text)
+        timeline._sort()
+        return timeline
+
+    @classmethod
+    def from_text(cls, text: str) -> "Timeline":
+        """Builds an untimed timeline from plain text."""
+        return cls.from_words(({"word": word} for word in text.split()), text)
+
+    def _sort(self):
+        if len(self) and np.any(np.diff(self.starts) < 0):
+            order = np.argsort(self.starts, kind="stable")
+            self.starts, self.ends, self.word_ids = self.starts[order], self.ends[order], self.word_ids[order]
+            self._max_ends = None
+
+    # --- Access ---
+
+    def __len__(self) -> int:
+        return len(self.word_ids)
+
+    @property
+    def words(self) -> List[str]:
+        return [self.vocab[i] for i in self.word_ids]
+
+    @property
+    def text(self) -> str:
+        return self._text.strip() if self._text is not None else " ".join(self.words)
+
+    @property
+    def timed(self) -> bool:
+        """Whether every word carries a timestamp."""
+        return len(self) > 0 and not np.isnan(self.starts).any()
+
+    @property
+    def duration(self) -> float:
+        return float(np.nanmax(self.ends)) if self.timed else 0.0
+
+    def index_at(self, t: float) -> Optional[int]:
+        """Index of the word being spoken at time `t` (binary search), or None."""
+        i = int(np.searchsorted(self.starts, t, side="right")) - 1
+        if i >= 0 and self.ends[i] > t:
+            return i
+        return None
+
+    def word_at(self, t: float) -> Optional[str]:
+        i = self.index_at(t)
+        return None if i is None else self.vocab[self.word_ids[i]]
+
+    def slice(self, start: float, end: float) -> "Timeline":
+        """
+        Words overlapping `[start, end)`. Only `starts` is sorted, so the first
+        candidate is found by binary search over the running maximum of `ends`,
+        and the candidates are then filtered on their own end times.
+        """
+        if self._max_ends is None:
+            self._max_ends = np.fmax.accumulate(self.ends) if len(self) else self.ends
+        lo = int(np.searchsorted(self._max_ends, start, side="right"))
+        hi = int(np.searchsorted(self.starts, end, side="left"))
+        keep = lo + np.flatnonzero(self.ends[lo:hi] > start)
+        return Timeline(self.starts[keep], self.ends[keep], self.word_ids[keep], self.vocab)
+
+    def shift(self, offset: float) -> "Timeline":
+        """Copy of the timeline with every timestamp moved by `offset` seconds."""
+        return Timeline(self.starts + offset, self.ends + offset, self.word_ids, self.vocab, self._text)
+
+    def merge(self, other: "Timeline") -> "Timeline":
+        """Combines two timelines into one sorted by start time."""
+        vocab = list(self.vocab)
+        index = {word: i for i, word in enumerate(vocab)}
+        for word in other.vocab:
+            if word not in index:
+                index[word] = len(vocab)
+                vocab.append(word)
+        remap = np.array([index[word] for word in other.vocab], dtype=np.int32)
+
+        merged = Timeline(
+            np.concatenate([self.starts, other.starts]),
+            np.concatenate([self.ends, other.ends]),
+            np.concatenate([self.word_ids, remap[other.word_ids] if len(other) else other.word_ids]),
+            vocab,
+        )
+        merged._sort()
+        return merged
+
+    # --- Serialization ---
+
+    def to_dict(self) -> dict:
+        """Compact JSON-ready form: columns plus the vocabulary."""
+        return {
+            "version": TIMELINE_VERSION,
+            "text": self.text,
+            "vocab": self.vocab,
+            "starts": [None if np.isnan(t) else round(float(t), 3) for t in self.starts],
+            "ends": [None if np.isnan(t) else round(float(t), 3) for t in self.ends],
+            "word_ids": self.word_ids.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Timeline":
+        starts = [np.nan if t is None else t for t in data["starts"]]
+        ends = [np.nan if t is None else t for t in data["ends"]]
+        return cls(starts, ends, data["word_ids"], data["vocab"], data.get("text"))
+
+    def to_words(self) -> List[dict]:
+        """Inverse of `from_words`; untimed words get None start/end."""
+        return [
+            {
+                "word": self.vocab[i],
+                "start": None if np.isnan(start) else float(start),
+                "end": None if np.isnan(end) else float(end),
+            }
+            for i, start, end in zip(self.word_ids, self.starts, self.ends)
+        ]
+
+    def save(self, path):
+        """Writes the timeline as JSON (`.json`) or as NumPy columns (`.npz`)."""
+        path = Path(path)
+        if path.suffix == ".npz":
+            np.savez(path, starts=self.starts, ends=self.ends, word_ids=self.word_ids,
+                     vocab=np.array(self.vocab, dtype=str), text=np.array(self.text))
+        else:
+            path.write_text(json.dumps(self.to_dict(), ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path) -> "Timeline":
+        """Loads a `.json`/`.npz` timeline, or a legacy plain-text transcript."""
+        path = Path(path)
+        if path.suffix == ".npz":
+            with np.load(path, allow_pickle=False) as data:
+                return cls(data["starts"], data["ends"], data["word_ids"], data["vocab"].tolist(), str(data["text"]))
+        content = path.read_text(encoding="utf-8")
+        if path.suffix == ".json":
+            return cls.from_dict(json.loads(content))
+        return cls.from_legacy_text(content)
+
+    @classmethod
+    def from_legacy_text(cls, content: str) -> "Timeline":
+        """Parses the old "text + --- Word Timestamps ---" transcript format."""
+        text, _, stamps = content.partition(_LEGACY_MARKER)
+        words = []
+        for line in stamps.splitlines():
+            match = _LEGACY_LINE.match(line.strip())
+            if match:
+                words.append({"word": match["word"], "start": float(match["start"]), "end": float(match["end"])})
+        if not words:
+            return cls.from_text(text)
+        return cls.from_words(words, text)
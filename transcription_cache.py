@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Files whose content hash is remembered (LRU), so unchanged files are not re-hashed
+DIGEST_MEMO_SIZE = 4096
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcripts_last_access ON transcripts (last_access);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats (name, value) VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+"""
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Normalizes a URL so equivalent spellings map to the same cache key."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+class TranscriptionCache:
+    def __init__(self, path: str = config.TRANSCRIPTION_CACHE_PATH,
+                 max_bytes: int = config.TRANSCRIPTION_CACHE_MAX_BYTES):
+        """
+        Persistent, content-addressed cache of Whisper transcriptions.
+
+        Entries hold the transcript text and word timestamps and are evicted in
+        least-recently-used order once their total size exceeds `max_bytes`.
+        The cache is a SQLite file, so it is shared by every worker process.
+
+        Args:
+            path: Path of the SQLite cache file
+            max_bytes: Upper bound on the total size of cached payloads
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        # (path, size, mtime_ns) -> sha256, so unchanged files are hashed once; LRU-bounded
+        self._digests = OrderedDict()
+        self._digests_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def file_digest(self, file_path: str) -> str:
+        """Returns the SHA-256 of a file's contents."""
+        stat = os.stat(file_path)
+        memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        with self._digests_lock:
+            digest = self._digests.get(memo_key)
+            if digest is not None:
+                self._digests.move_to_end(memo_key)
+                return digest
+        sha = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with self._digests_lock:
+            self._digests[memo_key] = digest
+            while len(self._digests) > DIGEST_MEMO_SIZE:
+                self._digests.popitem(last=False)
+        return digest
+
+    def key_for(self, source: str, model_size: str, language: Optional[str],
+                etag: Optional[str] = None, time_range: Optional[tuple] = None) -> str:
+        """
+        Builds the cache key for a video.
+
+        Local files are keyed on their content hash; remote videos on the
+        normalized URL plus their ETag (when known). `time_range` is the
+        optional (start, end) window that was transcribed.
+        """
+        if os.path.exists(source):
+            identity = f"sha256:{self.file_digest(source)}"
+        else:
+            identity = f"url:{normalize_url(source)}|etag:{etag or ''}"
+        start, end = time_range or (None, None)
+        if start or end is not None:
+            identity += f"|range:{start or 0}-{end if end is not None else ''}"
+        return hashlib.sha256(f"{identity}|model:{model_size}|lang:{language or ''}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Returns the cached `{"text", "words"}` entry for a key, or None."""
+        conn = self._connect()
+        with conn:
+            row = conn.execute("SELECT payload FROM transcripts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                conn.execute("UPDATE stats SET value = value + 1 WHERE name = 'misses'")
+                return None
+            conn.execute("UPDATE transcripts SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.execute("UPDATE stats SET value = value + 1 WHERE name = 'hits'")
+        return json.loads(row[0])
+
+    def put(self, key: str, text: str, words: list):
+        """Stores a transcription and evicts old entries if over budget."""
+        payload = json.dumps({"text": text, "words": words})
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO transcripts (key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM transcripts ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM transcripts WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        conn.execute("UPDATE stats SET value = value + ? WHERE name = 'evictions'", (evicted,))
+        logger.info(f"Evicted {evicted} transcription(s) from cache")
+
+    def stats(self) -> dict:
+        """Returns hit/miss/eviction counters plus current entry count and size."""
+        conn = self._connect()
+        counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts").fetchone()
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
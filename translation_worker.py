@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Per-process model instances, created once by `_init_worker`
+_stt = None
+_tts = None
+
+
+def _init_worker(model_size: str, ffmpeg_path: str, language: Optional[str], sign_gif_folder: str,
+                 preload_sizes: List[str]):
+    """Loads the STT and TTS models once when a worker process starts."""
+    global _stt, _tts
+    from model_registry import registry
+    from stt import SpeechToText
+    from tts import TextToSign
+    from transcription_cache import TranscriptionCache
+
+    try:
+        registry.preload(preload_sizes)
+        _stt = SpeechToText(model_size=model_size, ffmpeg_path=ffmpeg_path, language=language,
+                            cache=TranscriptionCache(), chunk_workers=config.TRANSCRIPTION_CHUNK_WORKERS)
+        _tts = TextToSign(None, sign_gif_folder)
+    except Exception:
+        logger.exception(f"Translation worker {os.getpid()} failed to start")
+        raise
+
+
+def _ping() -> bool:
+    """No-op job used to force worker processes (and their models) to start."""
+    return _stt is not None
+
+
+def run_translation(video_url: str, options: Optional[dict] = None) -> dict:
+    """
+    Translates one video inside a worker process using the preloaded models.
+    `options` are passed on to `generate_translation` (e.g. model_size, render_video).
+    """
+    from generate_translation import generate_translation
+
+    return generate_translation(video_url, stt=_stt, tts=_tts, **(options or {}))
+
+
+def run_transcription(media_path: str, options: Optional[dict] = None) -> dict:
+    """
+    Transcribes an audio or video file inside a worker process. Only
+    `model_size` is taken from `options`.
+    """
+    model_size = (options or {}).get("model_size")
+    timeline = _stt.transcribe(media_path, model_size=model_size)
+    if timeline is None:
+        raise RuntimeError(f"Transcription failed for: {media_path}")
+    return {"text": timeline.text, "timeline": timeline.to_dict()}
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when the job's cancel flag is set."""
+
+
+def run_translation_job(job_id: str, video_url: str, progress_queue, options: Optional[dict] = None,
+                        cancel_event=None) -> dict:
+    """
+    Translates one video inside a worker process, reporting progress events
+    as `(job_id, event)` tuples on `progress_queue`.
+
+    `cancel_event` is a shared event checked at every progress report (between
+    stages and transcription chunks); once set, the job stops with `JobCancelled`
+    and frees the worker.
+    """
+    from generate_translation import generate_translation
+
+    def progress(stage: str, **info):
+        if cancel_event is not None and cancel_event.is_set():
+            raise JobCancelled(f"Job {job_id} was cancelled")
+        progress_queue.put((job_id, {"stage": stage, **info}))
+
+    return generate_translation(video_url, stt=_stt, tts=_tts, progress=progress, **(options or {}))
+
+
+class TranslationWorkerPool:
+    def __init__(
+        self,
+        workers: int = config.TRANSLATION_WORKERS,
+        model_size: str = config.WHISPER_MODEL_SIZE,
+        ffmpeg_path: str = config.FFMPEG_PATH,
+        language: Optional[str] = config.WHISPER_LANGUAGE,
+        sign_gif_folder: str = config.SIGN_GIF_FOLDER,
+        preload_sizes: List[str] = config.WHISPER_PRELOAD_SIZES,
+    ):
+        """
+        Pool of long-lived worker processes that keep `SpeechToText` and
+        `TextToSign` loaded and take translation jobs over IPC.
+
+        Args:
+            workers: Number of worker processes
+            model_size: Whisper model size loaded by each worker
+            ffmpeg_path: Path to ffmpeg executable
+            language: Target language code passed to Whisper
+            sign_gif_folder: Folder holding the sign GIFs
+            preload_sizes: Whisper model sizes each worker loads at startup
+        """
+        self.workers = max(1, workers)
+        self._initargs = (model_size, ffmpeg_path, language, sign_gif_folder, list(preload_sizes))
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        """
+        Starts the worker processes.
+
+        Raises:
+            FileNotFoundError: If the sign GIF folder is missing, which every worker needs
+        """
+        sign_gif_folder = self._initargs[3]
+        if not os.path.isdir(sign_gif_folder):
+            raise FileNotFoundError(f"Sign GIF folder not found: {sign_gif_folder} (set SIGN_GIF_FOLDER)")
+        # "spawn" keeps workers independent of the parent's threads and event loop
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=self._initargs,
+        )
+        logger.info(f"Started translation worker pool with {self.workers} worker(s)")
+
+    async def warm_up(self):
+        """Spawns every worker so the first requests do not pay for model loading."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)))
+        logger.info("Translation workers are warm")
+
+    async def run(self, func, *args):
+        """
+        Runs `func(*args)` in a worker process without blocking the event loop.
+
+        If a worker died (e.g. out of memory) the pool is restarted before the
+        error is re-raised, so later requests are served again.
+        """
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, func, *args)
+        except BrokenProcessPool:
+            logger.error("Translation worker pool broke, restarting it")
+            self.shutdown()
+            self.start()
+            raise
+
+    async def translate(self, video_url: str, options: Optional[dict] = None) -> dict:
+        """Translates a video in a worker process."""
+        return await self.run(run_translation, video_url, options)
+
+    async def transcribe(self, media_path: str, options: Optional[dict] = None) -> dict:
+        """Transcribes an audio or video file in a worker process."""
+        return await self.run(run_transcription, media_path, options)
+
+    def shutdown(self):
+        """Stops the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
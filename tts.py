@@ -1,41 +1,142 @@
+import logging
 import os
 import sys
+from collections import OrderedDict
+
 import cv2
-import imageio
 import numpy as np
 from pathlib import Path
 
+import config
+from fingerspelling import Fingerspeller
+from sign_atlas import SignAtlas, decode_gif
+from sign_lexicon import SignLexicon
+from timeline import Timeline
+
+logger = logging.getLogger(__name__)
+
 class TextToSign:
-    def __init__(self, transcription_file, sign_gif_folder):
-        self.transcription_file = Path(transcription_file)
+    def __init__(self, transcription_file, sign_gif_folder, atlas_path=config.SIGN_ATLAS_PATH):
+        self.transcription_file = Path(transcription_file) if transcription_file else None
         self.sign_gif_folder = Path(sign_gif_folder)
 
         self._validate_paths()
 
+        # Pre-decoded frames (see sign_atlas.py); falls back to decoding GIFs when absent
+        self.atlas = SignAtlas(atlas_path) if atlas_path and Path(atlas_path).exists() else None
+
+        # Sign index built once; refreshed incrementally when the folder changes
+        self.lexicon = SignLexicon(self.sign_gif_folder)
+        if self.atlas is not None:
+            stale = [sign_id for sign_id in self.lexicon.assets
+                     if sign_id in self.atlas and not self._atlas_current(sign_id)]
+            if stale:
+                logger.warning(f"{len(stale)} sign(s) changed since the atlas was built and will be decoded "
+                               f"from their GIFs; rebuild it with `python sign_atlas.py`")
+
+        # Signs decoded from GIFs, keyed on (sign id, file version), bounded by bytes
+        self._decoded = OrderedDict()
+        self._decoded_bytes = 0
+        self.decode_cache_bytes = config.SIGN_DECODE_CACHE_BYTES
+
+        # Fallback for words without a sign, composed from the single-letter signs
+        self.fingerspeller = Fingerspeller(lambda letter: self.sign_frames(self.lexicon.lookup(letter)))
+
     def _validate_paths(self):
-        """Validates if the required files and directories exist."""
-        if not self.transcription_file.exists():
-            sys.exit(f"❌ Error: Transcription file not found -> {self.transcription_file}")
+        """
+        Validates if the required files and directories exist.
 
-        if not self.sign_gif_folder.exists():
-            sys.exit(f"❌ Error: Sign GIF folder not found -> {self.sign_gif_folder}")
+        Raises:
+            FileNotFoundError: If the transcription file or sign GIF folder is missing
+        """
+        if self.transcription_file and not self.transcription_file.exists():
+            raise FileNotFoundError(f"Transcription file not found: {self.transcription_file}")
 
-    def load_transcription(self):
-        """Loads and returns the transcription text."""
+        if not self.sign_gif_folder.is_dir():
+            raise FileNotFoundError(f"Sign GIF folder not found: {self.sign_gif_folder}")
+
+    def load_timeline(self):
+        """Loads the transcription as a word timeline (JSON, NPZ, or legacy text)."""
         try:
-            text = self.transcription_file.read_text(encoding="utf-8").strip()
-            if not text:
+            timeline = Timeline.load(self.transcription_file)
+            if not len(timeline):
                 print("⚠️ Warning: Transcription file is empty.")
             else:
-                print(f"📜 Loaded Transcription: {text}")
-            return text
+                print(f"📜 Loaded Transcription: {timeline.text}")
+            return timeline
         except Exception as e:
-            sys.exit(f"❌ Error reading transcription file: {e}")
+            raise ValueError(f"Error reading transcription file: {e}") from e
+
+    def load_transcription(self):
+        """Loads and returns the transcription text."""
+        return self.load_timeline().text
 
     def word_to_sign(self, word):
-        """Finds the corresponding sign GIF for a word."""
-        word_gif = self.sign_gif_folder / f"{word.lower()}.gif"
-        return str(word_gif) if word_gif.exists() else None
+        """Finds the corresponding sign GIF for a word or phrase."""
+        return self.sign_path(self.lexicon.lookup(word))
+
+    def sign_path(self, sign_id):
+        """Path of a sign's GIF, or None for an unknown sign."""
+        if sign_id is None or sign_id not in self.lexicon.assets:
+            return None
+        return str(self.sign_gif_folder / self.lexicon.assets[sign_id])
+
+    def _atlas_current(self, sign_id):
+        """True if the atlas entry of a sign was built from the GIF the lexicon currently sees."""
+        return self.atlas.version(sign_id) == self.lexicon.versions.get(sign_id)
+
+    def sign_frames(self, sign_id):
+        """
+        Returns (BGR frames, frame duration in ms) for a sign, or (None, None).
+        Frames come from the atlas when it is up to date for that sign; otherwise
+        the GIF is decoded once and kept in a bounded LRU.
+        """
+        if sign_id is None:
+            return None, None
+        if self.atlas is not None and sign_id in self.atlas and self._atlas_current(sign_id):
+            return self.atlas.frames(sign_id), self.atlas.frame_ms(sign_id)
+        sign_gif = self.sign_path(sign_id)
+        if sign_gif is None:
+            return None, None
+
+        key = (sign_id, self.lexicon.versions.get(sign_id))
+        cached = self._decoded.get(key)
+        if cached is not None:
+            self._decoded.move_to_end(key)
+            return cached
+        frames, frame_ms = decode_gif(sign_gif)
+        frames.flags.writeable = False  # Shared between calls, like atlas views
+        if frames.nbytes <= self.decode_cache_bytes:
+            self._decoded[key] = (frames, frame_ms)
+            self._decoded_bytes += frames.nbytes
+            while self._decoded_bytes > self.decode_cache_bytes:
+                _, (evicted, _) = self._decoded.popitem(last=False)
+                self._decoded_bytes -= evicted.nbytes
+        return frames, frame_ms
+
+    def text_to_signs(self, text):
+        """Maps the words of a text to sign GIFs (None when no sign exists)."""
+        return self.timeline_to_signs(Timeline.from_text(text))
+
+    def timeline_to_signs(self, timeline):
+        """
+        Maps a timeline to signs in one pass, matching the longest known phrase
+        at each word. Each entry spans the words it covers.
+        """
+        if self.lexicon.refresh():
+            self.fingerspeller.clear()  # Letter signs may have been added, replaced or removed
+        words = timeline.to_words()
+        return [
+            {
+                "word": match.text,
+                "start": words[match.start]["start"],
+                "end": words[match.end - 1]["end"],
+                "sign_id": match.sign_id,
+                "sign": self.sign_path(match.sign_id),
+                "fingerspell": match.sign_id is None and self.fingerspeller.can_spell(match.text),
+            }
+            for match in self.lexicon.resolve(word["word"] for word in words)
+        ]
 
     def display_sign_language(self, words):
         """Displays sign language animations for words."""
@@ -43,38 +144,54 @@ class TextToSign:
             print("⚠️ No words to convert.")
             return
 
-        for word in words:
-            sign_gif = self.word_to_sign(word)
-            if sign_gif:
-                print(f"🎥 Displaying sign for: {word}")
-                self.play_gif(sign_gif)
+        for match in self.lexicon.resolve(words):
+            frames, frame_ms = self.sign_frames(match.sign_id)
+            if frames is not None:
+                print(f"🎥 Displaying sign for: {match.text}")
+                self.play_frames(frames, frame_ms)
+                continue
+
+            frames = self.fingerspeller.spell(match.text)
+            if frames is not None:
+                print(f"🔤 Fingerspelling: {match.text}")
+                self.play_frames(frames, self.fingerspeller.frame_ms)
             else:
-                print(f"⚠️ No sign found for: {word}. Consider fingerspelling.")
+                print(f"⚠️ No sign found for: {match.text}.")
 
     def play_gif(self, gif_path):
         """Plays a GIF using OpenCV."""
         try:
-            gif_frames = imageio.mimread(gif_path)
-            if not gif_frames:
+            frames, frame_ms = decode_gif(gif_path)
+            if not len(frames):
                 print(f"❌ Error: Failed to load GIF -> {gif_path}")
                 return
-            
-            cv2.namedWindow("Sign Language Animation", cv2.WINDOW_NORMAL)
-            for frame in gif_frames:
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                cv2.imshow("Sign Language Animation", frame)
-                if cv2.waitKey(100) & 0xFF == ord('q'):
-                    print("⏹️ Animation stopped by user.")
-                    break
-
-            cv2.destroyAllWindows()
+            self.play_frames(frames, frame_ms)
         except Exception as e:
             print(f"❌ Error playing GIF: {e}")
 
+    def play_frames(self, frames, frame_ms=100):
+        """Plays BGR frames using OpenCV."""
+        cv2.namedWindow("Sign Language Animation", cv2.WINDOW_NORMAL)
+        for frame in frames:
+            cv2.imshow("Sign Language Animation", frame)
+            if cv2.waitKey(frame_ms) & 0xFF == ord('q'):
+                print("⏹️ Animation stopped by user.")
+                break
+
+        cv2.destroyAllWindows()
+
+    def render_video(self, signs, output_path, timed=True, progress=None):
+        """
+        Renders signs (from `timeline_to_signs`) headlessly into an .mp4/.webm file.
+        With `timed`, each sign starts at its word's timestamp.
+        """
+        from sign_renderer import SignRenderer
+
+        return SignRenderer(self).render(signs, output_path, timed=timed, progress=progress)
+
     def convert_text_to_sign(self):
         """Processes transcription and displays sign animations."""
-        text = self.load_transcription()
-        words = text.split()
+        words = self.load_timeline().words
 
         if not words:
             print("⚠️ No words found in transcription.")
@@ -90,5 +207,8 @@ if __name__ == "__main__":
     transcription_file = r"D:\fullstack projects\sign_language_extension\sign_language_data\models\transcription.txt"
     sign_gif_folder = r"D:\fullstack projects\sign_language_extension\sign_gifs"
 
-    tts = TextToSign(transcription_file, sign_gif_folder)
-    tts.convert_text_to_sign()
+    try:
+        tts = TextToSign(transcription_file, sign_gif_folder)
+        tts.convert_text_to_sign()
+    except (OSError, ValueError) as e:
+        sys.exit(f"❌ Error: {e}")
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the upload per await
+CHUNK_BYTES = 1024 * 1024
+# Minimum seconds between two expiry sweeps
+_CLEANUP_INTERVAL = 300
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds its size limit."""
+
+
+@dataclass
+class StoredUpload:
+    digest: str     # SHA-256 of the contents
+    path: str       # Content-addressed location on disk
+    size: int
+    existing: bool  # True if identical content was already stored
+
+
+class UploadStore:
+    def __init__(self, root: str = config.UPLOAD_DIR, ttl: float = config.UPLOAD_TTL_SECONDS):
+        """
+        Content-addressed store for uploaded media.
+
+        Uploads are streamed to disk in chunks and hashed on the way, then moved
+        to `objects/<sha256[:2]>/<sha256>`, so identical uploads share one file
+        whatever their names or extensions. Results computed from a file can be
+        stored next to it and are returned for repeat uploads. Files and results
+        not used for `ttl` seconds are deleted by a background sweep.
+
+        Args:
+            root: Folder holding the store
+            ttl: Seconds an unused upload is kept
+        """
+        self.root = root
+        self.ttl = ttl
+        self._objects = os.path.join(root, "objects")
+        self._results = os.path.join(root, "results")
+        self._incoming = os.path.join(root, "incoming")
+        for directory in (self._objects, self._results, self._incoming):
+            os.makedirs(directory, exist_ok=True)
+        self._last_cleanup = 0.0
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._active = set()  # Partial uploads being written, never swept
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self._objects, digest[:2], digest)
+
+    async def save(self, upload, max_bytes: int) -> StoredUpload:
+        """
+        Streams an `UploadFile` into the store without blocking the event loop.
+
+        Raises:
+            UploadTooLarge: If the upload is larger than `max_bytes`
+        """
+        self._maybe_cleanup()
+        fd, tmp_path = tempfile.mkstemp(dir=self._incoming)
+        self._active.add(os.path.abspath(tmp_path))
+        sha = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    chunk = await upload.read(CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                    sha.update(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+
+            digest = sha.hexdigest()
+            path = self.object_path(digest)
+            try:
+                os.utime(path)  # Refresh its TTL
+                existing = True
+                os.remove(tmp_path)
+            except FileNotFoundError:  # New content, or just swept
+                existing = False
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            self._active.discard(os.path.abspath(tmp_path))
+
+        logger.info(f"Stored upload {upload.filename} ({size} bytes) as {digest[:12]}"
+                    f"{' (duplicate)' if existing else ''}")
+        return StoredUpload(digest, path, size, existing)
+
+    # --- Results ---
+
+    def _result_path(self, digest: str, kind: str) -> str:
+        return os.path.join(self._results, f"{digest}.{kind}.json")
+
+    def get_result(self, digest: str, kind: str) -> Optional[dict]:
+        """Result of type `kind` previously computed for this content, or None."""
+        path = self._result_path(digest, kind)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        os.utime(path)
+        return result
+
+    def put_result(self, digest: str, kind: str, result: dict):
+        path = self._result_path(digest, kind)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(path + ".tmp", path)
+
+    # --- Expiry ---
+
+    def _maybe_cleanup(self):
+        """Starts an expiry sweep in a thread when one is due, without waiting for it."""
+        if time.time() - self._last_cleanup < _CLEANUP_INTERVAL:
+            return
+        if self._cleanup_task is not None and not self._cleanup_task.done():
+            return
+        self._last_cleanup = time.time()
+        self._cleanup_task = asyncio.create_task(asyncio.to_thread(self.cleanup))
+
+    def cleanup(self) -> int:
+        """
+        Deletes uploads, results and abandoned partial uploads unused for `ttl` seconds.
+
+        Returns:
+            Number of files removed
+        """
+        self._last_cleanup = time.time()
+        cutoff = self._last_cleanup - self.ttl
+        removed = 0
+        for directory in (self._objects, self._results, self._incoming):
+            for dirpath, _, filenames in os.walk(directory):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    if os.path.abspath(path) in self._active:
+                        continue
+                    try:
+                        if os.stat(path).st_mtime < cutoff:
+                            os.remove(path)
+                            removed += 1
+                    except OSError:
+                        pass
+        if removed:
+            logger.info(f"Removed {removed} expired upload file(s)")
+        return removed
@@ -1,13 +1,315 @@
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+from dataset_files import INDEX_NAME
 
 dataset_path = "sign_language_data/datasets"
 
-# Ensure the dataset folder exists
-if not os.path.exists(dataset_path):
-    print(f"⚠️ Warning: Dataset path '{dataset_path}' not found. Creating it now...")
-    os.makedirs(dataset_path, exist_ok=True)  # Creates the directory if missing
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm")
+
+# Extracted frame size (width, height); matches crop_resize.IMG_SIZE
+FRAME_SIZE = (224, 224)
+# Frames per shard file (224x224 BGR frames: ~150 KB each, ~600 MB per shard)
+SHARD_FRAMES = 4096
+# Seek instead of stepping through frames when the next sample is this far ahead
+SEEK_MIN_GAP_SECONDS = 2.0
+
 
 def list_datasets():
+    if not os.path.exists(dataset_path):
+        print(f"⚠️ Warning: Dataset path '{dataset_path}' not found.")
+        return []
     return [dataset for dataset in os.listdir(dataset_path) if os.path.isdir(os.path.join(dataset_path, dataset))]
 
-print("Available datasets:", list_datasets())
+
+def list_videos(root):
+    """
+    Videos below `root` as (relative path, label) pairs, labelled by their
+    folder ("hello/clip_01.mp4" -> "hello").
+    """
+    videos = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(VIDEO_EXTENSIONS):
+                rel_path = os.path.relpath(os.path.join(dirpath, name), root)
+                label = os.path.dirname(rel_path).replace(os.sep, "/") or os.path.splitext(name)[0]
+                videos.append((rel_path, label))
+    return videos
+
+
+def sample_frames(video_path, fps=None, frame_size=FRAME_SIZE):
+    """
+    Decodes `video_path` at a target frame rate, yielding frames one at a time.
+
+    Frames between samples are only grabbed (demuxed and decoded, but never
+    converted or copied); when the next sample is more than
+    `SEEK_MIN_GAP_SECONDS` ahead, the capture seeks to it instead.
+
+    Args:
+        video_path: Video to decode
+        fps: Frames per second to keep (None keeps every frame)
+        frame_size: (width, height) every frame is resized to
+
+    Yields:
+        Tuple of (timestamp in seconds, uint8 BGR frame of shape H x W x 3)
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video: {video_path}")
+    try:
+        source_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        step = max(1.0, source_fps / fps) if fps else 1.0
+        seek_gap = int(SEEK_MIN_GAP_SECONDS * source_fps)
+
+        position = 0  # Index of the next frame the capture will return
+        target = 0.0
+        while frame_count <= 0 or round(target) < frame_count:
+            index = int(round(target))
+            if index - position > seek_gap:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                position = index
+            while position < index:
+                if not cap.grab():
+                    return
+                position += 1
+            ok, frame = cap.read()
+            if not ok:
+                return
+            position += 1
+            if (frame.shape[1], frame.shape[0]) != tuple(frame_size):
+                frame = cv2.resize(frame, tuple(frame_size), interpolation=cv2.INTER_AREA)
+            yield index / source_fps, frame
+            target += step
+    finally:
+        cap.release()
+
+
+# Per-process shard writer, created by `_init_extract_worker`
+_writer = None
+
+
+def _init_extract_worker(output_dir, frame_size, shard_frames):
+    global _writer
+    _writer = ShardWriter(output_dir, frame_size, shard_frames, prefix=f"shard-{os.getpid()}")
+
+
+def _extract_video(task):
+    """
+    Decodes one video in a pool worker, streaming its frames straight into the
+    worker's own shards, so only index entries travel back to the parent.
+
+    Returns:
+        The video's index entries, with "shard" set to the shard file name
+    """
+    rel_path, label, video_path, fps = task
+    entries = _writer.add(rel_path, label, sample_frames(video_path, fps, _writer.frame_size))
+    return [dict(entry, shard=_writer.shards[entry["shard"]]["file"]) for entry in entries]
+
+
+class ShardWriter:
+    def __init__(self, output_dir, frame_size=FRAME_SIZE, shard_frames=SHARD_FRAMES, prefix="shard"):
+        """
+        Packs fixed-size uint8 frames into shard files of `shard_frames` frames.
+
+        Each shard is a raw N x H x W x 3 BGR array (`<prefix>-00000.u8`, ...), so
+        it can be memory-mapped with `np.memmap` using the shape from the index.
+
+        Args:
+            output_dir: Folder for the shards
+            frame_size: (width, height) of every frame
+            shard_frames: Maximum frames per shard
+            prefix: Shard file name prefix, unique per writer
+        """
+        self.output_dir = output_dir
+        self.frame_size = tuple(frame_size)
+        self.shard_frames = shard_frames
+        self.prefix = prefix
+        self.shards = []  # {"file", "count"}
+        self.videos = []  # {"video", "label", "shard", "offset", "count", "timestamps"}
+        self._file = None
+        width, height = self.frame_size
+        self._frame_bytes = width * height * 3
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _open_shard(self):
+        name = f"{self.prefix}-{len(self.shards):05d}.u8"
+        self._file = open(os.path.join(self.output_dir, name), "wb")
+        self.shards.append({"file": name, "count": 0})
+
+    def add(self, rel_path, label, frames):
+        """
+        Streams a video's (timestamp, frame) pairs into the shards, one frame at
+        a time; a video may span consecutive shards. If `frames` fails part way,
+        the video's frames are dropped and the error is re-raised.
+
+        Returns:
+            The video's index entries, one per shard it landed in
+        """
+        mark = (len(self.shards), self.shards[-1]["count"] if self.shards else 0, len(self.videos))
+        try:
+            for timestamp, frame in frames:
+                if self._file is None or self.shards[-1]["count"] >= self.shard_frames:
+                    self._close_shard()
+                    self._open_shard()
+                shard = self.shards[-1]
+                if len(self.videos) == mark[2] or self.videos[-1]["shard"] != len(self.shards) - 1:
+                    self.videos.append({
+                        "video": rel_path.replace(os.sep, "/"),
+                        "label": label,
+                        "shard": len(self.shards) - 1,
+                        "offset": shard["count"],
+                        "count": 0,
+                        "timestamps": [],
+                    })
+                self._file.write(np.ascontiguousarray(frame).tobytes())
+                self.videos[-1]["count"] += 1
+                self.videos[-1]["timestamps"].append(round(timestamp, 3))
+                shard["count"] += 1
+            if self._file is not None:
+                self._file.flush()
+        except BaseException:
+            self._rollback(*mark)
+            raise
+        return self.videos[mark[2]:]
+
+    def _rollback(self, shard_len, count, video_len):
+        """Drops everything written since the shard and video counts were `shard_len`/`count`/`video_len`."""
+        self._close_shard()
+        for shard in self.shards[shard_len:]:
+            os.remove(os.path.join(self.output_dir, shard["file"]))
+        del self.shards[shard_len:]
+        del self.videos[video_len:]
+        if self.shards:
+            self.shards[-1]["count"] = count
+            self._file = open(os.path.join(self.output_dir, self.shards[-1]["file"]), "r+b")
+            self._file.truncate(count * self._frame_bytes)
+            self._file.seek(0, os.SEEK_END)
+
+    def _close_shard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """Closes the last shard and writes the index atomically."""
+        self._close_shard()
+        return write_index(self.output_dir, self.frame_size, self.shards, self.videos)
+
+
+def write_index(output_dir, frame_size, shards, videos):
+    """Writes `index.json` for `shards` ({"file", "count"}) and `videos` atomically, and returns it."""
+    width, height = frame_size
+    index = {
+        "frame_size": [width, height],
+        "channel_order": "BGR",
+        "dtype": "uint8",
+        "frame_count": sum(shard["count"] for shard in shards),
+        "labels": sorted({video["label"] for video in videos}),
+        "shards": shards,
+        "videos": videos,
+    }
+    index_path = os.path.join(output_dir, INDEX_NAME)
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(index_path + ".tmp", index_path)
+    return index
+
+
+def extract_frames(videos_dir, output_dir, fps=10.0, frame_size=FRAME_SIZE, workers=None,
+                   shard_frames=SHARD_FRAMES):
+    """
+    Extracts frames from every video below `videos_dir` into packed shards.
+
+    Videos are decoded in parallel on `workers` processes. Each worker streams
+    frames into its own shard files as it decodes them, so no process holds
+    more than a frame at a time and only index entries are sent back; this
+    process merges them into one index. Up to one partly filled shard is left
+    per worker.
+
+    Args:
+        videos_dir: Folder of videos, one subfolder per label
+        output_dir: Folder for the shards and index
+        fps: Frames per second to sample (None keeps every frame)
+        frame_size: (width, height) every frame is resized to
+        workers: Decoding processes (None uses every core)
+        shard_frames: Maximum frames per shard
+
+    Returns:
+        The shard index
+    """
+    videos = list_videos(videos_dir)
+    print(f"📂 {len(videos)} video(s) found in {videos_dir}")
+
+    # Shard names depend on worker pids, so clear out the ones from earlier runs
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(output_dir):
+        if name.startswith("shard-") and name.endswith(".u8"):
+            os.remove(os.path.join(output_dir, name))
+
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    done = frames = 0
+    shard_counts = {}  # Shard file -> frames
+    entries = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_extract_worker,
+                             initargs=(output_dir, tuple(frame_size), shard_frames)) as executor:
+        futures = [executor.submit(_extract_video, (rel_path, label, os.path.join(videos_dir, rel_path), fps))
+                   for rel_path, label in videos]
+        for future in as_completed(futures):
+            done += 1
+            try:
+                video_entries = future.result()
+            except Exception as e:
+                print(f"Warning: Skipping video ({e})")
+                continue
+            for entry in video_entries:
+                shard_counts[entry["shard"]] = max(shard_counts.get(entry["shard"], 0),
+                                                   entry["offset"] + entry["count"])
+                frames += entry["count"]
+            entries.extend(video_entries)
+            elapsed = time.perf_counter() - started
+            print(f"⏳ {done}/{len(videos)} videos - {frames} frames, {frames / elapsed:.0f} frames/s")
+
+    shards = [{"file": name, "count": shard_counts[name]} for name in sorted(shard_counts)]
+    shard_ids = {shard["file"]: i for i, shard in enumerate(shards)}
+    for entry in entries:
+        entry["shard"] = shard_ids[entry["shard"]]
+    index = write_index(output_dir, frame_size, shards, entries)
+    print(f"✅ Extracted {index['frame_count']} frame(s) into {len(index['shards'])} shard(s): {output_dir}")
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract dataset video frames into packed shards")
+    parser.add_argument("dataset", nargs="?", help="Dataset folder name under the dataset path")
+    parser.add_argument("--videos", help="Folder of videos (default: <dataset>/videos)")
+    parser.add_argument("--output", help="Output folder (default: <dataset>/shards)")
+    parser.add_argument("--fps", type=float, default=10.0, help="Frames per second to keep (0 keeps all)")
+    parser.add_argument("--size", type=int, nargs=2, default=FRAME_SIZE, metavar=("WIDTH", "HEIGHT"),
+                        help="Frame size")
+    parser.add_argument("--workers", type=int, default=None, help="Decoding processes (default: all cores)")
+    parser.add_argument("--shard-frames", type=int, default=SHARD_FRAMES, help="Frames per shard")
+    args = parser.parse_args()
+
+    if not args.dataset and not args.videos:
+        print("Available datasets:", list_datasets())
+    else:
+        root = os.path.join(dataset_path, args.dataset) if args.dataset else os.path.dirname(args.videos)
+        extract_frames(
+            args.videos or os.path.join(root, "videos"),
+            args.output or os.path.join(root, "shards"),
+            fps=args.fps or None,
+            frame_size=tuple(args.size),
+            workers=args.workers,
+            shard_frames=args.shard_frames,
+        )